@@ -1,6 +1,3 @@
-rm json/articles/*.json
-rm json/references/*.json
-rm json/dois/*.json
-rm json/urls/*.json
-rm json/xhtmls/*.json
-rm json/pdfs/*.json
\ No newline at end of file
+# The json files can be in shard subdirectories, see json_shard_depth in config.py
+find json/articles/ json/references/ json/dois/ json/urls/ json/xhtmls/ json/pdfs/ json/titles/ json/ores/ json/wikitexts/ json/analyses/ json/reference_memos/ -name "*.json" -delete
+rm -f json/locks/*.lock
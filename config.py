@@ -2,5 +2,89 @@ import logging
 
 # Settings:
 subdirectory_for_json = "json/"  # create it manually before running the api
+# Layout of the json cache. With a depth of 2 and a width of 2 a reference
+# is stored as references/ab/cd/abcd1234.json. A depth of 0 gives the old flat layout.
+# Files in the flat layout are still found so run reshard_json_cache.py
+# to migrate an existing cache at your convenience.
+json_shard_depth = 2
+json_shard_width = 2
+# Where the cache is stored, either "files" with one json file per object
+# in the layout above or "sqlite" with one table per type in sqlite_database.
+# Run import_json_cache_to_sqlite.py to import an existing json cache.
+storage_backend = "files"
+# How the json is encoded. An indent of None gives compact json.
+# orjson is used if it is installed and json_use_orjson is True.
+json_indent = None
+json_use_orjson = True
+# Compress the json files with "gzip" or "zstd" (needs zstandard installed)
+# or leave it empty for plain json. Files are readable whatever this is set to.
+json_compression = ""
+json_compression_level = 3
+# Call fsync before a written file is renamed into place.
+# This costs a lot of time and is only needed to survive power loss.
+json_fsync = False
+# Every worker keeps the most recently read json files uncompressed in memory
+# up to this many bytes of json. 0 disables the cache.
+read_cache_max_bytes = 64 * 1024 * 1024
+sqlite_database = f"{subdirectory_for_json}iari.sqlite"
 loglevel = logging.ERROR
 user_agent = "IARI, see https://github.com/internetarchive/iari"
+# Base url of another IARI node to send the /statistics/all sub-requests to,
+# e.g. "http://18.217.22.248/v2". This is only useful for multi-node setups.
+# When empty the all-endpoint composes everything in-process.
+all_handler_remote_base_url = ""
+# Limits of the fetch engine that runs the URL and DOI checks of the all-endpoint.
+# The per-host limit is applied on the host of the URL being checked.
+fetcher_max_concurrency = 50
+fetcher_max_per_host = 4
+fetcher_timeout = 30  # seconds per task
+# The ORES quality score is optional so we never wait longer than this for it
+ores_timeout = 5  # seconds
+# How long cached check-url and check-doi results are served.
+# Until fresh_seconds they are served as they are, until stale_seconds they
+# are served at once while they are refreshed in the background,
+# after that they are checked again before responding.
+check_url_fresh_seconds = 7 * 24 * 3600
+check_url_stale_seconds = 30 * 24 * 3600
+check_doi_fresh_seconds = 30 * 24 * 3600
+check_doi_stale_seconds = 180 * 24 * 3600
+revalidation_max_workers = 4
+# Limits of the bulk article endpoint. The wikitext is parsed
+# in this many processes, 0 means one per CPU.
+bulk_max_articles = 500
+bulk_max_processes = 0
+# The recent changes refresher re-analyzes cached articles when they are edited.
+# Edits of the same article within debounce_seconds are analyzed once.
+recent_changes_url = "https://stream.wikimedia.org/v2/stream/recentchange"
+refresher_debounce_seconds = 60
+refresher_max_workers = 4
+# Identical analyses and checks requested at the same time are computed by one
+# worker process while the others wait for its result at most this long.
+single_flight_timeout = 180  # seconds
+single_flight_poll_interval = 0.1  # seconds
+# Keys share this many lock files so the lock directory does not grow.
+# Two keys on the same lock file are computed one after the other.
+single_flight_lock_stripes = 4096
+# ORES scores never change for a revision so they are cached forever.
+# Revisions ORES cannot score are remembered for this long.
+ores_negative_cache_seconds = 30 * 24 * 3600
+ores_batch_size = 50  # revisions per request to ORES
+# A title keeps the page id it was indexed with for this long. Pages are moved
+# and titles reused so after that we ask the MediaWiki API again. A refresh
+# also corrects the index with the page id returned with the latest revision.
+title_index_max_age_seconds = 24 * 3600
+# Keep the wikitext of analyzed revisions so the same revision can be
+# analyzed with another regex without fetching it again
+store_wikitext = True
+# Very large articles can have their level 2 sections extracted in a process pool.
+# Only sections of at least this many characters are sent to the pool and only
+# when there are two or more of them. 0 processes means one per CPU.
+parallel_extraction = False
+parallel_extraction_min_section_length = 20000
+parallel_extraction_processes = 0
+# Identical references are extracted once. This many reference statistics
+# (not the extracted references) are kept in memory per process, 0 disables
+# the memo. With reference_memo_storage they are also kept in the cache and
+# shared across articles and workers.
+reference_memo_size = 10000
+reference_memo_storage = False
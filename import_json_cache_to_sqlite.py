@@ -0,0 +1,9 @@
+"""Import an existing json cache into the sqlite backend, see config.py"""
+
+import logging
+
+from src.models.file_io.sqlite_import import JsonCacheImporter
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    JsonCacheImporter().run()
@@ -0,0 +1,9 @@
+"""Analyze all articles in a local Wikipedia XML dump, see --help"""
+
+import logging
+
+from src.models.wikimedia.wikipedia.dump_ingester import WikipediaDumpIngester
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    WikipediaDumpIngester().run()
@@ -0,0 +1,9 @@
+"""Re-analyze the cached articles when they are edited, see --help"""
+
+import logging
+
+from src.models.wikimedia.recent_changes import RecentChangesRefresher
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    RecentChangesRefresher().run()
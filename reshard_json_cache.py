@@ -0,0 +1,9 @@
+"""Move an existing json cache to the sharded layout, see config.py"""
+
+import logging
+
+from src.models.file_io.reshard import JsonCacheResharder
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    JsonCacheResharder().run()
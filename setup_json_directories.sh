@@ -3,4 +3,10 @@ mkdir json/references/
 mkdir json/dois/
 mkdir json/urls/
 mkdir json/xhtmls/
-mkdir json/pdfs/
\ No newline at end of file
+mkdir json/pdfs/
+mkdir json/titles/
+mkdir json/ores/
+mkdir json/wikitexts/
+mkdir json/analyses/
+mkdir json/reference_memos/
+# The shard subdirectories are created when needed, see json_shard_depth in config.py
@@ -17,6 +17,8 @@ from src.views.check_doi import CheckDoi
 from src.views.check_url import CheckUrl
 from src.views.statistics.all import All
 from src.views.statistics.article import Article
+from src.views.statistics.articles import Articles
+from src.views.statistics.cache import Cache
 from src.views.statistics.pdf import Pdf
 from src.views.statistics.reference import Reference
 from src.views.statistics.references import References
@@ -35,11 +37,13 @@ api = Api(app, prefix="/v2")
 api.add_resource(CheckUrl, "/check-url")
 api.add_resource(CheckDoi, "/check-doi")
 api.add_resource(Article, "/statistics/article")
+api.add_resource(Articles, "/statistics/articles")
 api.add_resource(All, "/statistics/all")
 api.add_resource(References, "/statistics/references")
 api.add_resource(Reference, "/statistics/reference/<string:reference_id>")
 api.add_resource(Pdf, "/statistics/pdf")
 api.add_resource(Xhtml, "/statistics/xhtml")
+api.add_resource(Cache, "/statistics/cache")
 # return app_
 # api.add_resource(
 #     AddJobToQueue, "/add-job"
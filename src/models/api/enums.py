@@ -1,8 +1,13 @@
-# from enum import Enum
-
+from enum import Enum
 
 # class Return(Enum):
 #     INVALID_QID = "Invalid Wikidata QID"
 #     NO_QID = "No Wikidata QID was given"
 #     # https://www.geeksforgeeks.org/string-formatting-in-python/
 #     NO_MATCH = "404: No match found for Wikidata QID {qid} in {wikibase}"
+
+
+class Freshness(Enum):
+    FRESH = "fresh"
+    STALE = "stale"
+    EXPIRED = "expired"
@@ -0,0 +1,90 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Set
+
+from pydantic import BaseModel
+
+import config
+from src.models.api.enums import Freshness
+
+logger = logging.getLogger(__name__)
+
+
+class FreshnessPolicy(BaseModel):
+    """This decides from the stored timestamp whether a cached result
+    can be served as is, served while it is refreshed or has to be recomputed"""
+
+    fresh_seconds: int
+    stale_seconds: int
+
+    def get_freshness(
+        self, data: Dict[str, Any], now: Optional[int] = None
+    ) -> Freshness:
+        timestamp = data.get("timestamp")
+        if not isinstance(timestamp, (int, float)):
+            # we cannot tell how old it is
+            return Freshness.EXPIRED
+        if now is None:
+            now = int(datetime.timestamp(datetime.utcnow()))
+        age = now - timestamp
+        if age < self.fresh_seconds:
+            return Freshness.FRESH
+        elif age < self.stale_seconds:
+            return Freshness.STALE
+        else:
+            return Freshness.EXPIRED
+
+
+class Revalidator:
+    """This refreshes stale cache entries in background threads
+
+    A key is only revalidated once at a time no matter how many
+    requests hit the stale entry meanwhile."""
+
+    def __init__(self, max_workers: int = config.revalidation_max_workers):
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="revalidator"
+        )
+        self.in_flight: Set[str] = set()
+        self.lock = threading.Lock()
+
+    def revalidate(self, key: str, function: Callable[[], Any]) -> bool:
+        """Run the function in the background unless the key
+        is being revalidated already. Returns whether it was scheduled."""
+        with self.lock:
+            if key in self.in_flight:
+                return False
+            self.in_flight.add(key)
+        try:
+            self.executor.submit(self.__run__, key, function)
+        except RuntimeError:
+            # the executor has been shut down
+            with self.lock:
+                self.in_flight.discard(key)
+            return False
+        return True
+
+    def __run__(self, key: str, function: Callable[[], Any]) -> None:
+        try:
+            function()
+            logger.debug(f"revalidated {key}")
+        except Exception as e:  # noqa: BLE001
+            logger.warning(f"revalidation of {key} failed, got {e!r}")
+        finally:
+            with self.lock:
+                self.in_flight.discard(key)
+
+
+_revalidator: Optional[Revalidator] = None
+_revalidator_lock = threading.Lock()
+
+
+def get_revalidator() -> Revalidator:
+    """Return the revalidator of this worker process"""
+    global _revalidator
+    with _revalidator_lock:
+        if _revalidator is None:
+            _revalidator = Revalidator()
+        return _revalidator
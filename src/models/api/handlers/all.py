@@ -2,19 +2,31 @@
 please write me some code in python that can fetch asynchronously a reference_id from the following endpoint based on a list like this ids=["id1", "id2"]:
 http://18.217.22.248/v2/statistics/reference/{reference_id}
 """
-import asyncio
-from typing import Any, Dict, List, Set
-from urllib.parse import quote
 
-import aiohttp
+import json
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from functools import partial
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+from urllib.parse import quote, urlparse
+
 import requests
 
+import config
+from src.models.api.handlers.fetcher import FetchTask, get_fetcher
 from src.models.api.job.article_job import ArticleJob
 from src.models.base import WariBaseModel
 from src.models.exceptions import MissingInformationError
 
 
 class AllHandler(WariBaseModel):
+    """This composes the output of the article, reference, check-url
+    and check-doi endpoints into one big json object.
+
+    By default everything is done in-process by calling the same logic
+    as the views directly so the parsed objects are shared in memory.
+    If remote_base_url is set the sub-requests are sent over HTTP
+    to that node instead which is only useful for multi-node setups."""
+
     compilation: Dict[str, Any] = {}
     data: Dict[str, Any] = {}
     # We use a set to avoid duplicates
@@ -26,6 +38,13 @@ class AllHandler(WariBaseModel):
     error: bool = False
     extract_dois_done = False
     reference_ids: List[str] = []
+    # These are the references from an analysis done in this process
+    analyzed_references: List[Dict[str, Any]] = []
+    remote_base_url: str = config.all_handler_remote_base_url
+
+    @property
+    def remote(self) -> bool:
+        return bool(self.remote_base_url)
 
     @property
     def number_of_references(self) -> int:
@@ -39,45 +58,113 @@ class AllHandler(WariBaseModel):
         self.__extract_dois__()
         return len(self.dois)
 
-    @staticmethod
-    async def fetch_data(session, url):
-        async with session.get(url) as response:
-            return await response.json()
-
-    async def get_reference_details(self, ids: List[str]):
-        async with aiohttp.ClientSession() as session:
-            tasks = []
-            for reference_id in ids:
-                url = f"http://18.217.22.248/v2/statistics/reference/{reference_id}"
-                tasks.append(asyncio.ensure_future(self.fetch_data(session, url)))
-
-            results = await asyncio.gather(*tasks)
-            return results
-
     @staticmethod
     def __quote__(string):
         """Return a urlencoded string with no safe characters"""
         return quote(string, safe="")
 
-    async def check_urls(self, urls: Set[str]):
-        async with aiohttp.ClientSession() as session:
-            tasks = []
-            for url in urls:
-                url = f"http://18.217.22.248/v2/check-url?url={self.__quote__(url)}"
-                tasks.append(asyncio.ensure_future(self.fetch_data(session, url)))
+    @staticmethod
+    def __host__(url: str) -> Optional[str]:
+        """The host the check will hit which the per-host limit is applied on"""
+        return urlparse(url).netloc.lower() or None
+
+    def __url_tasks__(self, urls: Set[str]) -> List[FetchTask]:
+        tasks = []
+        for url in urls:
+            if self.remote:
+                task = FetchTask(
+                    url=f"{self.remote_base_url}/check-url?url={self.__quote__(url)}",
+                    host=self.__host__(url),
+                    details=dict(url=url),
+                )
+            else:
+                task = FetchTask(
+                    function=partial(self.__check_url_in_process__, url),
+                    host=self.__host__(url),
+                    details=dict(url=url),
+                )
+            tasks.append(task)
+        return tasks
+
+    def __doi_tasks__(self, dois: Set[str]) -> List[FetchTask]:
+        # All DOI lookups hit the same upstream services so they share one host limit
+        tasks = []
+        for doi in dois:
+            if self.remote:
+                task = FetchTask(
+                    url=f"{self.remote_base_url}/check-doi?doi={self.__quote__(doi)}",
+                    host="doi",
+                    details=dict(doi=doi),
+                )
+            else:
+                task = FetchTask(
+                    function=partial(self.__check_doi_in_process__, doi),
+                    host="doi",
+                    details=dict(doi=doi),
+                )
+            tasks.append(task)
+        return tasks
+
+    def get_reference_details(self, ids: List[str]) -> List[Dict[str, Any]]:
+        """Fetch all references in one batch request"""
+        from src import app
+
+        url = f"{self.remote_base_url}/statistics/references"
+        response = requests.post(url, json=dict(ids=ids))
+        if response.status_code == 200:
+            return response.json()["references"]
+        else:
+            app.logger.error(
+                f"Got status code {response.status_code} when "
+                "fetching from the references endpoint"
+            )
+            return []
+
+    def check_urls(self, urls: Set[str]) -> List[Dict[str, Any]]:
+        return get_fetcher().fetch_all(tasks=self.__url_tasks__(urls))
 
-            results = await asyncio.gather(*tasks)
-            return results
+    def check_dois(self, dois: Set[str]) -> List[Dict[str, Any]]:
+        return get_fetcher().fetch_all(tasks=self.__doi_tasks__(dois))
 
-    async def check_dois(self, dois: Set[str]):
-        async with aiohttp.ClientSession() as session:
-            tasks = []
-            for doi in dois:
-                url = f"http://18.217.22.248/v2/check-doi?doi={self.__quote__(doi)}"
-                tasks.append(asyncio.ensure_future(self.fetch_data(session, url)))
+    def stream(self) -> Iterator[Dict[str, Any]]:
+        """Yield the parts of the compilation one by one as soon as they resolve
 
-            results = await asyncio.gather(*tasks)
-            return results
+        The article statistics come first. Then every reference, url and doi
+        detail follows as its own record in the order they complete.
+        The DOI checks are started when the references have been fetched
+        because the DOIs are extracted from them."""
+        from src import app
+
+        if not self.job:
+            raise MissingInformationError()
+        self.__fetch_article__()
+        if self.error:
+            yield dict(error="could not get the article statistics")
+            return
+        yield dict(article=self.data)
+        fetcher = get_fetcher()
+        pending: Dict[Future, Tuple[str, FetchTask]] = {}
+        for task in self.__url_tasks__(set(self.data["urls"])):
+            pending[fetcher.submit(task)] = ("url_details", task)
+        # The URL checks run while we fetch the references
+        self.__fetch_references__()
+        for reference in self.references:
+            yield dict(reference_details=reference)
+        self.__extract_dois__()
+        app.logger.info(f"Checking {len(self.dois)} DOIs")
+        for task in self.__doi_tasks__(self.dois):
+            pending[fetcher.submit(task)] = ("doi_details", task)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                key, task = pending.pop(future)
+                yield {key: fetcher.result_of(task=task, future=future)}
+        app.logger.info("stream: done")
+
+    def ndjson_lines(self) -> Iterator[str]:
+        """Serialize the stream as newline delimited json"""
+        for record in self.stream():
+            yield json.dumps(record) + "\n"
 
     def fetch_and_compile(self):
         from src import app
@@ -99,13 +186,21 @@ class AllHandler(WariBaseModel):
         if not self.error and not self.references and self.number_of_references:
             self.__extract_reference_ids__()
             app.logger.debug("__fetch_references__: running")
-            # this code from chatgpt does not work via flask
-            # loop = asyncio.get_event_loop()
-            # solution from https://techoverflow.net/2020/10/01/how-to-fix-python-asyncio-runtimeerror-there-is-no-current-event-loop-in-thread/
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            self.references = loop.run_until_complete(
-                self.get_reference_details(self.reference_ids)
+            if self.remote:
+                self.references = self.get_reference_details(self.reference_ids)
+            else:
+                self.__fetch_references_in_process__()
+
+    def __fetch_references_in_process__(self):
+        """We reuse the references from the analysis if we just did one
+        and otherwise read them from the cache in one batch"""
+        from src.models.file_io.references import ReferencesFileIo
+
+        if self.analyzed_references:
+            self.references = self.analyzed_references
+        else:
+            self.references, _ = ReferencesFileIo.read_references_from_disk(
+                ids=self.reference_ids
             )
 
     def __fetch_url_details__(self):
@@ -113,38 +208,81 @@ class AllHandler(WariBaseModel):
 
         if not self.error:
             app.logger.debug("__fetch_url_details__: running")
-            # this code from chatgpt does not work via flask
-            # loop = asyncio.get_event_loop()
-            # solution from https://techoverflow.net/2020/10/01/how-to-fix-python-asyncio-runtimeerror-there-is-no-current-event-loop-in-thread/
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
             # we use a set here to avoid duplicates
             urls = set(self.data["urls"])
             app.logger.info(f"Checking {len(urls)} URLs")
-            self.url_details = loop.run_until_complete(self.check_urls(urls))
+            self.url_details = self.check_urls(urls)
 
     def __fetch_doi_details__(self):
         from src import app
 
         if not self.error:
             app.logger.debug("__fetch_doi_details__: running")
-            # this code from chatgpt does not work via flask
-            # loop = asyncio.get_event_loop()
-            # solution from https://techoverflow.net/2020/10/01/how-to-fix-python-asyncio-runtimeerror-there-is-no-current-event-loop-in-thread/
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
             self.__extract_dois__()
             if self.dois:
                 app.logger.info(f"Checking {len(self.dois)} DOIs")
-                self.doi_details = loop.run_until_complete(self.check_dois(self.dois))
+                self.doi_details = self.check_dois(self.dois)
             else:
                 app.logger.info("Not checking DOIs because none were found")
 
+    @staticmethod
+    def __check_url_in_process__(url: str) -> Dict[str, Any]:
+        """This runs the same logic as the check-url endpoint"""
+        from src.models.api.job.check_url_job import UrlJob
+        from src.views.check_url import CheckUrl
+
+        view = CheckUrl()
+        view.job = UrlJob(url=url)
+        data, _ = view.__handle_valid_job__()
+        return data
+
+    @staticmethod
+    def __check_doi_in_process__(doi: str) -> Dict[str, Any]:
+        """This runs the same logic as the check-doi endpoint"""
+        from src.models.api.job.check_doi_job import CheckDoiJob
+        from src.views.check_doi import CheckDoi
+
+        view = CheckDoi()
+        view.job = CheckDoiJob(doi=doi)
+        data, _ = view.__handle_valid_job__()
+        return data
+
     def __fetch_article__(self):
         from src import app
 
         app.logger.debug("__fetch_article__: running")
-        url = f"http://18.217.22.248/v2/statistics/article?url={self.__quote__(self.job.url)}&regex={self.__quote__(self.job.regex)}&refresh={self.job.refresh}"
+        if self.remote:
+            self.__fetch_article_remotely__()
+        else:
+            self.__fetch_article_in_process__()
+
+    def __fetch_article_in_process__(self):
+        """This runs the same logic as the article endpoint and keeps
+        the reference statistics if an analysis was done"""
+        from src import app
+        from src.views.statistics.article import Article
+
+        view = Article()
+        view.job = self.job
+        data, status_code = view.__handle_valid_job__()
+        if status_code == 200:
+            self.data = data
+            if view.wikipedia_analyzer:
+                self.analyzed_references = view.wikipedia_analyzer.reference_statistics
+            app.logger.info(
+                f"got article data with {self.number_of_references} references"
+            )
+        else:
+            app.logger.error(
+                f"Got status code {status_code} when "
+                "running the article analysis in-process"
+            )
+            self.error = True
+
+    def __fetch_article_remotely__(self):
+        from src import app
+
+        url = f"{self.remote_base_url}/statistics/article?url={self.__quote__(self.job.url)}&regex={self.__quote__(self.job.regex)}&refresh={self.job.refresh}"
         app.logger.debug(f"using url: {url}")
         response = requests.get(url)
         if response.status_code == 200:
@@ -0,0 +1,348 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from dateutil.parser import isoparse
+
+import config
+from src.models.api.job.article_job import ArticleJob
+from src.models.api.job.articles_job import ArticlesJob
+from src.models.base import WariBaseModel
+from src.models.exceptions import MissingInformationError, WikipediaApiFetchError
+from src.models.file_io.analysis_file_io import AnalysisFileIo
+from src.models.file_io.article_file_io import ArticleFileIo
+from src.models.file_io.references import ReferencesFileIo
+from src.models.file_io.title_file_io import TitleFileIo
+from src.models.file_io.wikitext_file_io import WikitextFileIo
+from src.models.wikimedia.enums import AnalyzerReturn
+from src.models.wikimedia.wikipedia.batch import WikipediaBatchQuery
+
+logger = logging.getLogger(__name__)
+
+# Our exceptions derive from BaseException so we list them explicitly
+ItemErrors = (Exception, MissingInformationError, WikipediaApiFetchError)
+
+
+def analyze_wikitext(
+    job: ArticleJob,
+    page_id: int,
+    revision_id: int,
+    revision_timestamp: str,
+    wikitext: str,
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Analyze one article and return the article and reference statistics
+
+    This runs in a worker process so it has to be a top-level function
+    and everything going in and out has to be picklable."""
+    from src.models.wikimedia.wikipedia.analyzer import WikipediaAnalyzer
+    from src.models.wikimedia.wikipedia.article import WikipediaArticle
+
+    article = WikipediaArticle(
+        job=job,
+        wikitext=wikitext,
+        page_id=page_id,
+        latest_revision_id=revision_id,
+        latest_revision_date=isoparse(revision_timestamp),
+        fetch_ores=False,
+        use_reference_memo=True,
+    )
+    article.fetch_and_extract_and_parse()
+    analyzer = WikipediaAnalyzer(job=job, article=article)
+    statistics = analyzer.get_statistics()
+    statistics["timestamp"] = int(datetime.timestamp(datetime.utcnow()))
+    statistics["isodate"] = str(datetime.isoformat(datetime.utcnow()))
+    return statistics, analyzer.reference_statistics
+
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Return the process pool of this worker and start it if needed
+
+    The worker already runs threads like the fetcher loop so the pool
+    processes are started by a forkserver. Forking a process with
+    running threads can deadlock on a lock one of them held."""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(
+                max_workers=config.bulk_max_processes or os.cpu_count(),
+                mp_context=multiprocessing.get_context("forkserver"),
+            )
+        return _process_pool
+
+
+class BulkArticle(WariBaseModel):
+    """The state of one article in a bulk request"""
+
+    url: str
+    job: Optional[ArticleJob] = None
+    revision_id: int = 0
+    status_code: int = 200
+    error: str = ""
+    served_from_cache: bool = False
+    statistics: Dict[str, Any] = {}
+
+    @property
+    def failed(self) -> bool:
+        return bool(self.error)
+
+    def fail(self, status_code: int, error: str) -> None:
+        self.status_code = status_code
+        self.error = error
+
+    def get_result(self, include_statistics: bool = False) -> Dict[str, Any]:
+        result: Dict[str, Any] = dict(url=self.url, status_code=self.status_code)
+        if self.failed:
+            result["error"] = self.error
+        else:
+            result["wari_id"] = self.statistics.get("wari_id", "")
+            result["served_from_cache"] = self.served_from_cache
+            if include_statistics:
+                result["statistics"] = self.statistics
+        return result
+
+
+class BulkArticleHandler(WariBaseModel):
+    """This analyzes many articles in one go
+
+    Titles and page ids are resolved and the wikitext is fetched with
+    batched action API queries per wiki. Articles already analyzed at their
+    latest revision with the same regex are served from the cache.
+    The rest are parsed in a process pool and written to the cache.
+    Every article gets its own result so one failure does not fail the batch."""
+
+    job: ArticlesJob
+    articles: List[BulkArticle] = []
+    # ORES scores by language code and revision id
+    ores_scores: Dict[Tuple[str, int], Dict[str, Any]] = {}
+
+    def analyze(self) -> List[Dict[str, Any]]:
+        self.articles = [self.__prepare__(url=url) for url in self.job.urls]
+        wikis: Dict[Tuple[str, str], List[BulkArticle]] = {}
+        for article in self.articles:
+            if not article.failed and article.job:
+                key = (article.job.lang, article.job.domain.value)
+                wikis.setdefault(key, []).append(article)
+        futures: List[Tuple[BulkArticle, Future]] = []
+        for articles in wikis.values():
+            try:
+                futures.extend(self.__fetch_and_submit__(articles=articles))
+            except ItemErrors as e:
+                logger.error(f"batch query failed, got {e!r}")
+                for article in articles:
+                    if not article.failed:
+                        article.fail(status_code=502, error=repr(e))
+        persisted = set()
+        for article, future in futures:
+            # the same page can be requested by more than one url
+            self.__collect__(
+                article=article, future=future, persist=future not in persisted
+            )
+            persisted.add(future)
+        return [
+            article.get_result(include_statistics=self.job.include_statistics)
+            for article in self.articles
+        ]
+
+    def __prepare__(self, url: str) -> BulkArticle:
+        article = BulkArticle(url=url)
+        job = ArticleJob(url=url, regex=self.job.regex, refresh=self.job.refresh)
+        job.validate_regex_and_extract_url()
+        if not job.title:
+            article.fail(status_code=400, error="Not a valid Wikipedia URL or regex")
+        else:
+            article.job = job
+        return article
+
+    def __fetch_and_submit__(
+        self, articles: List[BulkArticle]
+    ) -> List[Tuple[BulkArticle, Future]]:
+        """Resolve the titles of one wiki, serve what we can from
+        the cache and submit the rest to the process pool"""
+        first_job = articles[0].job
+        if not first_job:
+            raise MissingInformationError()
+        batch = WikipediaBatchQuery(lang=first_job.lang, domain=first_job.domain)
+        infos = batch.get_page_info(
+            titles=[article.job.title for article in articles if article.job]
+        )
+        to_analyze: Dict[int, List[BulkArticle]] = {}
+        for article in articles:
+            if not article.job:
+                continue
+            info = infos.get(article.job.title)
+            if not info or info.get("missing") or info.get("invalid"):
+                article.fail(status_code=404, error=AnalyzerReturn.NOT_FOUND.value)
+            elif info.get("redirect"):
+                article.fail(status_code=400, error=AnalyzerReturn.IS_REDIRECT.value)
+            else:
+                article.job.page_id = int(info["pageid"])
+                article.revision_id = int(info["lastrevid"])
+                TitleFileIo(
+                    lang=article.job.lang,
+                    domain=article.job.domain.value,
+                    title=article.job.title,
+                ).write_page_id(page_id=article.job.page_id)
+                if not self.__read_current_analysis__(article=article):
+                    to_analyze.setdefault(article.job.page_id, []).append(article)
+        revisions = self.__read_stored_revisions__(to_analyze=to_analyze)
+        page_ids = [page_id for page_id in to_analyze if page_id not in revisions]
+        if page_ids:
+            fetched = batch.get_revisions(page_ids=page_ids)
+            self.__store_revisions__(job=first_job, revisions=fetched)
+            revisions.update(fetched)
+        futures = []
+        for page_id, page_articles in to_analyze.items():
+            revision = revisions.get(page_id)
+            if not revision:
+                for article in page_articles:
+                    article.fail(status_code=404, error=AnalyzerReturn.NOT_FOUND.value)
+                continue
+            future = get_process_pool().submit(
+                analyze_wikitext,
+                job=page_articles[0].job,
+                page_id=page_id,
+                revision_id=int(revision["revid"]),
+                revision_timestamp=revision["timestamp"],
+                wikitext=revision["content"],
+            )
+            futures.extend((article, future) for article in page_articles)
+        # This runs while the pool parses the wikitext
+        self.__get_ores_scores__(
+            lang=first_job.lang,
+            revision_ids=[
+                int(revision["revid"])
+                for page_id, revision in revisions.items()
+                if page_id in to_analyze
+            ],
+        )
+        return futures
+
+    @staticmethod
+    def __wari_id__(job: ArticleJob, page_id: int) -> str:
+        return f"{job.lang}.{job.domain.value}.{page_id}"
+
+    def __read_stored_revisions__(
+        self, to_analyze: Dict[int, List[BulkArticle]]
+    ) -> Dict[int, Dict[str, Any]]:
+        """Return the revisions we already have the wikitext of
+        in the same format as the batch query"""
+        revisions = {}
+        for page_id, page_articles in to_analyze.items():
+            article = page_articles[0]
+            if not article.job:
+                continue
+            io = WikitextFileIo(
+                article_wari_id=self.__wari_id__(job=article.job, page_id=page_id),
+                revision_id=article.revision_id,
+            )
+            io.read_from_disk()
+            if io.data:
+                revisions[page_id] = dict(
+                    revid=io.data["revision_id"],
+                    timestamp=io.data["revision_timestamp"],
+                    content=io.data["wikitext"],
+                    title=io.data["title"],
+                )
+        return revisions
+
+    def __store_revisions__(
+        self, job: ArticleJob, revisions: Dict[int, Dict[str, Any]]
+    ) -> None:
+        if not config.store_wikitext or self.job.testing:
+            return
+        for page_id, revision in revisions.items():
+            WikitextFileIo(
+                article_wari_id=self.__wari_id__(job=job, page_id=page_id),
+                revision_id=int(revision["revid"]),
+                data=dict(
+                    title=revision.get("title", ""),
+                    page_id=page_id,
+                    revision_id=int(revision["revid"]),
+                    revision_timestamp=revision["timestamp"],
+                    wikitext=revision["content"],
+                ),
+            ).write_to_disk()
+
+    def __get_ores_scores__(self, lang: str, revision_ids: List[int]) -> None:
+        """Get the scores of all revisions of one wiki in batches.
+        The score is optional so failures are only logged"""
+        from src.models.wikimedia.ores import OresScoreCache
+
+        if not revision_ids:
+            return
+        try:
+            scores = OresScoreCache(wiki=f"{lang}wiki").get_scores(
+                revision_ids=revision_ids
+            )
+        except ItemErrors as e:
+            logger.warning(f"Skipping the ORES scores, got {e!r}")
+            return
+        for revision_id, score in scores.items():
+            self.ores_scores[(lang, revision_id)] = score
+
+    def __read_current_analysis__(self, article: BulkArticle) -> bool:
+        """Use the cached analysis if it was built from
+        the latest revision with the same regex"""
+        if self.job.refresh or not article.job:
+            return False
+        io = ArticleFileIo(job=article.job)
+        io.read_from_disk()
+        if (
+            io.data
+            and io.data.get("revision_id") == article.revision_id
+            and AnalysisFileIo.same_regex(io.data.get("regex", ""), article.job.regex)
+        ):
+            article.statistics = io.data
+            article.served_from_cache = True
+            return True
+        # The revision can have been analyzed with this regex before
+        analysis_io = AnalysisFileIo(
+            article_wari_id=self.__wari_id__(
+                job=article.job, page_id=article.job.page_id
+            ),
+            revision_id=article.revision_id,
+            regex=article.job.regex,
+        )
+        analysis_io.read_from_disk()
+        if analysis_io.data:
+            article.statistics = analysis_io.data
+            article.served_from_cache = True
+            return True
+        return False
+
+    def __collect__(self, article: BulkArticle, future: Future, persist: bool) -> None:
+        try:
+            statistics, reference_statistics = future.result()
+        except ItemErrors as e:
+            logger.error(f"analysis of {article.url} failed, got {e!r}")
+            article.fail(status_code=500, error=repr(e))
+            return
+        if not statistics:
+            # The analyzer returns nothing for redirects
+            article.fail(status_code=400, error=AnalyzerReturn.IS_REDIRECT.value)
+            return
+        if article.job:
+            statistics["ores_score"] = self.ores_scores.get(
+                (article.job.lang, statistics["revision_id"]), {}
+            )
+        article.statistics = statistics
+        if persist and not self.job.testing:
+            ArticleFileIo(
+                job=article.job, data=statistics, wari_id=statistics["wari_id"]
+            ).write_to_disk()
+            ReferencesFileIo(references=reference_statistics).write_references_to_disk()
+            if article.job:
+                AnalysisFileIo(
+                    article_wari_id=statistics["wari_id"],
+                    revision_id=statistics["revision_id"],
+                    regex=article.job.regex,
+                    data=statistics,
+                ).write_to_disk()
@@ -0,0 +1,202 @@
+import asyncio
+import atexit
+import logging
+import threading
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Set
+
+import aiohttp
+from pydantic import BaseModel
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+class FetchTask(BaseModel):
+    """This models one unit of work for the fetcher
+
+    Either url is fetched as json via the shared session
+    or function is run in a thread because it blocks."""
+
+    url: str = ""
+    function: Optional[Callable[[], Any]] = None
+    # The per-host limit is applied on this, None means no per-host limit
+    host: Optional[str] = None
+    # This is included in the result if the task fails
+    details: Dict[str, Any] = {}
+
+    def error_result(self, error: str) -> Dict[str, Any]:
+        return dict(self.details, error=error)
+
+
+class AsyncFetcher:
+    """This is a long-lived fetch engine with one event loop
+    running in a daemon thread for the whole life of the worker process.
+
+    All tasks share one aiohttp ClientSession with keep-alive,
+    a global concurrency limit and a per-host limit.
+    Every task has a timeout and failed tasks are returned as
+    error dictionaries so the patron gets partial results."""
+
+    def __init__(
+        self,
+        max_concurrency: int = config.fetcher_max_concurrency,
+        max_per_host: int = config.fetcher_max_per_host,
+        timeout: float = config.fetcher_timeout,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.loop = asyncio.new_event_loop()
+        # Every thread holds a slot of the semaphore so this never queues
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        # These timed out but their thread has not returned yet
+        self.abandoned: Set[asyncio.Future] = set()
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.semaphore: Optional[asyncio.Semaphore] = None
+        # Semaphores of hosts that have no tasks running are garbage collected
+        self.host_semaphores: weakref.WeakValueDictionary = (
+            weakref.WeakValueDictionary()
+        )
+        self.thread = threading.Thread(
+            target=self.loop.run_forever, name="fetcher", daemon=True
+        )
+        self.thread.start()
+
+    async def __setup__(self) -> None:
+        """The session and semaphores have to be created inside the loop"""
+        if not self.session:
+            # We limit per host ourselves on the host of the checked URL
+            # so the connector only gets the global limit
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+            self.session = aiohttp.ClientSession(connector=connector)
+            self.semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    def __get_host_semaphore__(self, host: str) -> asyncio.Semaphore:
+        semaphore = self.host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_per_host)
+            self.host_semaphores[host] = semaphore
+        return semaphore
+
+    async def __fetch_json__(self, url: str) -> Any:
+        if not self.session:
+            raise RuntimeError("the session has not been set up")
+        async with self.session.get(url) as response:
+            return await response.json()
+
+    async def __run__(self, task: FetchTask) -> Any:
+        if task.url:
+            return await self.__fetch_json__(url=task.url)
+        elif task.function:
+            return await self.loop.run_in_executor(self.executor, task.function)
+        else:
+            raise ValueError("the task has neither url nor function")
+
+    async def __run_task__(self, task: FetchTask) -> Any:
+        await self.__setup__()
+        if not self.semaphore:
+            raise RuntimeError("the semaphore has not been set up")
+        semaphores = [self.semaphore]
+        if task.host:
+            # We keep a reference while running so it is not garbage collected
+            semaphores.append(self.__get_host_semaphore__(host=task.host))
+        acquired: List[asyncio.Semaphore] = []
+        try:
+            for semaphore in semaphores:
+                await semaphore.acquire()
+                acquired.append(semaphore)
+            running = asyncio.ensure_future(self.__run__(task))
+        except BaseException:
+            for semaphore in acquired:
+                semaphore.release()
+            raise
+        # The slots are released when the work is really done, see below
+        running.add_done_callback(partial(self.__release__, semaphores))
+        if not task.function:
+            # Cancelling the request on timeout closes the connection
+            return await asyncio.wait_for(running, self.timeout)
+        # A thread cannot be cancelled so a function that times out keeps
+        # running and holds its slots until it returns. This way there are
+        # never more threads than max_concurrency and new tasks are not
+        # queued in the executor behind abandoned ones.
+        try:
+            return await asyncio.wait_for(asyncio.shield(running), self.timeout)
+        except asyncio.TimeoutError:
+            if not running.done():
+                self.abandoned.add(running)
+                running.add_done_callback(self.abandoned.discard)
+                logger.warning(
+                    f"{len(self.abandoned)} timed out tasks are still running"
+                )
+            raise
+
+    @staticmethod
+    def __release__(
+        semaphores: List[asyncio.Semaphore], running: asyncio.Future
+    ) -> None:
+        for semaphore in semaphores:
+            semaphore.release()
+        if not running.cancelled() and running.exception():
+            # Nobody waits for an abandoned task so we retrieve the error here
+            logger.debug(f"Task failed: {running.exception()!r}")
+
+    def submit(self, task: FetchTask) -> Future:
+        """Submit a task from any thread and get a concurrent future back"""
+        return asyncio.run_coroutine_threadsafe(self.__run_task__(task), self.loop)
+
+    @staticmethod
+    def result_of(task: FetchTask, future: Future) -> Any:
+        """Return the result or an error dictionary if the task failed"""
+        try:
+            return future.result()
+        except asyncio.TimeoutError:
+            logger.warning(f"Task timed out: {task.details}")
+            return task.error_result(error="timeout")
+        except Exception as e:  # noqa: BLE001
+            logger.warning(f"Task failed: {task.details}, got {e!r}")
+            return task.error_result(error=repr(e))
+
+    def fetch_all(self, tasks: List[FetchTask]) -> List[Any]:
+        """Run all tasks and return the results in the same order"""
+        futures = [self.submit(task) for task in tasks]
+        wait(futures)
+        return [
+            self.result_of(task=task, future=future)
+            for task, future in zip(tasks, futures)
+        ]
+
+    async def __cancel_abandoned__(self) -> None:
+        """Stop waiting for threads that will not be waited for anyway"""
+        abandoned = list(self.abandoned)
+        for running in abandoned:
+            running.cancel()
+        await asyncio.gather(*abandoned, return_exceptions=True)
+
+    def close(self) -> None:
+        if self.session:
+            asyncio.run_coroutine_threadsafe(self.session.close(), self.loop).result()
+        asyncio.run_coroutine_threadsafe(
+            self.__cancel_abandoned__(), self.loop
+        ).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.executor.shutdown(wait=False)
+
+
+_fetcher: Optional[AsyncFetcher] = None
+_fetcher_lock = threading.Lock()
+
+
+def get_fetcher() -> AsyncFetcher:
+    """Return the fetcher of this worker process and start it if needed
+
+    It is started lazily so gunicorn workers get their own after forking."""
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is None:
+            _fetcher = AsyncFetcher()
+            atexit.register(_fetcher.close)
+        return _fetcher
@@ -0,0 +1,8 @@
+from src.models.api.job.article_job import ArticleJob
+
+
+class AllJob(ArticleJob):
+    """The all-endpoint supports the same parameters as the article-endpoint
+    and can additionally stream its output"""
+
+    stream: str = ""
@@ -26,6 +26,12 @@ class ArticleJob(Job):
             raise MissingInformationError("self.title was empty")
         return quote(self.title, safe="")
 
+    @property
+    def __title_file_io__(self):
+        from src.models.file_io.title_file_io import TitleFileIo
+
+        return TitleFileIo(lang=self.lang, domain=self.domain.value, title=self.title)
+
     def get_page_id(self) -> None:
         from src import app
 
@@ -33,6 +39,10 @@ class ArticleJob(Job):
         if not self.page_id:
             if not self.lang or not self.title or not self.domain:
                 raise MissingInformationError()
+            self.page_id = self.__title_file_io__.read_page_id()
+            if self.page_id:
+                app.logger.debug("Got page id from the title index")
+                return
             # https://stackoverflow.com/questions/31683508/wikipedia-mediawiki-api-get-pageid-from-url
             url = (
                 f"https://{self.lang}.{self.domain.value}/"
@@ -52,6 +62,9 @@ class ArticleJob(Job):
                             if page:
                                 app.logger.info("Got page id")
                                 self.page_id = int(page)
+                                self.__title_file_io__.write_page_id(
+                                    page_id=self.page_id
+                                )
             elif response.status_code == 404:
                 app.logger.error(
                     f"Could not fetch page data from {self.domain} because of 404. See {url}"
@@ -61,6 +74,47 @@ class ArticleJob(Job):
                     f"Could not fetch page data. Got {response.status_code} from {url}"
                 )
 
+    def __check_page_id__(self, page_id: int) -> None:
+        """The page id from the title index can be outdated after a page
+        move so we correct it with the page id of the latest revision"""
+        from src import app
+
+        if page_id and page_id != self.page_id:
+            if self.page_id:
+                app.logger.info(
+                    f"{self.title} is now page {page_id} instead of {self.page_id}"
+                )
+            self.page_id = page_id
+            self.__title_file_io__.write_page_id(page_id=page_id)
+
+    def get_latest_revision_id(self) -> int:
+        """Get only the id of the latest revision which is
+        a lot cheaper than fetching the wikitext. Returns 0 if not found"""
+        from src import app
+
+        app.logger.debug("get_latest_revision_id: running")
+        if not self.lang or not self.title or not self.domain:
+            raise MissingInformationError()
+        url = (
+            f"https://{self.lang}.{self.domain.value}/"
+            f"w/rest.php/v1/page/{self.quoted_title}/bare"
+        )
+        headers = {"User-Agent": config.user_agent}
+        response = requests.get(url, headers=headers)
+        if response.status_code == 200:
+            data = response.json()
+            self.__check_page_id__(page_id=int(data.get("id", 0)))
+            return int(data["latest"]["id"])
+        elif response.status_code == 404:
+            app.logger.error(
+                f"Could not fetch the latest revision from {self.domain} because of 404. See {url}"
+            )
+            return 0
+        else:
+            raise WikipediaApiFetchError(
+                f"Could not fetch the latest revision. Got {response.status_code} from {url}"
+            )
+
     def __urldecode_url__(self):
         """We decode the title to have a human readable string to pass around"""
         self.url = unquote(self.url)
@@ -0,0 +1,11 @@
+from typing import List
+
+from src.models.api.job import Job
+
+
+class ArticlesJob(Job):
+    """A job with many articles to analyze in one request"""
+
+    urls: List[str]
+    regex: str
+    include_statistics: bool = False
@@ -1,3 +1,5 @@
+from typing import List
+
 from src.models.api.job import Job
 
 
@@ -6,3 +8,5 @@ class ReferencesJob(Job):
     all: bool = False
     chunk_size: int = 10
     offset: int = 0
+    # Reference ids to look up in one batch
+    ids: List[str] = []
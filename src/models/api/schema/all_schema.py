@@ -0,0 +1,25 @@
+import logging
+
+from marshmallow import fields, post_load
+from marshmallow.validate import OneOf
+
+from src.models.api.job.all_job import AllJob
+from src.models.api.schema.article_schema import ArticleSchema
+
+logger = logging.getLogger(__name__)
+
+
+class AllSchema(ArticleSchema):
+    stream = fields.Str(required=False, validate=OneOf(["ndjson"]))
+
+    # noinspection PyUnusedLocal
+    @post_load
+    # **kwargs is needed here despite what the validator claims
+    def return_object(self, data, **kwargs) -> AllJob:  # type: ignore # dead: disable
+        """Return job object"""
+        from src import app
+
+        app.logger.debug("return_object: running")
+        job = AllJob(**data)
+        job.validate_regex_and_extract_url()
+        return job
@@ -0,0 +1,32 @@
+import logging
+
+from marshmallow import fields, post_load
+from marshmallow.validate import Length
+
+import config
+from src.models.api.job.articles_job import ArticlesJob
+from src.models.api.schema.refresh import BaseSchema
+
+logger = logging.getLogger(__name__)
+
+
+class ArticlesSchema(BaseSchema):
+    """This validates the json body of the bulk article request"""
+
+    urls = fields.List(
+        fields.Str(),
+        required=True,
+        validate=Length(min=1, max=config.bulk_max_articles),
+    )
+    regex = fields.Str(required=True)
+    include_statistics = fields.Bool(required=False)
+
+    # noinspection PyUnusedLocal
+    @post_load
+    # **kwargs is needed here despite what the validator claims
+    def return_object(self, data, **kwargs) -> ArticlesJob:  # type: ignore # dead: disable
+        """Return job object"""
+        from src import app
+
+        app.logger.debug("return_object: running")
+        return ArticlesJob(**data)
@@ -15,6 +15,8 @@ class ReferencesSchema(Schema):
     wari_id = String()
     chunk_size = Int()
     all = Bool()
+    # A comma separated list of reference ids
+    ids = String()
 
     # noinspection PyUnusedLocal
     @post_load
@@ -24,5 +26,7 @@ class ReferencesSchema(Schema):
         from src import app
 
         app.logger.debug("return_object: running")
+        if "ids" in data:
+            data["ids"] = [id_ for id_ in data["ids"].split(",") if id_]
         job = ReferencesJob(**data)
         return job
@@ -25,6 +25,13 @@ class ArticleStatistics(BaseModel):
     fld_counts: Dict[str, int] = {}
     urls: List[str] = []
     ores_score: Any = {}
+    revision_id: int = 0  # the revision the analysis was built from
+    regex: str = ""  # the section regex the analysis was built with
+    sections: List[Dict[str, Any]] = []  # [{name, hash, reference_ids}]
+    recomputed_sections: List[str] = []  # names of the sections not reused
+    # number of references reused from unchanged sections, taken from
+    # the reference memo and extracted, e.g. {sections, memo, extracted}
+    reference_reuse: Dict[str, int] = {}
 
     class Config:  # dead: disable
         extra = Extra.forbid  # dead: disable
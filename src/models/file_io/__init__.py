@@ -1,11 +1,14 @@
-import json
 import logging
-from os.path import exists
+import os
+from hashlib import md5
+from os.path import dirname
 from typing import Any, Dict, Optional
 
 import config
 from src.models.api.job import Job
 from src.models.base import WariBaseModel
+from src.models.file_io import codec
+from src.models.file_io.read_cache import get_read_cache
 
 logger = logging.getLogger(__name__)
 
@@ -22,21 +25,63 @@ class FileIo(WariBaseModel):
         return f"{self.wari_id}.json"
 
     @property
-    def path_filename(self) -> str:
-        from src import app
+    def key(self) -> str:
+        """The key in the sqlite backend is the filename without suffix"""
+        return self.filename[: -len(".json")]
+
+    @property
+    def use_sqlite(self) -> bool:
+        return config.storage_backend == "sqlite"
+
+    @property
+    def shard_key(self) -> str:
+        """The hex string the shard directories are taken from"""
+        return md5(self.filename.encode()).hexdigest()
 
+    @property
+    def shard_directory(self) -> str:
+        """E.g. "ab/cd/" with a depth of 2 and a width of 2
+        and an empty string with the flat layout"""
+        width = config.json_shard_width
+        return "".join(
+            f"{self.shard_key[level * width:(level + 1) * width]}/"
+            for level in range(config.json_shard_depth)
+        )
+
+    @property
+    def directory(self) -> str:
         if self.testing:
             # go out to repo root first
             # print(os.getcwd())
             # we hard code the json directory for now
-            path_filename = f"/home/dpriskorn/src/python/wcdimportbot/{config.subdirectory_for_json}{self.subfolder}{self.filename}"
+            return f"/home/dpriskorn/src/python/wcdimportbot/{config.subdirectory_for_json}{self.subfolder}"
         else:
-            path_filename = (
-                f"{config.subdirectory_for_json}{self.subfolder}{self.filename}"
-            )
+            return f"{config.subdirectory_for_json}{self.subfolder}"
+
+    @property
+    def path_filename(self) -> str:
+        from src import app
+
+        path_filename = f"{self.directory}{self.shard_directory}{self.filename}"
         app.logger.debug(f"using path: {path_filename}")
         return path_filename
 
+    @property
+    def flat_path_filename(self) -> str:
+        """This is where the file was stored before sharding"""
+        return f"{self.directory}{self.filename}"
+
+    def __read_json__(self) -> Optional[Dict[str, Any]]:
+        """Return the json of the file or None if it is missing or broken
+
+        We fall back to the flat layout so files that
+        have not been migrated yet are still found"""
+        read_cache = get_read_cache()
+        data = read_cache.read(self.path_filename)
+        if data is None and self.shard_directory:
+            data = read_cache.read(self.flat_path_filename)
+        return data
+
     def write_to_disk(
         self,
     ) -> None:
@@ -44,19 +89,18 @@ class FileIo(WariBaseModel):
 
         app.logger.debug("write_to_disk: running")
         # app.logger.debug(os.getcwd())
-        if self.data:
+        if self.data and self.use_sqlite:
+            from src.models.file_io.sqlite_store import get_store
+
+            get_store().write(subfolder=self.subfolder, key=self.key, data=self.data)
+        elif self.data:
             path_filename = self.path_filename
-            if exists(path_filename):
-                with open(file=path_filename, mode="w") as file:
-                    app.logger.debug("overwriting existing file")
-                    # https://stackoverflow.com/questions/12309269/how-do-i-write-json-data-to-a-file
-                    json.dump(self.data, file, ensure_ascii=False, indent=4)
-            else:
-                # x = create and write
-                with open(file=path_filename, mode="x") as file:
-                    app.logger.debug("writing to new file")
-                    # https://stackoverflow.com/questions/12309269/how-do-i-write-json-data-to-a-file
-                    json.dump(self.data, file, ensure_ascii=False, indent=4)
+            if self.shard_directory:
+                os.makedirs(dirname(path_filename), exist_ok=True)
+            # This is atomic so concurrent writers of the same file
+            # cannot fail or leave a half-written file behind
+            plain = codec.write_atomically(path_filename=path_filename, data=self.data)
+            get_read_cache().write_through(path_filename=path_filename, plain=plain)
         else:
             app.logger.info("Skipping write because self.data is empty")
 
@@ -66,14 +110,21 @@ class FileIo(WariBaseModel):
         message = "read_from_disk: running"
         app.logger.debug(message)
         app.logger.debug(message)
-        path_filename = self.path_filename
-        if exists(path_filename):
-            with open(file=path_filename) as file:
-                # logger.debug("loading json into self.data")
-                app.logger.debug("loading json into self.data")
-                self.data = json.load(file)
+        if self.use_sqlite:
+            from src.models.file_io.sqlite_store import get_store
+
+            data = get_store().read(subfolder=self.subfolder, key=self.key)
+            if data:
+                self.data = data
                 self.data["served_from_cache"] = True
-                # app.logger.debug(f"loaded: {self.statistics_dictionary}")
+            else:
+                app.logger.debug("no json in the database")
+            return
+        data = self.__read_json__()
+        if data:
+            app.logger.debug("loading json into self.data")
+            self.data = data
+            self.data["served_from_cache"] = True
         else:
             logger.debug("no json on disk")
             app.logger.debug("no json on disk")
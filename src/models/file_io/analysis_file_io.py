@@ -0,0 +1,42 @@
+import logging
+import re
+from hashlib import md5
+from typing import Any, Dict
+
+from src.models.file_io import FileIo
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisFileIo(FileIo):
+    """This stores the article statistics of one revision analyzed
+    with one section regex, e.g. en.wikipedia.org.1234.1143480404.5d41402a
+
+    The last part is the md5 of the normalized regex because the regex
+    decides which sections have general references."""
+
+    data: Dict[str, Any] = dict()
+    subfolder = "analyses/"
+    article_wari_id: str = ""
+    revision_id: int = 0
+    regex: str = ""
+
+    def __init__(self, **data):
+        super().__init__(**data)
+        if not self.wari_id:
+            regex_hash = md5(self.normalize_regex(self.regex).encode()).hexdigest()
+            self.wari_id = f"{self.article_wari_id}.{self.revision_id}.{regex_hash[:8]}"
+
+    @staticmethod
+    def normalize_regex(regex: str) -> str:
+        """The section names are matched case-insensitively so "Sources|notes"
+        and "notes|sources" are the same regex. A regex with escapes or
+        other metacharacters is left exactly as given because e.g.
+        lowercasing \\S would turn it into \\s"""
+        if re.search(r"[\\.^$*+?{}\[\]()]", regex):
+            return regex
+        return "|".join(sorted(set(regex.lower().split("|"))))
+
+    @classmethod
+    def same_regex(cls, first: str, second: str) -> bool:
+        return cls.normalize_regex(first) == cls.normalize_regex(second)
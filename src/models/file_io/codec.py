@@ -0,0 +1,148 @@
+"""Encoding, decoding and atomic writing of the json in the cache
+
+orjson is used if it is installed and enabled in config.py
+because it is a lot faster than the json module in the standard library.
+
+Files can be compressed with gzip or zstd. The format is detected from
+the first bytes when reading so compressed and plain files can coexist
+under the same filename while the setting is rolled out."""
+
+import gzip
+import json
+import logging
+import os
+import tempfile
+from os.path import basename, dirname
+from typing import Any, Optional
+
+import config
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    orjson = None
+try:
+    import zstandard  # type: ignore
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def use_orjson() -> bool:
+    return bool(orjson) and config.json_use_orjson
+
+
+def dumps(data: Any) -> bytes:
+    """Encode to compact UTF-8 json unless an indent is configured"""
+    if use_orjson():
+        option = orjson.OPT_INDENT_2 if config.json_indent else 0
+        return orjson.dumps(data, option=option)
+    if config.json_indent:
+        text = json.dumps(data, ensure_ascii=False, indent=config.json_indent)
+    else:
+        text = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    return text.encode()
+
+
+def loads(data: bytes) -> Any:
+    if use_orjson():
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def compress(data: bytes) -> bytes:
+    if config.json_compression == "zstd":
+        if zstandard:
+            return zstandard.ZstdCompressor(
+                level=config.json_compression_level
+            ).compress(data)
+        logger.warning("zstandard is not installed, using gzip instead")
+        return gzip.compress(data, compresslevel=config.json_compression_level)
+    elif config.json_compression == "gzip":
+        return gzip.compress(data, compresslevel=config.json_compression_level)
+    elif config.json_compression:
+        raise ValueError(f"unknown json_compression: {config.json_compression}")
+    return data
+
+
+def decompress(data: bytes) -> bytes:
+    """Detect the format from the magic bytes so any file can be read
+    no matter what the current setting is"""
+    if data.startswith(GZIP_MAGIC):
+        return gzip.decompress(data)
+    elif data.startswith(ZSTD_MAGIC):
+        if not zstandard:
+            raise ValueError(
+                "the file is zstd compressed but zstandard is not installed"
+            )
+        return zstandard.ZstdDecompressor().decompress(data)
+    return data
+
+
+def encode(data: Any) -> bytes:
+    return compress(dumps(data))
+
+
+def decode(data: bytes) -> Any:
+    return loads(decompress(data))
+
+
+def write_atomically(path_filename: str, data: Any) -> bytes:
+    """Write to a temporary file in the same directory and rename it
+    so readers see either the old or the new file but never a partial one
+
+    The uncompressed json is returned for the read cache"""
+    plain = dumps(data)
+    directory = dirname(path_filename) or "."
+    file_descriptor, temporary_path_filename = tempfile.mkstemp(
+        dir=directory, prefix=f".{basename(path_filename)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(file_descriptor, "wb") as file:
+            file.write(compress(plain))
+            if config.json_fsync:
+                file.flush()
+                os.fsync(file.fileno())
+        # mkstemp creates the file readable only by us
+        os.chmod(temporary_path_filename, 0o644)
+        os.replace(temporary_path_filename, path_filename)
+    except BaseException:
+        os.remove(temporary_path_filename)
+        raise
+    return plain
+
+
+def read_plain(path_filename: str) -> Optional[bytes]:
+    """Return the uncompressed json or None if the file is missing
+    or cannot be decompressed"""
+    try:
+        with open(file=path_filename, mode="rb") as file:
+            return decompress(file.read())
+    except FileNotFoundError:
+        return None
+    except (ValueError, EOFError, OSError) as e:
+        logger.warning(f"ignoring broken json in {path_filename}, got {e}")
+        return None
+
+
+def loads_or_none(plain: bytes, path_filename: str) -> Optional[Any]:
+    try:
+        return loads(plain)
+    except ValueError as e:
+        logger.warning(f"ignoring broken json in {path_filename}, got {e}")
+        return None
+
+
+def read(path_filename: str) -> Optional[Any]:
+    """Return the decoded json or None if the file is missing or broken
+
+    A broken file can be left over from before writes were atomic
+    and we treat it as a cache miss so it gets written again."""
+    plain = read_plain(path_filename)
+    if plain is None:
+        return None
+    return loads_or_none(plain=plain, path_filename=path_filename)
@@ -12,3 +12,16 @@ class HashBasedFileIo(FileIo):
             raise MissingInformationError("no hash based id")
         else:
             return f"{self.hash_based_id}.json"
+
+    @property
+    def shard_key(self) -> str:
+        """The id is already a hex hash so we shard on it directly"""
+        if not self.hash_based_id:
+            raise MissingInformationError("no hash based id")
+        return self.hash_based_id
+
+    @property
+    def key(self) -> str:
+        if not self.hash_based_id:
+            raise MissingInformationError("no hash based id")
+        return self.hash_based_id
@@ -0,0 +1,23 @@
+import logging
+from typing import Any, Dict
+
+from src.models.file_io import FileIo
+
+logger = logging.getLogger(__name__)
+
+
+class OresFileIo(FileIo):
+    """This stores the ORES article quality score of one revision
+
+    The score of a revision never changes so it is stored by the wiki
+    and revision id, e.g. enwiki.1143480404"""
+
+    data: Dict[str, Any] = dict()
+    subfolder = "ores/"
+    wiki: str = ""
+    revision_id: int = 0
+
+    def __init__(self, **data):
+        super().__init__(**data)
+        if not self.wari_id:
+            self.wari_id = f"{self.wiki}.{self.revision_id}"
@@ -0,0 +1,130 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import config
+from src.models.file_io import codec
+
+logger = logging.getLogger(__name__)
+
+# mtime in nanoseconds, size and inode. A replaced file gets a new inode
+# so a write by another worker is noticed even within the mtime granularity
+Signature = Tuple[int, int, int]
+
+
+class ReadCache:
+    """This is a bounded LRU cache of the uncompressed json keyed by path
+
+    Every lookup costs one stat() call which is compared to the signature
+    of the file when it was cached, so files changed by other workers
+    are read again. Writes in this worker update the cache directly.
+
+    A hit saves opening, reading and decompressing the file. The json is
+    decoded on every hit so callers get their own objects which they can
+    change freely. The cache is bounded by the sum of the json sizes."""
+
+    def __init__(self, max_bytes: int = config.read_cache_max_bytes):
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[str, Tuple[Signature, bytes]]" = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def __signature__(path_filename: str) -> Optional[Signature]:
+        try:
+            stat = os.stat(path_filename)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def __remove__(self, path_filename: str) -> None:
+        entry = self.entries.pop(path_filename, None)
+        if entry:
+            self.bytes -= len(entry[1])
+
+    def __store__(self, path_filename: str, signature: Signature, plain: bytes) -> None:
+        size = len(plain)
+        with self.lock:
+            self.__remove__(path_filename)
+            if size > self.max_bytes:
+                return
+            self.entries[path_filename] = (signature, plain)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                oldest = next(iter(self.entries))
+                self.__remove__(oldest)
+                self.evictions += 1
+
+    def read(self, path_filename: str) -> Optional[Dict[str, Any]]:
+        """Return the json in the file or None if it is missing or broken"""
+        if not self.max_bytes:
+            return codec.read(path_filename)
+        signature = self.__signature__(path_filename)
+        if signature is None:
+            with self.lock:
+                self.__remove__(path_filename)
+            return None
+        with self.lock:
+            entry = self.entries.get(path_filename)
+            if entry and entry[0] == signature:
+                self.entries.move_to_end(path_filename)
+                self.hits += 1
+                plain = entry[1]
+            else:
+                plain = None
+                self.misses += 1
+        if plain is not None:
+            return codec.loads(plain)
+        plain = codec.read_plain(path_filename)
+        if plain is None:
+            return None
+        data = codec.loads_or_none(plain=plain, path_filename=path_filename)
+        if data is not None:
+            self.__store__(
+                path_filename=path_filename, signature=signature, plain=plain
+            )
+        return data
+
+    def write_through(self, path_filename: str, plain: bytes) -> None:
+        """Cache the json we just wrote so the next read does not
+        read or decompress the file"""
+        if not self.max_bytes:
+            return
+        signature = self.__signature__(path_filename)
+        if signature:
+            self.__store__(
+                path_filename=path_filename, signature=signature, plain=plain
+            )
+
+    @property
+    def statistics(self) -> Dict[str, Any]:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return dict(
+                entries=len(self.entries),
+                bytes=self.bytes,
+                max_bytes=self.max_bytes,
+                hits=self.hits,
+                misses=self.misses,
+                evictions=self.evictions,
+                hit_ratio=round(self.hits / lookups, 3) if lookups else 0,
+                pid=os.getpid(),
+            )
+
+
+_read_cache: Optional[ReadCache] = None
+_read_cache_lock = threading.Lock()
+
+
+def get_read_cache() -> ReadCache:
+    """Return the read cache of this worker process"""
+    global _read_cache
+    with _read_cache_lock:
+        if _read_cache is None:
+            _read_cache = ReadCache()
+        return _read_cache
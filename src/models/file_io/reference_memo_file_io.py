@@ -0,0 +1,15 @@
+import logging
+from typing import Any, Dict
+
+from src.models.file_io.hash_based import HashBasedFileIo
+
+logger = logging.getLogger(__name__)
+
+
+class ReferenceMemoFileIo(HashBasedFileIo):
+    """This stores the statistic of a reference by the md5 of its
+    wikitext, type and language so identical references in other
+    articles are not extracted again"""
+
+    data: Dict[str, Any] = dict()
+    subfolder = "reference_memos/"
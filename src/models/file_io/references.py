@@ -1,5 +1,6 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
+import config
 from src.helpers.console import console
 from src.models.exceptions import MissingInformationError
 from src.models.file_io import FileIo
@@ -8,11 +9,30 @@ from src.models.file_io.reference_file_io import ReferenceFileIo
 
 class ReferencesFileIo(FileIo):
     references: List[Dict[str, Any]] = []
+    subfolder = "references/"
 
     def write_references_to_disk(self):
         from src import app
 
         app.logger.debug("writing references to disk")
+        self.__check_ids__()
+        if self.use_sqlite:
+            from src.models.file_io.sqlite_store import get_store
+
+            # one transaction for the whole article
+            get_store().write_many(
+                subfolder=self.subfolder,
+                items=[(reference["id"], reference) for reference in self.references],
+            )
+        else:
+            for reference in self.references:
+                reference_io = ReferenceFileIo(
+                    job=self.job, hash_based_id=reference["id"], data=reference
+                )
+                reference_io.write_to_disk()
+        app.logger.debug(f"wrote {len(self.references)} references to disk")
+
+    def __check_ids__(self):
         for reference in self.references:
             # this is a dict
             if "id" not in reference:
@@ -21,10 +41,41 @@ class ReferencesFileIo(FileIo):
             if not reference["id"]:
                 console.print(reference)
                 raise MissingInformationError("empty id found in reference")
-            # if "wikitext" in reference:
-            # app.logger.debug(reference)
-            reference_io = ReferenceFileIo(
-                job=self.job, hash_based_id=reference["id"], data=reference
+
+    @staticmethod
+    def read_references_from_disk(
+        ids: List[str],
+    ) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """Read many references in one pass over the id set
+
+        Returns the references found in the same order as the ids
+        and the ids that were not found in the cache"""
+        from src import app
+
+        app.logger.debug(f"reading {len(ids)} references from disk")
+        if config.storage_backend == "sqlite":
+            from src.models.file_io.sqlite_store import get_store
+
+            found = get_store().read_many(
+                subfolder=ReferencesFileIo().subfolder, keys=ids
             )
-            reference_io.write_to_disk()
-        app.logger.debug(f"wrote {len(self.data)} references to disk")
+            for data in found.values():
+                data["served_from_cache"] = True
+            missing = [id_ for id_ in dict.fromkeys(ids) if id_ not in found]
+            references = [found[id_] for id_ in ids if id_ in found]
+            return references, missing
+        found = {}
+        missing = []
+        # Every file is read once even if an id occurs more than once
+        for reference_id in dict.fromkeys(ids):
+            if not reference_id:
+                raise MissingInformationError("empty id found in ids")
+            data = ReferenceFileIo(hash_based_id=reference_id).__read_json__()
+            if data:
+                data["served_from_cache"] = True
+                found[reference_id] = data
+            else:
+                missing.append(reference_id)
+        references = [found[id_] for id_ in ids if id_ in found]
+        app.logger.debug(f"found {len(references)} references on disk")
+        return references, missing
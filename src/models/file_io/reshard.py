@@ -0,0 +1,132 @@
+import argparse
+import logging
+import os
+from os.path import dirname, exists, join
+from typing import Dict, List, Type
+
+from pydantic import BaseModel
+
+import config
+from src.models.file_io import FileIo
+from src.models.file_io.analysis_file_io import AnalysisFileIo
+from src.models.file_io.article_file_io import ArticleFileIo
+from src.models.file_io.doi_file_io import DoiFileIo
+from src.models.file_io.hash_based import HashBasedFileIo
+from src.models.file_io.ores_file_io import OresFileIo
+from src.models.file_io.pdf_file_io import PdfFileIo
+from src.models.file_io.reference_file_io import ReferenceFileIo
+from src.models.file_io.reference_memo_file_io import ReferenceMemoFileIo
+from src.models.file_io.title_file_io import TitleFileIo
+from src.models.file_io.url_file_io import UrlFileIo
+from src.models.file_io.wikitext_file_io import WikitextFileIo
+from src.models.file_io.xhtml_file_io import XhtmlFileIo
+
+logger = logging.getLogger(__name__)
+
+# These are all the types of json we store in the cache
+cache_file_io_classes: List[Type[FileIo]] = [
+    ArticleFileIo,
+    ReferenceFileIo,
+    UrlFileIo,
+    DoiFileIo,
+    PdfFileIo,
+    XhtmlFileIo,
+    TitleFileIo,
+    OresFileIo,
+    WikitextFileIo,
+    AnalysisFileIo,
+    ReferenceMemoFileIo,
+]
+
+
+class JsonCacheResharder(BaseModel):
+    """This moves every json file in the cache to the path
+    given by the shard settings in config.py
+
+    It is safe to run while the API is serving because every file is moved
+    atomically and a file that the API has already written to the new
+    path is never overwritten by the old copy."""
+
+    file_io_classes: List[Type[FileIo]] = cache_file_io_classes
+    dry_run: bool = False
+    moved: int = 0
+    removed: int = 0
+    skipped: int = 0
+
+    @staticmethod
+    def __setup_argparse_and_return_args__():
+        parser = argparse.ArgumentParser(
+            formatter_class=argparse.RawDescriptionHelpFormatter,
+            description=f"""
+Move the json cache in {config.subdirectory_for_json} to the layout
+given by json_shard_depth and json_shard_width in config.py.
+
+Example:
+'$ python reshard_json_cache.py --dry-run'""",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only log what would be moved",
+        )
+        return parser.parse_args()
+
+    @staticmethod
+    def __get_file_io__(file_io_class: Type[FileIo], stem: str) -> FileIo:
+        if issubclass(file_io_class, HashBasedFileIo):
+            return file_io_class(hash_based_id=stem)
+        else:
+            return file_io_class(wari_id=stem)
+
+    def __move__(self, source: str, target: str) -> None:
+        if self.dry_run:
+            logger.info(f"would move {source} to {target}")
+            self.moved += 1
+            return
+        os.makedirs(dirname(target), exist_ok=True)
+        try:
+            # link fails if the target exists so we never
+            # overwrite a file written by the API in the meantime
+            os.link(source, target)
+        except FileExistsError:
+            logger.debug(f"{target} exists already, removing {source}")
+            os.remove(source)
+            self.removed += 1
+        else:
+            os.remove(source)
+            self.moved += 1
+
+    def reshard_subfolder(self, file_io_class: Type[FileIo]) -> None:
+        subfolder = file_io_class.__fields__["subfolder"].default
+        directory = f"{config.subdirectory_for_json}{subfolder}"
+        if not exists(directory):
+            logger.info(f"skipping {directory} because it does not exist")
+            return
+        logger.info(f"resharding {directory}")
+        # we list everything first because we add directories while moving
+        paths: Dict[str, str] = {}
+        for root, _, filenames in os.walk(directory):
+            for filename in filenames:
+                if filename.endswith(".json"):
+                    paths[join(root, filename)] = filename[: -len(".json")]
+        for source, stem in paths.items():
+            target = self.__get_file_io__(
+                file_io_class=file_io_class, stem=stem
+            ).path_filename
+            if os.path.normpath(source) == os.path.normpath(target):
+                self.skipped += 1
+            else:
+                self.__move__(source=source, target=target)
+
+    def reshard(self) -> None:
+        for file_io_class in self.file_io_classes:
+            self.reshard_subfolder(file_io_class=file_io_class)
+        logger.info(
+            f"moved {self.moved}, removed {self.removed} "
+            f"and skipped {self.skipped} files"
+        )
+
+    def run(self) -> None:
+        args = self.__setup_argparse_and_return_args__()
+        self.dry_run = args.dry_run
+        self.reshard()
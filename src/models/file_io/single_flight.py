@@ -0,0 +1,88 @@
+import fcntl
+import logging
+import os
+import time
+from datetime import datetime
+from hashlib import md5
+from typing import IO, Any, Callable, Optional
+
+from pydantic import BaseModel
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight(BaseModel):
+    """This makes sure only one worker process computes the result
+    for a cache key at a time
+
+    The leader holds an exclusive flock on a lock file for the key while
+    computing. The other workers wait for the lock and then return what the
+    leader wrote to the cache if it was written after they started.
+    The kernel releases the lock if the leader dies and a follower that
+    waited longer than the timeout computes the result itself.
+
+    Keys are spread over a fixed number of lock files. A worker waiting
+    on the lock of another key finds no result afterwards and computes
+    its own, so a shared lock file only delays it."""
+
+    timeout: float = config.single_flight_timeout
+    poll_interval: float = config.single_flight_poll_interval
+    stripes: int = config.single_flight_lock_stripes
+
+    @property
+    def directory(self) -> str:
+        return f"{config.subdirectory_for_json}locks/"
+
+    def lock_path(self, key: str) -> str:
+        stripe = int(md5(key.encode()).hexdigest(), 16) % self.stripes
+        return f"{self.directory}{stripe:04x}.lock"
+
+    @staticmethod
+    def __try_lock__(file: IO) -> bool:
+        try:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            return False
+
+    @staticmethod
+    def __unlock__(file: IO) -> None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+    def run(
+        self,
+        key: str,
+        compute: Callable[[], Any],
+        read_result: Callable[[int], Optional[Any]],
+    ) -> Any:
+        """Return the result of compute or of another worker computing the same key
+
+        read_result gets the timestamp of when we started and
+        should return None if nothing was written since then"""
+        # This is how the timestamps in the cache are generated
+        started = int(datetime.timestamp(datetime.utcnow()))
+        deadline = time.monotonic() + self.timeout
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.lock_path(key=key), "a") as file:
+            if self.__try_lock__(file=file):
+                try:
+                    return compute()
+                finally:
+                    self.__unlock__(file=file)
+            logger.info(f"waiting for another worker to compute {key}")
+            while time.monotonic() < deadline:
+                time.sleep(self.poll_interval)
+                if self.__try_lock__(file=file):
+                    try:
+                        result = read_result(started)
+                        if result is not None:
+                            logger.info(f"got the result of {key} from another worker")
+                            return result
+                        # The leader failed so we try ourselves
+                        return compute()
+                    finally:
+                        self.__unlock__(file=file)
+        logger.warning(f"timed out waiting for {key}, computing it anyway")
+        return compute()
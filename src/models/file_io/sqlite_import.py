@@ -0,0 +1,84 @@
+import argparse
+import logging
+import os
+from os.path import exists, join
+from typing import Any, Dict, List, Tuple, Type
+
+from pydantic import BaseModel
+
+import config
+from src.models.file_io import FileIo, codec
+from src.models.file_io.reshard import cache_file_io_classes
+from src.models.file_io.sqlite_store import get_store
+
+logger = logging.getLogger(__name__)
+
+
+class JsonCacheImporter(BaseModel):
+    """This imports an existing json cache in the flat or sharded layout
+    into the sqlite backend. The json files are left untouched."""
+
+    file_io_classes: List[Type[FileIo]] = cache_file_io_classes
+    batch_size: int = 1000
+    imported: int = 0
+    failed: int = 0
+
+    @staticmethod
+    def __setup_argparse_and_return_args__():
+        parser = argparse.ArgumentParser(
+            formatter_class=argparse.RawDescriptionHelpFormatter,
+            description=f"""
+Import the json cache in {config.subdirectory_for_json} into {config.sqlite_database}.
+Set storage_backend = "sqlite" in config.py afterwards.
+
+Example:
+'$ python import_json_cache_to_sqlite.py'""",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of files to write in one transaction",
+        )
+        return parser.parse_args()
+
+    def __write_batch__(
+        self, subfolder: str, batch: List[Tuple[str, Dict[str, Any]]]
+    ) -> None:
+        if batch:
+            get_store().write_many(subfolder=subfolder, items=batch)
+            self.imported += len(batch)
+            batch.clear()
+
+    def import_subfolder(self, file_io_class: Type[FileIo]) -> None:
+        subfolder = file_io_class.__fields__["subfolder"].default
+        directory = f"{config.subdirectory_for_json}{subfolder}"
+        if not exists(directory):
+            logger.info(f"skipping {directory} because it does not exist")
+            return
+        logger.info(f"importing {directory}")
+        batch: List[Tuple[str, Dict[str, Any]]] = []
+        for root, _, filenames in os.walk(directory):
+            for filename in filenames:
+                if not filename.endswith(".json"):
+                    continue
+                path_filename = join(root, filename)
+                data = codec.read(path_filename)
+                if data is None:
+                    logger.error(f"could not import {path_filename}")
+                    self.failed += 1
+                    continue
+                batch.append((filename[: -len(".json")], data))
+                if len(batch) >= self.batch_size:
+                    self.__write_batch__(subfolder=subfolder, batch=batch)
+        self.__write_batch__(subfolder=subfolder, batch=batch)
+
+    def import_cache(self) -> None:
+        for file_io_class in self.file_io_classes:
+            self.import_subfolder(file_io_class=file_io_class)
+        logger.info(f"imported {self.imported} files, {self.failed} failed")
+
+    def run(self) -> None:
+        args = self.__setup_argparse_and_return_args__()
+        self.batch_size = args.batch_size
+        self.import_cache()
@@ -0,0 +1,115 @@
+import logging
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import config
+from src.models.file_io import codec
+
+logger = logging.getLogger(__name__)
+
+
+class SqliteStore:
+    """This is a key-value store in one SQLite database in WAL mode
+
+    There is one table per subfolder of the json cache, e.g. "references"
+    with the hash based id or wari_id as key and the json as value.
+    Every thread gets its own connection and every worker process
+    reconnects after forking."""
+
+    def __init__(self, database: str = ""):
+        self.database = database or config.sqlite_database
+        self.local = threading.local()
+        self.pid = os.getpid()
+        self.tables: set = set()
+        self.lock = threading.Lock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self.pid != os.getpid():
+            # we got forked, the connections of the parent must not be used
+            self.local = threading.local()
+            self.pid = os.getpid()
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.database, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self.local.connection = connection
+        return connection
+
+    @staticmethod
+    def table_name(subfolder: str) -> str:
+        """The table of a subfolder like "references/" is "references"
+
+        It is quoted because e.g. references is a keyword in SQL"""
+        name = subfolder.strip("/")
+        if not name.isidentifier():
+            raise ValueError(f"not a valid table name: {name}")
+        return f'"{name}"'
+
+    def __ensure_table__(self, table: str) -> None:
+        if table not in self.tables:
+            with self.lock:
+                self.connection.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table} "
+                    "(id TEXT PRIMARY KEY, data TEXT NOT NULL)"
+                )
+                self.connection.commit()
+                self.tables.add(table)
+
+    def read(self, subfolder: str, key: str) -> Optional[Dict[str, Any]]:
+        return self.read_many(subfolder=subfolder, keys=[key]).get(key)
+
+    def read_many(
+        self, subfolder: str, keys: Iterable[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Read all keys in as few queries as possible,
+        missing keys are not in the returned dictionary"""
+        table = self.table_name(subfolder)
+        self.__ensure_table__(table)
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        # SQLite limits the number of variables in one statement
+        batch_size = 500
+        for start in range(0, len(keys), batch_size):
+            batch = keys[start : start + batch_size]
+            placeholders = ",".join("?" * len(batch))
+            rows = self.connection.execute(
+                f"SELECT id, data FROM {table} WHERE id IN ({placeholders})", batch
+            )
+            for key, data in rows:
+                found[key] = codec.loads(data)
+        return found
+
+    def write(self, subfolder: str, key: str, data: Dict[str, Any]) -> None:
+        self.write_many(subfolder=subfolder, items=[(key, data)])
+
+    def write_many(
+        self, subfolder: str, items: Iterable[Tuple[str, Dict[str, Any]]]
+    ) -> None:
+        """Write all items in one transaction"""
+        table = self.table_name(subfolder)
+        self.__ensure_table__(table)
+        rows: List[Tuple[str, str]] = [
+            (key, codec.dumps(data).decode()) for key, data in items
+        ]
+        with self.connection:
+            self.connection.executemany(
+                f"INSERT OR REPLACE INTO {table} (id, data) VALUES (?, ?)", rows
+            )
+        logger.debug(f"wrote {len(rows)} rows to {table}")
+
+
+_store: Optional[SqliteStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> SqliteStore:
+    """Return the store of this process and create it if needed"""
+    global _store
+    with _store_lock:
+        if _store is None or _store.database != config.sqlite_database:
+            _store = SqliteStore()
+        return _store
@@ -0,0 +1,65 @@
+import logging
+from datetime import datetime
+from hashlib import md5
+from typing import Any, Dict
+
+import config
+from src.models.file_io.hash_based import HashBasedFileIo
+
+logger = logging.getLogger(__name__)
+
+
+class TitleFileIo(HashBasedFileIo):
+    """This is the index from a title to the page id on a wiki
+
+    It lets us find the cached article json without asking
+    the MediaWiki API for the page id. The normalized title is stored
+    too so we never return the page id of another title. Entries older
+    than title_index_max_age_seconds are ignored because pages are moved."""
+
+    data: Dict[str, Any] = dict()
+    subfolder = "titles/"
+    hash_based_id: str = ""
+    lang: str = ""
+    domain: str = ""
+    title: str = ""
+
+    def __init__(self, **data):
+        super().__init__(**data)
+        if not self.hash_based_id:
+            self.hash_based_id = md5(self.index_key.encode()).hexdigest()
+
+    @property
+    def normalized_title(self) -> str:
+        """MediaWiki treats underscores as spaces and
+        the first letter as upper case so we do the same"""
+        title = " ".join(self.title.replace("_", " ").split())
+        return title[:1].upper() + title[1:]
+
+    @property
+    def index_key(self) -> str:
+        return f"{self.lang}.{self.domain}.{self.normalized_title}"
+
+    def read_page_id(self, check_age: bool = True) -> int:
+        """Return the page id or 0 if the title is not in the index
+        or the entry is too old. Without check_age entries of any age
+        are returned which is fine when the caller verifies the page"""
+        self.read_from_disk()
+        if self.data and self.data.get("index_key") == self.index_key:
+            age = datetime.timestamp(datetime.utcnow()) - self.data.get("timestamp", 0)
+            if not check_age or age <= config.title_index_max_age_seconds:
+                return int(self.data["page_id"])
+        return 0
+
+    def write_page_id(self, page_id: int) -> None:
+        """Store the page id unless the index already has it.
+        The page id of a title changes when pages are moved."""
+        if page_id <= 0 or self.read_page_id() == page_id:
+            return
+        logger.debug(f"indexing {self.index_key} as page id {page_id}")
+        self.data = dict(
+            index_key=self.index_key,
+            page_id=page_id,
+            timestamp=int(datetime.timestamp(datetime.utcnow())),
+        )
+        self.write_to_disk()
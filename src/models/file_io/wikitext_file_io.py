@@ -0,0 +1,21 @@
+import logging
+from typing import Any, Dict
+
+from src.models.file_io import FileIo
+
+logger = logging.getLogger(__name__)
+
+
+class WikitextFileIo(FileIo):
+    """This stores the wikitext of one revision of an article,
+    e.g. en.wikipedia.org.1234.1143480404"""
+
+    data: Dict[str, Any] = dict()
+    subfolder = "wikitexts/"
+    article_wari_id: str = ""
+    revision_id: int = 0
+
+    def __init__(self, **data):
+        super().__init__(**data)
+        if not self.wari_id:
+            self.wari_id = f"{self.article_wari_id}.{self.revision_id}"
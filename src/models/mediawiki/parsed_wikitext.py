@@ -0,0 +1,84 @@
+import logging
+from bisect import bisect_right
+from typing import Dict, List, Optional
+
+import mwparserfromhell  # type: ignore
+from mwparserfromhell.nodes import Node, Text  # type: ignore
+from mwparserfromhell.smart_list import SmartList  # type: ignore
+from mwparserfromhell.wikicode import Wikicode  # type: ignore
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+class ParsedWikitext(BaseModel):
+    """This is the wikitext of a whole page parsed once with the
+    character offset of every top level node
+
+    It lets the sections and lines of the page be cut out of the
+    tree instead of being serialized and parsed again."""
+
+    wikitext: str
+    wikicode: Wikicode
+    # The start of every top level node and the end of the last one
+    offsets: List[int] = []
+    indexes: Dict[int, int] = {}
+
+    class Config:  # dead: disable
+        arbitrary_types_allowed = True  # dead: disable
+
+    @classmethod
+    def parse(cls, wikitext: str) -> "ParsedWikitext":
+        return cls(wikitext=wikitext, wikicode=mwparserfromhell.parse(wikitext))
+
+    def __init__(self, **data):
+        super().__init__(**data)
+        offset = 0
+        self.offsets = [offset]
+        for index, node in enumerate(self.wikicode.nodes):
+            self.indexes[id(node)] = index
+            offset += len(str(node))
+            self.offsets.append(offset)
+
+    def start_of(self, wikicode: Wikicode) -> int:
+        """Return the offset of a section returned by get_sections()
+        which shares its nodes with the page"""
+        if not wikicode.nodes:
+            raise ValueError("the wikicode has no nodes")
+        return self.offsets[self.indexes[id(wikicode.nodes[0])]]
+
+    def text_of(self, wikicode: Wikicode) -> str:
+        """Return the wikitext of a section without serializing it"""
+        start = self.start_of(wikicode=wikicode)
+        end = self.offsets[self.indexes[id(wikicode.nodes[-1])] + 1]
+        return self.wikitext[start:end]
+
+    def slice(self, start: int, end: int) -> Optional[Wikicode]:
+        """Return the nodes between the offsets as wikicode
+
+        Text nodes are split at the offsets. None is returned if an offset
+        is inside any other node, e.g. a template spanning more than one line,
+        because the tree of that part would differ from parsing it alone."""
+        nodes = self.wikicode.nodes
+        first = bisect_right(self.offsets, start) - 1
+        last = bisect_right(self.offsets, end) - 1
+        if end == self.offsets[last]:
+            # the end is on a node boundary so the last node is not included
+            last -= 1
+        result: List[Node] = []
+        for index in range(first, last + 1):
+            node = nodes[index]
+            node_start, node_end = self.offsets[index], self.offsets[index + 1]
+            if node_start >= start and node_end <= end:
+                result.append(node)
+            elif isinstance(node, Text):
+                result.append(
+                    Text(
+                        node.value[
+                            max(start, node_start) - node_start : end - node_start
+                        ]
+                    )
+                )
+            else:
+                return None
+        return Wikicode(SmartList(result))
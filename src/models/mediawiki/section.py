@@ -1,6 +1,7 @@
+import hashlib
 import logging
 import re
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 import mwparserfromhell  # type: ignore
 from mwparserfromhell.wikicode import Wikicode  # type: ignore
@@ -8,10 +9,16 @@ from pydantic import BaseModel
 
 from src.models.api.job.article_job import ArticleJob
 from src.models.exceptions import MissingInformationError
+from src.models.mediawiki.parsed_wikitext import ParsedWikitext
 from src.models.wikimedia.wikipedia.reference.generic import WikipediaReference
+from src.models.wikimedia.wikipedia.reference.statistic import get_reference_statistic
 
 logger = logging.getLogger(__name__)
 
+# These are compiled once and used to classify a section before parsing it
+ref_tag_pattern = re.compile(r"<ref", flags=re.I)
+starred_line_pattern = re.compile(r"^\*", flags=re.M)
+
 
 class MediawikiSection(BaseModel):
     """This accepts both wikicode directly from mwparserfromhell and wikitext"""
@@ -20,8 +27,24 @@ class MediawikiSection(BaseModel):
     language_code: str = ""
     wikicode: Optional[Wikicode] = None
     wikitext: str = ""
+    # The parsed page this section was cut from and where it starts in it
+    parsed: Optional[ParsedWikitext] = None
+    offset: int = 0
     references: List[WikipediaReference] = []
     job: ArticleJob
+    # These are the reference statistics from an earlier analysis
+    # used instead of extracting when the content is unchanged
+    cached_references: List[Dict[str, Any]] = []
+    reused: bool = False
+    # These are the statistics of the references of this section in document
+    # order whether they were extracted here, in a pool worker or memoized
+    reference_statistics: List[Dict[str, Any]] = []
+    extracted_in_pool: bool = False
+    # Take the statistics of identical references from the reference memo
+    use_memo: bool = False
+    memo_hits: int = 0
+    # This is True when the pre-scan found nothing that could be a reference
+    fast_path: bool = False
 
     class Config:  # dead: disable
         arbitrary_types_allowed = True  # dead: disable
@@ -32,6 +55,21 @@ class MediawikiSection(BaseModel):
             raise MissingInformationError("No regex in job")
         return bool(re.findall(pattern=self.job.regex, flags=re.I, string=self.name))
 
+    @property
+    def might_contain_references(self) -> bool:
+        """Cheap pre-scan of the wikitext before any mwparserfromhell work
+
+        Footnote references are always <ref> tags and general references
+        are starred lines in a section with a heading matching the regex."""
+        if not self.wikitext:
+            self.__populate_wikitext__()
+        if ref_tag_pattern.search(self.wikitext):
+            return True
+        return bool(
+            starred_line_pattern.search(self.wikitext)
+            and self.is_general_reference_section
+        )
+
     @property
     def __get_lines__(self):
         if not self.wikitext:
@@ -41,7 +79,9 @@ class MediawikiSection(BaseModel):
     @property
     def name(self) -> str:
         """Extracts a section name from the first line of the output from mwparserfromhell"""
-        line = self.__get_lines__[0]
+        if not self.wikitext:
+            self.__populate_wikitext__()
+        line = self.wikitext.split("\n", 1)[0]
         # Handle special case where no level 2 heading is at the beginning of the section
         if "==" not in line:
             logger.info(f"== not found in line {line}")
@@ -51,7 +91,22 @@ class MediawikiSection(BaseModel):
 
     @property
     def number_of_references(self):
-        return len(self.references)
+        if self.reused:
+            return len(self.cached_references)
+        return len(self.reference_statistics)
+
+    @property
+    def content_hash(self) -> str:
+        """This is the md5 of the wikitext including the heading
+        so a renamed section is also recomputed"""
+        self.__populate_wikitext__()
+        return hashlib.md5(self.wikitext.encode()).hexdigest()
+
+    @property
+    def reference_ids(self) -> List[str]:
+        if self.reused:
+            return [reference["id"] for reference in self.cached_references]
+        return [reference["id"] for reference in self.reference_statistics]
 
     @staticmethod
     def star_found_at_line_start(line) -> bool:
@@ -77,6 +132,8 @@ class MediawikiSection(BaseModel):
             logger.debug(
                 f"Extracting {len(lines_without_heading)} lines form section {lines[0]}"
             )
+            # The offset of the line in the parsed page
+            offset = self.offset + len(lines[0]) + 1
             for line in lines_without_heading:
                 logger.info(f"Working on line: {line}")
                 # Guard against empty line
@@ -84,20 +141,23 @@ class MediawikiSection(BaseModel):
                 # We discard all lines not starting with a star to avoid all
                 # categories and other templates not containing any references
                 if line and self.star_found_at_line_start(line=line):
-                    parsed_line = mwparserfromhell.parse(line)
+                    parsed_line = self.__get_line_wikicode__(line=line, offset=offset)
                     logger.debug("Appending line with star to references")
                     # We don't know what the line contains besides a start
                     # but we assume it is a reference
-                    reference = WikipediaReference(
-                        wikicode=parsed_line,
-                        # wikibase=self.wikibase,
-                        testing=self.testing,
-                        language_code=self.language_code,
-                        is_general_reference=True,
-                        section=self.name,
+                    self.__add_reference__(
+                        wikicode=parsed_line, is_general_reference=True
                     )
-                    reference.extract_and_check()
-                    self.references.append(reference)
+                offset += len(line) + 1
+
+    def __get_line_wikicode__(self, line: str, offset: int) -> Wikicode:
+        """Cut the line out of the parsed page and only parse it
+        again if it is part of a node spanning more than one line"""
+        if self.parsed:
+            wikicode = self.parsed.slice(start=offset, end=offset + len(line))
+            if wikicode is not None:
+                return wikicode
+        return mwparserfromhell.parse(line)
 
     def __extract_all_footnote_references__(self):
         """This extracts everything inside <ref></ref> tags and needs self.wikicode"""
@@ -113,15 +173,63 @@ class MediawikiSection(BaseModel):
         refs = self.wikicode.filter_tags(matches=lambda tag: tag.tag.lower() == "ref")
         app.logger.debug(f"Number of refs found: {len(refs)}")
         for ref in refs:
-            reference = WikipediaReference(
-                wikicode=ref,
-                # wikibase=self.wikibase,
-                testing=self.testing,
+            self.__add_reference__(wikicode=ref)
+
+    def __add_reference__(self, wikicode, is_general_reference: bool = False):
+        """Extract the reference and its statistic unless an
+        identical reference is in the reference memo
+
+        The memo only has the statistic so a hit adds no reference."""
+        from src.models.wikimedia.wikipedia.reference.memo import (
+            get_reference_memo,
+            reference_memo_key,
+        )
+
+        key = ""
+        wikitext = str(wikicode)
+        if self.use_memo:
+            key = reference_memo_key(
+                wikitext=wikitext,
+                is_general_reference=is_general_reference,
                 language_code=self.language_code,
-                section=self.name,
             )
-            reference.extract_and_check()
-            self.references.append(reference)
+            data = get_reference_memo().get(key=key)
+            if data is not None:
+                self.memo_hits += 1
+                self.reference_statistics.append(dict(data, section=self.name))
+                return
+        reference = WikipediaReference(
+            wikicode=wikicode,
+            # wikibase=self.wikibase,
+            testing=self.testing,
+            language_code=self.language_code,
+            is_general_reference=is_general_reference,
+            section=self.name,
+        )
+        reference.extract_and_check()
+        self.references.append(reference)
+        data = get_reference_statistic(reference=reference)
+        self.reference_statistics.append(data)
+        if key:
+            get_reference_memo().put(key=key, data=dict(data))
+
+    def reuse(self, cached_references: List[Dict[str, Any]]):
+        """Use the reference statistics of an earlier analysis of
+        this exact section content instead of extracting
+
+        Identical references share one cached statistic so the section
+        it was stored with can be another one."""
+        self.cached_references = [
+            dict(data, section=self.name) for data in cached_references
+        ]
+        self.reused = True
+
+    def use_pool_records(self, records: List[Dict[str, Any]], memo_hits: int = 0):
+        """Use the reference statistics returned by the worker
+        process that extracted this section"""
+        self.reference_statistics = records
+        self.memo_hits = memo_hits
+        self.extracted_in_pool = True
 
     def extract(self):
         if not self.wikicode and not self.wikitext:
@@ -129,6 +237,10 @@ class MediawikiSection(BaseModel):
                 "We need either wikicode or wikitext to continue"
             )
         self.__populate_wikitext__()
+        if not self.might_contain_references:
+            logger.debug(f"skipping section {self.name} without references")
+            self.fast_path = True
+            return
         self.__parse_wikitext__()
         self.__extract_all_general_references__()
         self.__extract_all_footnote_references__()
@@ -145,4 +257,6 @@ class MediawikiSection(BaseModel):
 
         app.logger.debug("__parse_wikitext__: running")
         if self.wikitext and not self.wikicode:
-            self.wikicode = mwparserfromhell.parse(self.wikitext)
+            self.parsed = ParsedWikitext.parse(self.wikitext)
+            self.offset = 0
+            self.wikicode = self.parsed.wikicode
@@ -0,0 +1,124 @@
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import requests
+from pydantic import BaseModel
+
+import config
+from src.models.file_io.ores_file_io import OresFileIo
+
+logger = logging.getLogger(__name__)
+
+# ORES will never be able to score a revision with these errors
+# while other errors like TimeoutError can go away on the next try
+permanent_ores_errors = {"RevisionNotFound", "TextDeleted"}
+
+
+class OresScoreCache(BaseModel):
+    """This gets ORES article quality scores from the cache
+    and fetches the missing ones in batches
+
+    Revisions ORES cannot score, e.g. because they were deleted, are cached
+    as None for ores_negative_cache_seconds. Errors like timeouts, both of the
+    request and reported by ORES for a revision, are not cached so the score
+    is fetched again next time."""
+
+    wiki: str  # e.g. enwiki
+    batch_size: int = config.ores_batch_size
+
+    def get_score(self, revision_id: int) -> Dict[str, Any]:
+        """Return the score or an empty dict if there is none"""
+        return self.get_scores(revision_ids=[revision_id]).get(revision_id, {})
+
+    def get_scores(self, revision_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Return the score of every revision we could get by revision id.
+        Revisions without a score get an empty dict"""
+        scores: Dict[int, Dict[str, Any]] = {}
+        missing = []
+        for revision_id in dict.fromkeys(revision_ids):
+            score = self.__read_cached_score__(revision_id=revision_id)
+            if score is None:
+                missing.append(revision_id)
+            else:
+                scores[revision_id] = score
+        if missing:
+            logger.debug(f"fetching {len(missing)} ORES scores for {self.wiki}")
+        for index in range(0, len(missing), self.batch_size):
+            scores.update(
+                self.__fetch_and_cache_scores__(
+                    revision_ids=missing[index : index + self.batch_size]
+                )
+            )
+        return scores
+
+    def __read_cached_score__(self, revision_id: int) -> Optional[Dict[str, Any]]:
+        io = OresFileIo(wiki=self.wiki, revision_id=revision_id)
+        io.read_from_disk()
+        if not io.data:
+            return None
+        if io.data["score"] is None:
+            age = datetime.timestamp(datetime.utcnow()) - io.data["timestamp"]
+            if age > config.ores_negative_cache_seconds:
+                return None
+            return {}
+        return io.data["score"]
+
+    def __request__(self, revision_ids: List[int]) -> Optional[Dict[str, Any]]:
+        """Get the scores of many revisions in one request, see
+        https://ores.wikimedia.org/v3/scores/enwiki/?models=articlequality&revids=1|2"""
+        try:
+            response = requests.get(
+                f"https://ores.wikimedia.org/v3/scores/{self.wiki}/",
+                params=dict(
+                    models="articlequality",
+                    revids="|".join(str(revision_id) for revision_id in revision_ids),
+                ),
+                headers={"User-Agent": config.user_agent},
+                timeout=config.ores_timeout,
+            )
+            if response.status_code == 200:
+                return response.json()
+        except requests.RequestException as e:
+            logger.warning(f"Could not get scores from ORES: {e}")
+            return None
+        logger.error(f"Got {response.status_code} from ORES")
+        return None
+
+    def __fetch_and_cache_scores__(
+        self, revision_ids: List[int]
+    ) -> Dict[int, Dict[str, Any]]:
+        data = self.__request__(revision_ids=revision_ids)
+        if not data:
+            return {}
+        scores: Dict[int, Dict[str, Any]] = {}
+        timestamp = int(datetime.timestamp(datetime.utcnow()))
+        all_scores = data.get(self.wiki, {}).get("scores", {})
+        for revision_id in revision_ids:
+            result = all_scores.get(str(revision_id), {}).get("articlequality", {})
+            if "score" in result:
+                score, error = result["score"], None
+            elif "error" in result:
+                error = result["error"]
+                if error.get("type") not in permanent_ores_errors:
+                    logger.warning(f"ORES failed to score {revision_id}: {error}")
+                    scores[revision_id] = {}
+                    continue
+                # ORES cannot score this revision so we remember that
+                score = None
+                logger.info(f"ORES cannot score {revision_id}: {error}")
+            else:
+                continue
+            OresFileIo(
+                wiki=self.wiki,
+                revision_id=revision_id,
+                data=dict(
+                    wiki=self.wiki,
+                    revision_id=revision_id,
+                    score=score,
+                    error=error,
+                    timestamp=timestamp,
+                ),
+            ).write_to_disk()
+            scores[revision_id] = score or {}
+        return scores
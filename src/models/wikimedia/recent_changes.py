@@ -0,0 +1,281 @@
+import argparse
+import json
+import logging
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+import requests
+from pydantic import BaseModel
+
+import config
+from src.models.api.job.article_job import ArticleJob
+from src.models.exceptions import MissingInformationError, WikipediaApiFetchError
+from src.models.file_io.article_file_io import ArticleFileIo
+from src.models.file_io.title_file_io import TitleFileIo
+from src.models.wikimedia.enums import WikimediaDomain
+
+logger = logging.getLogger(__name__)
+
+
+class RecentChangesRefresher(BaseModel):
+    """This consumes a recent changes feed in the EventStreams format
+    and re-analyzes the edited articles that are already in our cache
+
+    Articles we have never analyzed are ignored. The feed can be the
+    live server-sent events stream or a file with one event per line
+    which is useful for testing and replaying.
+
+    Edits are debounced on the time of the events so an article that is
+    edited many times in a row is only analyzed once when it has been
+    quiet for debounce_seconds. The analyses run in a bounded pool and
+    the feed is not read further while all workers are busy."""
+
+    url: str = config.recent_changes_url
+    file: str = ""
+    # server names of the wikis we follow
+    wikis: List[str] = ["en.wikipedia.org"]
+    # used when the cached analysis has no regex
+    regex: str = "bibliography|further reading|works cited|sources|external links"
+    debounce_seconds: float = config.refresher_debounce_seconds
+    max_workers: int = config.refresher_max_workers
+    # Stop after this many events, 0 means run forever
+    limit: int = 0
+    # These are the edits waiting for the debounce by server name and title
+    pending: Dict[str, Dict[str, Any]] = {}
+    running: Set[str] = set()
+    events: int = 0
+    edits: int = 0
+    coalesced: int = 0
+    refreshed: int = 0
+    failed: int = 0
+    # seconds from the edit until we read the event or start the analysis
+    feed_lag: float = 0
+    refresh_lag: float = 0
+    max_refresh_lag: float = 0
+    # time of the latest event which is the clock of the debounce
+    stream_time: float = 0
+
+    @property
+    def statistics(self) -> Dict[str, Any]:
+        return dict(
+            events=self.events,
+            edits=self.edits,
+            coalesced=self.coalesced,
+            pending=len(self.pending),
+            running=len(self.running),
+            refreshed=self.refreshed,
+            failed=self.failed,
+            feed_lag=round(self.feed_lag, 1),
+            refresh_lag=round(self.refresh_lag, 1),
+            max_refresh_lag=round(self.max_refresh_lag, 1),
+        )
+
+    @staticmethod
+    def __setup_argparse_and_return_args__():
+        parser = argparse.ArgumentParser(
+            formatter_class=argparse.RawDescriptionHelpFormatter,
+            description="""
+Re-analyze the articles in the cache when they are edited on Wikipedia.
+
+Example:
+'$ python refresh_from_recent_changes.py --wiki en.wikipedia.org'
+Replay a file with one event per line:
+'$ python refresh_from_recent_changes.py --file recentchange.jsonl'""",
+        )
+        parser.add_argument("--url", default=config.recent_changes_url)
+        parser.add_argument("--file", default="", help="Read the events from a file")
+        parser.add_argument(
+            "--wiki",
+            action="append",
+            help="Server name of a wiki to follow, can be given more than once",
+        )
+        parser.add_argument(
+            "--regex",
+            default=RecentChangesRefresher.__fields__["regex"].default,
+            help="Regex of the section headings with general references "
+            "used when the cached analysis has none",
+        )
+        parser.add_argument(
+            "--debounce", type=float, default=config.refresher_debounce_seconds
+        )
+        parser.add_argument("--workers", type=int, default=config.refresher_max_workers)
+        return parser.parse_args()
+
+    def __read_lines__(self) -> Iterator[str]:
+        if self.file:
+            with open(self.file) as file:
+                yield from file
+        else:
+            response = requests.get(
+                self.url,
+                headers={"User-Agent": config.user_agent},
+                stream=True,
+                timeout=(10, None),
+            )
+            response.raise_for_status()
+            yield from response.iter_lines(decode_unicode=True)
+
+    @staticmethod
+    def parse_event(line: str) -> Optional[Dict[str, Any]]:
+        """Parse a line of server-sent events or plain json lines
+
+        Comments, event names and ids of the server-sent events are skipped"""
+        line = line.strip()
+        if line.startswith("data:"):
+            line = line[len("data:") :].strip()
+        if not line.startswith("{"):
+            return None
+        try:
+            return json.loads(line)
+        except ValueError:
+            logger.warning(f"could not parse event: {line[:100]}")
+            return None
+
+    @staticmethod
+    def __get_cached_article__(server_name: str, title: str) -> Dict[str, Any]:
+        """Return the cached article statistics or an empty dict if we
+        never analyzed the article. This never calls the MediaWiki API
+
+        Old title index entries are used too because the refresh resolves
+        the page again and so corrects a moved title."""
+        lang, domain = server_name.split(".", 1)
+        page_id = TitleFileIo(lang=lang, domain=domain, title=title).read_page_id(
+            check_age=False
+        )
+        if not page_id:
+            return {}
+        io = ArticleFileIo(wari_id=f"{lang}.{domain}.{page_id}")
+        io.read_from_disk()
+        return io.data or {}
+
+    def handle_event(self, event: Dict[str, Any]) -> None:
+        self.events += 1
+        timestamp = float(event.get("timestamp") or time.time())
+        self.stream_time = max(self.stream_time, timestamp)
+        self.feed_lag = time.time() - timestamp
+        server_name = event.get("server_name", "")
+        if (
+            event.get("type") not in ("edit", "new")
+            or event.get("namespace") != 0
+            or server_name not in self.wikis
+        ):
+            return
+        self.edits += 1
+        title = event.get("title", "")
+        key = f"{server_name}:{title}"
+        revision_id = int((event.get("revision") or {}).get("new") or 0)
+        if key in self.pending:
+            self.coalesced += 1
+            self.pending[key].update(last_edit=timestamp, revision_id=revision_id)
+            return
+        data = self.__get_cached_article__(server_name=server_name, title=title)
+        if not data or data.get("revision_id") == revision_id:
+            return
+        self.pending[key] = dict(
+            server_name=server_name,
+            title=title,
+            page_id=data["page_id"],
+            regex=data.get("regex") or self.regex,
+            revision_id=revision_id,
+            first_edit=timestamp,
+            last_edit=timestamp,
+        )
+
+    def __due_keys__(self, flush: bool = False) -> List[str]:
+        return [
+            key
+            for key, item in self.pending.items()
+            if key not in self.running
+            and (flush or self.stream_time - item["last_edit"] >= self.debounce_seconds)
+        ]
+
+    def refresh_article(self, item: Dict[str, Any]) -> None:
+        """Run the same logic as the article endpoint with refresh=true
+        which skips the analysis if the revision was already analyzed
+        and only re-extracts the sections that changed"""
+        from src.views.statistics.article import Article
+
+        lang, domain = item["server_name"].split(".", 1)
+        view = Article()
+        view.job = ArticleJob(
+            lang=lang,
+            domain=WikimediaDomain(domain),
+            title=item["title"],
+            page_id=item["page_id"],
+            regex=item["regex"],
+            refresh=True,
+        )
+        _, status_code = view.__handle_valid_job__()
+        if status_code != 200:
+            raise WikipediaApiFetchError(
+                f"got {status_code} when refreshing {item['title']}"
+            )
+
+    def __collect__(self, key: str, future: Future) -> None:
+        self.running.discard(key)
+        try:
+            future.result()
+            self.refreshed += 1
+        except (Exception, MissingInformationError, WikipediaApiFetchError) as e:
+            logger.error(f"refreshing {key} failed, got {e!r}")
+            self.failed += 1
+
+    def __dispatch__(
+        self, executor: Executor, futures: Dict[Future, str], flush: bool = False
+    ) -> None:
+        for key in self.__due_keys__(flush=flush):
+            # We block here so the backlog is kept in pending and not in the pool
+            while len(futures) >= self.max_workers:
+                self.__wait__(futures=futures)
+            item = self.pending.pop(key)
+            self.refresh_lag = time.time() - item["last_edit"]
+            self.max_refresh_lag = max(self.max_refresh_lag, self.refresh_lag)
+            self.running.add(key)
+            futures[executor.submit(self.refresh_article, item)] = key
+
+    def __wait__(self, futures: Dict[Future, str]) -> None:
+        done, _ = wait(futures, return_when=FIRST_COMPLETED)
+        for future in done:
+            self.__collect__(key=futures.pop(future), future=future)
+
+    def consume(self, executor: Optional[Executor] = None) -> None:
+        """Read the feed until it ends or the limit is reached and
+        refresh all pending articles at the end"""
+        own_executor = executor is None
+        executor = executor or ThreadPoolExecutor(max_workers=self.max_workers)
+        futures: Dict[Future, str] = {}
+        try:
+            for line in self.__read_lines__():
+                event = self.parse_event(line)
+                if event is None:
+                    continue
+                self.handle_event(event)
+                self.__dispatch__(executor=executor, futures=futures)
+                if self.events % 1000 == 0:
+                    logger.info(f"refresher: {self.statistics}")
+                if self.limit and self.events >= self.limit:
+                    break
+            self.__dispatch__(executor=executor, futures=futures, flush=True)
+            while futures:
+                self.__wait__(futures=futures)
+        finally:
+            if own_executor:
+                executor.shutdown()
+        logger.info(f"refresher done: {self.statistics}")
+
+    def run(self) -> None:
+        args = self.__setup_argparse_and_return_args__()
+        self.url = args.url
+        self.file = args.file
+        self.wikis = args.wiki or self.wikis
+        self.regex = args.regex
+        self.debounce_seconds = args.debounce
+        self.max_workers = args.workers
+        self.consume()
@@ -1,14 +1,17 @@
 import logging
 from copy import deepcopy
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set
 
 from src.models.api.job.article_job import ArticleJob
 from src.models.api.statistic.article import ArticleStatistics
-from src.models.api.statistic.reference import ReferenceStatistic
 from src.models.base import WariBaseModel
 from src.models.exceptions import MissingInformationError
 from src.models.wikimedia.wikipedia.article import WikipediaArticle
+from src.models.wikimedia.wikipedia.reference.enums import (
+    FootnoteSubtype,
+    ReferenceType,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +30,10 @@ class WikipediaAnalyzer(WariBaseModel):
     check_urls: bool = False
     reference_statistics: List[Dict[str, Any]] = []
     dehydrated_references: List[Dict[str, Any]] = []
+    # Reference statistics of the previous analysis by section content hash
+    cached_sections: Dict[str, List[Dict[str, Any]]] = {}
+    reused_reference_ids: Set[str] = set()
+    reference_reuse: Dict[str, int] = {}
 
     @property
     def wari_id(self) -> str:
@@ -54,7 +61,30 @@ class WikipediaAnalyzer(WariBaseModel):
             raise MissingInformationError("self.article was None")
         return self.article.found_in_wikipedia
 
+    @property
+    def recomputed_reference_statistics(self) -> List[Dict[str, Any]]:
+        """The references that were not reused from the previous analysis
+        which are the only ones that have to be written to disk"""
+        return [
+            data
+            for data in self.reference_statistics
+            if data["id"] not in self.reused_reference_ids
+        ]
+
+    @staticmethod
+    def __count_first_level_domains__(
+        references: List[Dict[str, Any]],
+    ) -> Dict[str, int]:
+        """This returns a dict with fld as key and the count as value sorted by count descending"""
+        counts: Dict[str, int] = {}
+        for data in references:
+            for fld in data["flds"]:
+                counts[fld] = counts.get(fld, 0) + 1
+        return dict(sorted(counts.items(), key=lambda x: x[1], reverse=True))
+
     def __gather_article_statistics__(self) -> None:
+        """We aggregate over the reference statistics and not the extracted
+        references because the references of unchanged sections are reused"""
         if (
             self.job
             and self.article
@@ -64,23 +94,48 @@ class WikipediaAnalyzer(WariBaseModel):
             if not self.article.extractor:
                 raise MissingInformationError("self.article.extractor was None")
             ae = self.article.extractor
+            named = FootnoteSubtype.NAMED.value
+            content_references = [
+                data
+                for data in self.reference_statistics
+                if data["footnote_subtype"] != named
+            ]
             self.article_statistics = ArticleStatistics(
                 wari_id=self.wari_id,
                 lang=self.job.lang,
                 reference_statistics=dict(
-                    named=ae.number_of_empty_named_references,
-                    footnote=ae.number_of_footnote_references,
-                    content=ae.number_of_content_references,
-                    general=ae.number_of_general_references,
+                    named=len(self.reference_statistics) - len(content_references),
+                    footnote=len(
+                        [
+                            data
+                            for data in content_references
+                            if data["type"] == ReferenceType.FOOTNOTE.value
+                        ]
+                    ),
+                    content=len(content_references),
+                    general=len(
+                        [
+                            data
+                            for data in content_references
+                            if data["type"] == ReferenceType.GENERAL.value
+                        ]
+                    ),
                 ),
                 page_id=self.article.page_id,
                 title=self.job.title,
-                urls=ae.raw_urls,
-                fld_counts=ae.reference_first_level_domain_counts,
+                urls=[
+                    url for data in self.reference_statistics for url in data["urls"]
+                ],
+                fld_counts=self.__count_first_level_domains__(content_references),
                 served_from_cache=False,
                 site=self.job.domain.value,
                 isodate=datetime.utcnow().isoformat(),
                 ores_score=self.article.ores_details,
+                revision_id=self.article.latest_revision_id or 0,
+                regex=self.job.regex,
+                sections=ae.section_hashes,
+                recomputed_sections=ae.recomputed_sections,
+                reference_reuse=self.reference_reuse,
             )
 
     def get_statistics(self) -> Dict[str, Any]:
@@ -89,8 +144,8 @@ class WikipediaAnalyzer(WariBaseModel):
         if not self.article:
             self.__analyze__()
         if not self.article_statistics:
-            self.__gather_article_statistics__()
             self.__gather_reference_statistics__()
+            self.__gather_article_statistics__()
             self.__extract_dehydrated_references__()
             self.__insert_dehydrated_references_into_the_article_statistics__()
         return self.__get_statistics_dict__()
@@ -116,45 +171,31 @@ class WikipediaAnalyzer(WariBaseModel):
         from src import app
 
         app.logger.debug("__gather_reference_statistics__: running")
-        if (
-            self.article
-            and self.article.extractor
-            and self.article.extractor.references
-        ):
+        if self.article and self.article.extractor:
             app.logger.debug(
                 f"Gathering reference statistics for "
-                f"{self.article.extractor.number_of_references} references"
+                f"{len(self.article.extractor.sections)} sections"
             )
-            for reference in self.article.extractor.references:
-                if not reference:
-                    raise MissingInformationError("raw_reference was None")
-                if reference.footnote_subtype:
-                    subtype = reference.footnote_subtype.value
+            reused = 0
+            # We go section by section to keep the order of the references
+            for section in self.article.extractor.sections:
+                if section.reused:
+                    for data in section.cached_references:
+                        self.reused_reference_ids.add(data["id"])
+                        self.reference_statistics.append(data)
+                    reused += len(section.cached_references)
                 else:
-                    subtype = ""
-                # if not rr.get_wikicode_as_string:
-                #     raise MissingInformationError()
-                data = ReferenceStatistic(
-                    # identifiers=rr.identifiers,
-                    flds=reference.first_level_domains,
-                    footnote_subtype=subtype,
-                    id=reference.reference_id,
-                    template_names=reference.template_names,
-                    templates=reference.get_template_dicts,
-                    titles=reference.titles,
-                    type=reference.reference_type.value,
-                    urls=reference.raw_urls,
-                    wikitext=reference.get_wikicode_as_string,
-                    section=reference.section,
-                ).dict()
-                # if not "wikitext" in data:
-                #     console.print(data)
-                #     raise MissingInformationError()
-                self.reference_statistics.append(data)
-        if not self.article_statistics:
-            app.logger.debug(
-                "self.article_statistics was None "
-                "so we skip gathering reference statistics"
+                    self.reference_statistics.extend(section.reference_statistics)
+            memo_hits = self.article.extractor.number_of_memo_hits
+            self.reference_reuse = dict(
+                sections=reused,
+                memo=memo_hits,
+                extracted=len(self.reference_statistics) - reused - memo_hits,
+            )
+            app.logger.info(
+                f"Reused {reused} references from unchanged sections and "
+                f"{memo_hits} from the reference memo out of "
+                f"{len(self.reference_statistics)}"
             )
 
     def __populate_article__(self):
@@ -165,6 +206,8 @@ class WikipediaAnalyzer(WariBaseModel):
             # Todo consider propagating job further here
             self.article = WikipediaArticle(
                 job=self.job,
+                cached_sections=self.cached_sections,
+                use_reference_memo=True,
             )
         else:
             raise MissingInformationError("Got no title")
@@ -1,6 +1,9 @@
+import concurrent.futures
 import logging
+import time
 from datetime import datetime
-from typing import Any, Dict, Optional
+from functools import partial
+from typing import Any, Dict, List, Optional
 
 import requests
 from dateutil.parser import isoparse
@@ -38,6 +41,16 @@ class WikipediaArticle(WariBaseModel):
     job: ArticleJob
     ores_quality_prediction: str = ""
     ores_details: Dict = {}
+    # This is a concurrent future with the ORES score
+    ores_future: Optional[Any] = None
+    ores_deadline: float = 0
+    # Bulk analysis turns this off because it is optional and slow
+    fetch_ores: bool = True
+    # Reference statistics of the previous analysis by section content hash
+    cached_sections: Dict[str, List[Dict[str, Any]]] = {}
+    # The memo only gives reference statistics so this is only turned on
+    # when the analyzer uses them and not the extracted references
+    use_reference_memo: bool = False
 
     class Config:  # dead: disable
         arbitrary_types_allowed = True  # dead: disable
@@ -84,6 +97,8 @@ class WikipediaArticle(WariBaseModel):
         # We only fetch data from Wikipedia if we don't already have wikitext to work on
         if not self.wikitext:
             self.__fetch_page_data__()
+        if self.fetch_ores and not self.is_redirect and self.found_in_wikipedia:
+            self.__start_ores_scores__()
         if self.is_redirect:
             logger.debug(
                 "Skipped extraction and parsing because the article is a redirect"
@@ -105,9 +120,13 @@ class WikipediaArticle(WariBaseModel):
                 wikitext=self.wikitext,
                 # wikibase=self.wikibase,
                 job=self.job,
+                cached_sections=self.cached_sections,
+                parallel=config.parallel_extraction,
+                use_memo=self.use_reference_memo and config.reference_memo_size > 0,
             )
             self.extractor.extract_all_references()
-            self.__get_ores_scores__()
+            if self.fetch_ores:
+                self.__get_ores_scores__()
             # self.__generate_hash__()
         else:
             raise Exception("This branch should never be hit.")
@@ -142,6 +161,7 @@ class WikipediaArticle(WariBaseModel):
                 self.page_id = int(data["id"])
                 logger.debug(f"Got pageid: {self.page_id}")
                 self.wikitext = data["source"]
+                self.__update_title_index__(canonical_title=data.get("title", ""))
             elif response.status_code == 404:
                 self.found_in_wikipedia = False
                 logger.error(
@@ -156,6 +176,19 @@ class WikipediaArticle(WariBaseModel):
                 "Not fetching data via the Wikipedia REST API. We have already got all the data we need"
             )
 
+    def __update_title_index__(self, canonical_title: str = "") -> None:
+        """Remember the page id of the requested and the canonical title
+        so later cache lookups do not need to ask the API. This also
+        updates the index when a page has been moved."""
+        from src.models.file_io.title_file_io import TitleFileIo
+
+        titles = {self.job.title, canonical_title}
+        for title in titles:
+            if title:
+                TitleFileIo(
+                    lang=self.job.lang, domain=self.job.domain.value, title=title
+                ).write_page_id(page_id=self.page_id)
+
     # def __fetch_wikidata_qid__(self):
     #     """Fetch the Wikidata QID so we can efficiently look up pages via JS"""
     #     url = (
@@ -488,26 +521,50 @@ class WikipediaArticle(WariBaseModel):
         if not self.job.title:
             raise MissingInformationError("self.job.title was empty string")
 
+    def __start_ores_scores__(self) -> None:
+        """Start fetching the ORES score in the background. It only
+        depends on the revision so it runs while we parse the references"""
+        from src.models.api.handlers.fetcher import FetchTask, get_fetcher
+
+        if self.latest_revision_id and not self.ores_future:
+            self.ores_deadline = time.monotonic() + config.ores_timeout
+            self.ores_future = get_fetcher().submit(
+                FetchTask(
+                    function=partial(
+                        self.__fetch_ores_scores__,
+                        wiki_project=f"{self.job.lang}wiki",
+                        revision_id=self.latest_revision_id,
+                    ),
+                    host="ores.wikimedia.org",
+                    details=dict(revision_id=self.latest_revision_id),
+                )
+            )
+
+    @staticmethod
+    def __fetch_ores_scores__(wiki_project: str, revision_id: int) -> Dict[str, Any]:
+        """The score is read from the cache and only fetched
+        from https://ores.wikimedia.org once per revision"""
+        from src.models.wikimedia.ores import OresScoreCache
+
+        return OresScoreCache(wiki=wiki_project).get_score(revision_id=revision_id)
+
     def __get_ores_scores__(self):
+        """Wait for the ORES score but never longer than ores_timeout
+        after it was started because the score is optional"""
         if not self.latest_revision_id and not self.job.testing:
             raise MissingInformationError()
         if self.latest_revision_id:
-            # get the rating from https://ores.wikimedia.org/v3/scores/enwiki/234234320/articlequality
-            # Make a request to the ORES API to get the latest score
-            # We only support Wikipedia for now
-            wiki_project = f"{self.job.lang}wiki"
-            response = requests.get(
-                f"https://ores.wikimedia.org/v3/scores/{wiki_project}/{self.latest_revision_id}/articlequality"
-            )
-            if response.status_code == 200:
-                data = response.json()
-                # console.print(data)
-                string_id = str(self.latest_revision_id)
-                self.ores_quality_prediction = data[wiki_project]["scores"][string_id][
-                    "articlequality"
-                ]["score"]["prediction"]
-                self.ores_details = data[wiki_project]["scores"][string_id][
-                    "articlequality"
-                ]["score"]
-            else:
-                print("Error:", response.status_code)
+            self.__start_ores_scores__()
+            try:
+                score = self.ores_future.result(
+                    timeout=max(0.0, self.ores_deadline - time.monotonic())
+                )
+            except concurrent.futures.TimeoutError:
+                logger.warning("Skipping the ORES score because it timed out")
+                return
+            except Exception as e:  # noqa: BLE001
+                logger.warning(f"Skipping the ORES score, got {e!r}")
+                return
+            if score:
+                self.ores_quality_prediction = score["prediction"]
+                self.ores_details = score
@@ -0,0 +1,90 @@
+import logging
+from typing import Any, Dict, Iterator, List
+
+import requests
+from pydantic import BaseModel
+
+import config
+from src.models.exceptions import WikipediaApiFetchError
+from src.models.wikimedia.enums import WikimediaDomain
+
+logger = logging.getLogger(__name__)
+
+
+class WikipediaBatchQuery(BaseModel):
+    """This looks up many pages of one wiki with few calls to the action API
+
+    The action API accepts up to 50 titles or page ids per call.
+    See https://www.mediawiki.org/wiki/API:Query"""
+
+    lang: str = "en"
+    domain: WikimediaDomain = WikimediaDomain.wikipedia
+    batch_size: int = 50
+
+    @property
+    def api_url(self) -> str:
+        return f"https://{self.lang}.{self.domain.value}/w/api.php"
+
+    @staticmethod
+    def __chunks__(items: List[Any], size: int) -> Iterator[List[Any]]:
+        for start in range(0, len(items), size):
+            yield items[start : start + size]
+
+    def __query__(self, parameters: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Yield every response following continuation
+        which happens when the content is bigger than the result size limit"""
+        parameters = dict(parameters, action="query", format="json", formatversion=2)
+        headers = {"User-Agent": config.user_agent}
+        while True:
+            response = requests.post(
+                self.api_url, data=parameters, headers=headers, timeout=60
+            )
+            if response.status_code != 200:
+                raise WikipediaApiFetchError(
+                    f"Could not fetch page data. Got {response.status_code} from {self.api_url}"
+                )
+            data = response.json()
+            yield data
+            if "continue" not in data:
+                break
+            parameters = dict(parameters, **data["continue"])
+
+    def get_page_info(self, titles: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Return the page info keyed by the titles as given
+
+        The info has pageid and lastrevid or missing or redirect set"""
+        result: Dict[str, Dict[str, Any]] = {}
+        for chunk in self.__chunks__(list(dict.fromkeys(titles)), self.batch_size):
+            for data in self.__query__(dict(prop="info", titles="|".join(chunk))):
+                query = data.get("query", {})
+                # MediaWiki returns the normalized titles, e.g. spaces instead of _
+                normalized = {
+                    entry["to"]: entry["from"] for entry in query.get("normalized", [])
+                }
+                for page in query.get("pages", []):
+                    title = normalized.get(page["title"], page["title"])
+                    result[title] = page
+        return result
+
+    def get_revisions(self, page_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Return the latest revision with the wikitext keyed by page id"""
+        result: Dict[int, Dict[str, Any]] = {}
+        for chunk in self.__chunks__(list(dict.fromkeys(page_ids)), self.batch_size):
+            parameters = dict(
+                prop="revisions",
+                rvprop="ids|timestamp|content",
+                rvslots="main",
+                pageids="|".join(str(page_id) for page_id in chunk),
+            )
+            for data in self.__query__(parameters):
+                for page in data.get("query", {}).get("pages", []):
+                    # With continuation pages without content come back too
+                    if page.get("revisions"):
+                        revision = page["revisions"][0]
+                        result[int(page["pageid"])] = dict(
+                            revid=revision["revid"],
+                            timestamp=revision["timestamp"],
+                            content=revision["slots"]["main"]["content"],
+                            title=page["title"],
+                        )
+        return result
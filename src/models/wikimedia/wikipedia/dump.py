@@ -0,0 +1,66 @@
+import bz2
+import logging
+from typing import IO, Any, Dict, Iterator
+from xml.etree.ElementTree import iterparse
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+class WikipediaDumpReader(BaseModel):
+    """This streams the pages of a MediaWiki XML dump
+    like enwiki-latest-pages-articles.xml.bz2 without loading it in memory
+
+    Only the latest revision of articles in the main namespace
+    is yielded and redirects are skipped."""
+
+    path: str
+    namespace: int = 0
+
+    def __open__(self) -> IO[bytes]:
+        if self.path.endswith(".bz2"):
+            return bz2.open(self.path, "rb")
+        return open(self.path, "rb")
+
+    @staticmethod
+    def __local_name__(tag: str) -> str:
+        """Remove the xml namespace, e.g. {http://www.mediawiki.org/xml/export-0.10/}page"""
+        return tag.rsplit("}", 1)[-1]
+
+    def __parse_page__(self, page) -> Dict[str, Any]:
+        data: Dict[str, Any] = dict(redirect=False)
+        for child in page:
+            name = self.__local_name__(child.tag)
+            if name == "title":
+                data["title"] = child.text or ""
+            elif name == "ns":
+                data["ns"] = int(child.text or 0)
+            elif name == "id":
+                data["page_id"] = int(child.text or 0)
+            elif name == "redirect":
+                data["redirect"] = True
+            elif name == "revision":
+                for revision_child in child:
+                    revision_name = self.__local_name__(revision_child.tag)
+                    if revision_name == "id":
+                        data["revision_id"] = int(revision_child.text or 0)
+                    elif revision_name == "timestamp":
+                        data["timestamp"] = revision_child.text or ""
+                    elif revision_name == "text":
+                        data["wikitext"] = revision_child.text or ""
+        return data
+
+    def get_pages(self) -> Iterator[Dict[str, Any]]:
+        with self.__open__() as file:
+            root = None
+            for event, element in iterparse(file, events=("start", "end")):
+                if root is None:
+                    root = element
+                if event != "end" or self.__local_name__(element.tag) != "page":
+                    continue
+                data = self.__parse_page__(element)
+                # free the memory of the pages we are done with
+                root.clear()
+                if data.get("ns") == self.namespace and not data["redirect"]:
+                    yield data
@@ -0,0 +1,229 @@
+import argparse
+import logging
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
+
+from pydantic import BaseModel
+
+from src.models.api.handlers.bulk_article import ItemErrors, analyze_wikitext
+from src.models.api.job.article_job import ArticleJob
+from src.models.file_io import codec
+from src.models.file_io.article_file_io import ArticleFileIo
+from src.models.file_io.references import ReferencesFileIo
+from src.models.wikimedia.enums import WikimediaDomain
+from src.models.wikimedia.wikipedia.dump import WikipediaDumpReader
+
+logger = logging.getLogger(__name__)
+
+
+def analyze_dump_page(
+    page: Dict[str, Any], lang: str, domain: str, regex: str
+) -> Dict[str, Any]:
+    """Analyze one page of the dump in a worker process
+
+    Errors are returned instead of raised so one broken page
+    does not stop the whole run."""
+    job = ArticleJob(
+        lang=lang,
+        domain=WikimediaDomain(domain),
+        title=page["title"],
+        page_id=page["page_id"],
+        regex=regex,
+    )
+    try:
+        statistics, references = analyze_wikitext(
+            job=job,
+            page_id=page["page_id"],
+            revision_id=page["revision_id"],
+            revision_timestamp=page["timestamp"],
+            wikitext=page["wikitext"],
+        )
+    except ItemErrors as e:
+        return dict(page_id=page["page_id"], error=repr(e))
+    return dict(page_id=page["page_id"], statistics=statistics, references=references)
+
+
+class WikipediaDumpIngester(BaseModel):
+    """This analyzes every article in a local XML dump without any network
+
+    The pages are parsed in a process pool and written through the
+    storage layer one batch at a time. After every batch the id of the
+    last page is written to a checkpoint file so an interrupted run
+    can be resumed. This relies on the pages being sorted by page id
+    like they are in the dumps."""
+
+    dump: str = ""
+    lang: str = "en"
+    domain: WikimediaDomain = WikimediaDomain.wikipedia
+    regex: str = "bibliography|further reading|works cited|sources|external links"
+    processes: int = 0
+    batch_size: int = 200
+    checkpoint: str = ""
+    limit: int = 0
+    # The ORES scores are fetched in batches when this is set
+    ores: bool = False
+    analyzed: int = 0
+    failed: int = 0
+    skipped: int = 0
+
+    @staticmethod
+    def __setup_argparse_and_return_args__():
+        parser = argparse.ArgumentParser(
+            formatter_class=argparse.RawDescriptionHelpFormatter,
+            description="""
+Analyze all articles in a Wikipedia XML dump and store the statistics
+in the cache just like the article endpoint does.
+
+Example:
+'$ python ingest_dump.py --lang sv svwiki-latest-pages-articles.xml.bz2'
+
+Run the same command again to resume from the checkpoint.""",
+        )
+        parser.add_argument("dump", help="Path to a pages-articles xml dump")
+        parser.add_argument("--lang", default="en", help="Language code of the wiki")
+        parser.add_argument(
+            "--regex",
+            default=WikipediaDumpIngester.__fields__["regex"].default,
+            help="Regex of the section headings with general references",
+        )
+        parser.add_argument(
+            "--processes", type=int, default=0, help="Default is one per CPU"
+        )
+        parser.add_argument("--batch-size", type=int, default=200)
+        parser.add_argument(
+            "--checkpoint",
+            default="",
+            help="Default is the dump path with .checkpoint.json appended",
+        )
+        parser.add_argument(
+            "--limit", type=int, default=0, help="Stop after this many articles"
+        )
+        parser.add_argument(
+            "--ores",
+            action="store_true",
+            help="Get the ORES scores which needs network access",
+        )
+        return parser.parse_args()
+
+    @property
+    def checkpoint_path(self) -> str:
+        return self.checkpoint or f"{self.dump}.checkpoint.json"
+
+    def read_checkpoint(self) -> int:
+        """Return the last page id that has been written or 0"""
+        data = codec.read(self.checkpoint_path)
+        if data and data.get("dump") == os.path.basename(self.dump):
+            return int(data["page_id"])
+        return 0
+
+    def __write_checkpoint__(self, page_id: int) -> None:
+        codec.write_atomically(
+            path_filename=self.checkpoint_path,
+            data=dict(
+                dump=os.path.basename(self.dump),
+                page_id=page_id,
+                analyzed=self.analyzed,
+                failed=self.failed,
+            ),
+        )
+
+    def __get_batches__(self, start_after: int) -> Iterator[List[Dict[str, Any]]]:
+        batch: List[Dict[str, Any]] = []
+        count = 0
+        for page in WikipediaDumpReader(path=self.dump).get_pages():
+            if page["page_id"] <= start_after:
+                continue
+            if not page["wikitext"]:
+                # The article would fetch its wikitext from Wikipedia
+                # but the ingester never uses the network
+                logger.debug(f"skipping page {page['page_id']} without wikitext")
+                self.skipped += 1
+                continue
+            batch.append(page)
+            count += 1
+            if len(batch) >= self.batch_size or count == self.limit:
+                yield batch
+                batch = []
+            if count == self.limit:
+                return
+        if batch:
+            yield batch
+
+    def __add_ores_scores__(self, results: List[Dict[str, Any]]) -> None:
+        from src.models.wikimedia.ores import OresScoreCache
+
+        statistics = [
+            result["statistics"] for result in results if result.get("statistics")
+        ]
+        scores = OresScoreCache(wiki=f"{self.lang}wiki").get_scores(
+            revision_ids=[data["revision_id"] for data in statistics]
+        )
+        for data in statistics:
+            data["ores_score"] = scores.get(data["revision_id"], {})
+
+    def __write_batch__(self, results: List[Dict[str, Any]]) -> None:
+        references: List[Dict[str, Any]] = []
+        if self.ores:
+            try:
+                self.__add_ores_scores__(results=results)
+            except ItemErrors as e:
+                logger.warning(f"writing the batch without ORES scores: {e}")
+        for result in results:
+            if "error" in result:
+                logger.error(f"page {result['page_id']} failed: {result['error']}")
+                self.failed += 1
+                continue
+            statistics = result["statistics"]
+            if not statistics:
+                continue
+            ArticleFileIo(
+                wari_id=statistics["wari_id"], data=statistics
+            ).write_to_disk()
+            references.extend(result["references"])
+            self.analyzed += 1
+        # one call for the whole batch which is one transaction with sqlite
+        ReferencesFileIo(references=references).write_references_to_disk()
+
+    def ingest(self, executor: Optional[Executor] = None) -> None:
+        start_after = self.read_checkpoint()
+        if start_after:
+            logger.info(f"resuming after page id {start_after}")
+        own_executor = executor is None
+        executor = executor or ProcessPoolExecutor(
+            max_workers=self.processes or os.cpu_count()
+        )
+        try:
+            for batch in self.__get_batches__(start_after=start_after):
+                results = list(
+                    executor.map(
+                        analyze_dump_page,
+                        batch,
+                        [self.lang] * len(batch),
+                        [self.domain.value] * len(batch),
+                        [self.regex] * len(batch),
+                        chunksize=max(1, len(batch) // 32),
+                    )
+                )
+                self.__write_batch__(results=results)
+                self.__write_checkpoint__(page_id=batch[-1]["page_id"])
+                logger.info(
+                    f"analyzed {self.analyzed} articles, {self.failed} failed, "
+                    f"{self.skipped} empty skipped, "
+                    f"up to page id {batch[-1]['page_id']}"
+                )
+        finally:
+            if own_executor:
+                executor.shutdown()
+
+    def run(self) -> None:
+        args = self.__setup_argparse_and_return_args__()
+        self.dump = args.dump
+        self.lang = args.lang
+        self.regex = args.regex
+        self.processes = args.processes
+        self.batch_size = args.batch_size
+        self.checkpoint = args.checkpoint
+        self.limit = args.limit
+        self.ores = args.ores
+        self.ingest()
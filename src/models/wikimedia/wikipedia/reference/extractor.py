@@ -1,12 +1,15 @@
 import logging
-from typing import Dict, List
+from concurrent.futures import Future
+from multiprocessing import parent_process
+from typing import Any, Dict, List, Optional, Tuple
 
-import mwparserfromhell  # type: ignore
 from mwparserfromhell.wikicode import Wikicode  # type: ignore
 
+import config
 from src.models.api.job.article_job import ArticleJob
 from src.models.base import WariBaseModel
 from src.models.exceptions import MissingInformationError
+from src.models.mediawiki.parsed_wikitext import ParsedWikitext
 from src.models.mediawiki.section import MediawikiSection
 from src.models.wikimedia.wikipedia.reference.generic import WikipediaReference
 from src.models.wikimedia.wikipedia.url import WikipediaUrl
@@ -27,6 +30,8 @@ class WikipediaReferenceExtractor(WariBaseModel):
     job: ArticleJob
     wikitext: str
     wikicode: Wikicode = None
+    # The page is parsed once and the sections and lines are cut out of this
+    parsed: Optional[ParsedWikitext] = None
     references: List[WikipediaReference] = []
     # wikibase: Wikibase
     testing: bool = False
@@ -35,6 +40,14 @@ class WikipediaReferenceExtractor(WariBaseModel):
     checked_and_unique_reference_urls: List[WikipediaUrl] = []
     language_code: str = ""
     sections: List[MediawikiSection] = []
+    # Reference statistics of an earlier analysis by section content hash
+    cached_sections: Dict[str, List[Dict[str, Any]]] = {}
+    # Sections skipped by the pre-scan because they contain no references
+    number_of_fast_path_sections: int = 0
+    # Extract large sections in the section process pool
+    parallel: bool = False
+    # Take the statistics of identical references from the reference memo
+    use_memo: bool = False
 
     class Config:  # dead: disable
         arbitrary_types_allowed = True  # dead: disable
@@ -94,6 +107,24 @@ class WikipediaReferenceExtractor(WariBaseModel):
             self.__extract_sections__()
         return len(self.sections)
 
+    @property
+    def recomputed_sections(self) -> List[str]:
+        """Names of the sections that were extracted and not reused"""
+        return [section.name for section in self.sections if not section.reused]
+
+    @property
+    def section_hashes(self) -> List[Dict[str, Any]]:
+        """This is stored with the article statistics so the next
+        analysis can reuse the references of unchanged sections"""
+        return [
+            dict(
+                name=section.name,
+                hash=section.content_hash,
+                reference_ids=section.reference_ids,
+            )
+            for section in self.sections
+        ]
+
     @property
     def general_references(self):
         return [
@@ -187,8 +218,9 @@ class WikipediaReferenceExtractor(WariBaseModel):
         from src import app
 
         app.logger.debug("__extract_sections__: running")
-        if not self.wikicode:
-            self.__parse_wikitext__()
+        self.__parse_wikitext__()
+        if not self.parsed:
+            raise MissingInformationError()
         sections: List[Wikicode] = self.wikicode.get_sections(
             levels=[2],
             include_headings=True,
@@ -200,31 +232,116 @@ class WikipediaReferenceExtractor(WariBaseModel):
             mw_section = MediawikiSection(
                 # We add the whole article to the root section
                 wikicode=self.wikicode,
+                wikitext=self.parsed.wikitext,
+                parsed=self.parsed,
                 testing=self.testing,
                 language_code=self.language_code,
                 job=self.job,
+                use_memo=self.use_memo,
             )
-            mw_section.extract()
+            self.__extract_or_reuse__(mw_section=mw_section)
             self.sections.append(mw_section)
         else:
             self.__extract_root_section__()
-            for section in sections:
-                mw_section = MediawikiSection(
+            mw_sections = [
+                MediawikiSection(
                     wikicode=section,
+                    wikitext=self.parsed.text_of(wikicode=section),
+                    parsed=self.parsed,
+                    offset=self.parsed.start_of(wikicode=section),
                     testing=self.testing,
                     language_code=self.language_code,
                     job=self.job,
+                    use_memo=self.use_memo,
                 )
-                mw_section.extract()
+                for section in sections
+            ]
+            futures = self.__submit_large_sections__(mw_sections=mw_sections)
+            for mw_section in mw_sections:
+                if id(mw_section) not in futures:
+                    self.__extract_or_reuse__(mw_section=mw_section)
                 self.sections.append(mw_section)
+            # The sections are already in document order so we only fill them in
+            for mw_section, future in futures.values():
+                records, memo_hits = future.result()
+                mw_section.use_pool_records(records=records, memo_hits=memo_hits)
         app.logger.debug(f"Number of sections found: {len(self.sections)}")
+        app.logger.debug(
+            f"Number of sections without references skipped: "
+            f"{self.number_of_fast_path_sections}"
+        )
+
+    def __submit_large_sections__(
+        self, mw_sections: List[MediawikiSection]
+    ) -> Dict[int, Tuple[MediawikiSection, Future]]:
+        """Send the large sections to the section process pool
+
+        This returns the futures by id of the section. Nothing is sent
+        unless at least two sections are large enough to gain from it or
+        if we are already running in a worker process, e.g. of the bulk
+        endpoint or the dump ingester."""
+        if not self.parallel or parent_process() is not None:
+            return {}
+        from src.models.wikimedia.wikipedia.reference.section_pool import (
+            extract_section_records,
+            get_process_pool,
+        )
+
+        large_sections = [
+            mw_section
+            for mw_section in mw_sections
+            if len(mw_section.wikitext) >= config.parallel_extraction_min_section_length
+            and mw_section.content_hash not in self.cached_sections
+            and mw_section.might_contain_references
+        ]
+        if len(large_sections) < 2:
+            return {}
+        logger.debug(
+            f"Extracting {len(large_sections)} large sections in the process pool"
+        )
+        pool = get_process_pool()
+        return {
+            id(mw_section): (
+                mw_section,
+                pool.submit(
+                    extract_section_records,
+                    job=self.job,
+                    wikitext=mw_section.wikitext,
+                    language_code=self.language_code,
+                    testing=self.testing,
+                    use_memo=self.use_memo,
+                ),
+            )
+            for mw_section in large_sections
+        }
+
+    def __extract_or_reuse__(self, mw_section: MediawikiSection) -> None:
+        content_hash = mw_section.content_hash
+        if content_hash in self.cached_sections:
+            logger.debug(f"reusing the references of unchanged section {content_hash}")
+            mw_section.reuse(cached_references=self.cached_sections[content_hash])
+        else:
+            mw_section.extract()
+            if mw_section.fast_path:
+                self.number_of_fast_path_sections += 1
 
     def __parse_wikitext__(self):
         from src import app
 
         app.logger.debug("__parse_wikitext__: running")
-        if not self.wikicode:
-            self.wikicode = mwparserfromhell.parse(self.wikitext)
+        if not self.parsed:
+            if self.wikicode:
+                self.parsed = ParsedWikitext(
+                    wikitext=str(self.wikicode), wikicode=self.wikicode
+                )
+            else:
+                self.parsed = ParsedWikitext.parse(self.wikitext)
+                self.wikicode = self.parsed.wikicode
+
+    @property
+    def number_of_memo_hits(self) -> int:
+        """References whose statistic was taken from the reference memo"""
+        return sum(section.memo_hits for section in self.sections)
 
     @property
     def reference_ids(self) -> List[str]:
@@ -242,39 +359,38 @@ class WikipediaReferenceExtractor(WariBaseModel):
         """This extracts the root section from the beginning until the first level 2 heading"""
         if not self.wikitext:
             raise MissingInformationError()
+        if not self.parsed:
+            raise MissingInformationError()
+        lines = self.parsed.wikitext.splitlines()
         first_level2_heading_line_number = 0
-        for index, line in enumerate(self.wikitext.splitlines()):
+        for index, line in enumerate(lines):
             if "==" in line:
                 logger.debug(f"found == in line: {line}, with index {index}")
                 first_level2_heading_line_number = index
                 # We break at first hit
                 break
         if first_level2_heading_line_number:
-            root_section_wikitext = self.extract_lines(
-                end=first_level2_heading_line_number
+            root_section_wikitext = (
+                "\n".join(lines[:first_level2_heading_line_number]) + "\n"
             )
-            # console.print(root_section_wikitext)
-            # exit()
+            # We cut the root section out of the parsed page unless the
+            # lines were separated by something else than a newline
+            wikicode = None
+            if self.parsed.wikitext.startswith(root_section_wikitext):
+                wikicode = self.parsed.slice(start=0, end=len(root_section_wikitext))
             mw_section = MediawikiSection(
                 wikitext=root_section_wikitext,
+                wikicode=wikicode,
+                parsed=self.parsed if wikicode is not None else None,
                 testing=self.testing,
                 language_code=self.language_code,
                 job=self.job,
+                use_memo=self.use_memo,
             )
-            mw_section.extract()
+            self.__extract_or_reuse__(mw_section=mw_section)
             self.sections.append(mw_section)
         else:
             logger.debug(
                 "Special case, wikitext started with a "
                 "level 2 heading so we don't do anything"
             )
-
-    def extract_lines(self, end) -> str:
-        """Extract lines until end"""
-        lines = ""
-        if not end:
-            raise MissingInformationError("did not get what we need")
-        for index, line in enumerate(str(self.wikicode).splitlines()):
-            if index < end:
-                lines += f"{line}\n"
-        return lines
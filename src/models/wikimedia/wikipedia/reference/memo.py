@@ -0,0 +1,82 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import config
+from src.models.file_io.reference_memo_file_io import ReferenceMemoFileIo
+
+logger = logging.getLogger(__name__)
+
+
+def reference_memo_key(
+    wikitext: str, is_general_reference: bool, language_code: str
+) -> str:
+    """The statistic of a reference only depends on these"""
+    return hashlib.md5(
+        f"{language_code}|{int(is_general_reference)}|{wikitext}".encode()
+    ).hexdigest()
+
+
+class ReferenceMemo:
+    """Bounded memo of reference statistics by content hash
+
+    Only the statistic is kept, not the extracted reference with its
+    wikicode, so an entry is small. The least recently used entries are
+    dropped when it is full. With storage the statistics are also kept
+    in the cache so they are shared across workers and restarts."""
+
+    def __init__(self, max_size: int, storage: bool = False):
+        self.max_size = max_size
+        self.storage = storage
+        self.entries: OrderedDict = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            data = self.entries.get(key)
+            if data is not None:
+                self.entries.move_to_end(key)
+                return data
+        if self.storage:
+            io = ReferenceMemoFileIo(hash_based_id=key)
+            io.read_from_disk()
+            if io.data:
+                data = dict(io.data)
+                data.pop("served_from_cache", None)
+                self.__remember__(key=key, data=data)
+                return data
+        return None
+
+    def put(self, key: str, data: Dict[str, Any]) -> None:
+        self.__remember__(key=key, data=data)
+        if self.storage:
+            ReferenceMemoFileIo(hash_based_id=key, data=data).write_to_disk()
+
+    def __remember__(self, key: str, data: Dict[str, Any]) -> None:
+        with self.lock:
+            self.entries[key] = data
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+
+_reference_memo: Optional[ReferenceMemo] = None
+_reference_memo_lock = threading.Lock()
+
+
+def get_reference_memo() -> ReferenceMemo:
+    """Return the reference memo of this process and create it if needed"""
+    global _reference_memo
+    with _reference_memo_lock:
+        if (
+            _reference_memo is None
+            or _reference_memo.max_size != config.reference_memo_size
+            or _reference_memo.storage != config.reference_memo_storage
+        ):
+            _reference_memo = ReferenceMemo(
+                max_size=config.reference_memo_size,
+                storage=config.reference_memo_storage,
+            )
+        return _reference_memo
@@ -0,0 +1,56 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import config
+from src.models.api.job.article_job import ArticleJob
+from src.models.mediawiki.section import MediawikiSection
+
+logger = logging.getLogger(__name__)
+
+
+def extract_section_records(
+    job: ArticleJob,
+    wikitext: str,
+    language_code: str,
+    testing: bool,
+    use_memo: bool = False,
+) -> Tuple[List[Dict[str, Any]], int]:
+    """Extract the references of one section and return their
+    statistics and how many of them were found in the reference memo
+
+    This runs in a worker process so it has to be a top-level function
+    and everything going in and out has to be picklable."""
+    section = MediawikiSection(
+        wikitext=wikitext,
+        job=job,
+        language_code=language_code,
+        testing=testing,
+        use_memo=use_memo,
+    )
+    section.extract()
+    return section.reference_statistics, section.memo_hits
+
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Return the section process pool of this worker and start it if needed
+
+    The pool is kept for the lifetime of the worker so the processes
+    are warm when the next large article arrives. They are started by
+    a forkserver because forking a worker with running threads can
+    deadlock on a lock one of them held."""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(
+                max_workers=config.parallel_extraction_processes or os.cpu_count(),
+                mp_context=multiprocessing.get_context("forkserver"),
+            )
+        return _process_pool
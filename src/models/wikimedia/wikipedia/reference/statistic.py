@@ -0,0 +1,33 @@
+from typing import Any, Dict
+
+from src.models.api.statistic.reference import ReferenceStatistic
+from src.models.exceptions import MissingInformationError
+from src.models.wikimedia.wikipedia.reference.generic import WikipediaReference
+
+
+def get_reference_statistic(reference: WikipediaReference) -> Dict[str, Any]:
+    """Return the statistic of an extracted reference as in the API output
+
+    This is used both by the sections when extracting
+    and by the analyzer so it lives on its own."""
+    if not reference:
+        raise MissingInformationError("raw_reference was None")
+    if reference.footnote_subtype:
+        subtype = reference.footnote_subtype.value
+    else:
+        subtype = ""
+    # if not rr.get_wikicode_as_string:
+    #     raise MissingInformationError()
+    return ReferenceStatistic(
+        # identifiers=rr.identifiers,
+        flds=reference.first_level_domains,
+        footnote_subtype=subtype,
+        id=reference.reference_id,
+        template_names=reference.template_names,
+        templates=reference.get_template_dicts,
+        titles=reference.titles,
+        type=reference.reference_type.value,
+        urls=reference.raw_urls,
+        wikitext=reference.get_wikicode_as_string,
+        section=reference.section,
+    ).dict()
@@ -2,6 +2,8 @@ import hashlib
 from datetime import datetime
 from typing import Any, Dict, Optional
 
+import config
+from src.models.api.freshness import FreshnessPolicy
 from src.models.api.job.check_doi_job import CheckDoiJob
 from src.models.api.schema.check_doi_schema import CheckDoiSchema
 from src.models.exceptions import MissingInformationError
@@ -26,6 +28,10 @@ class CheckDoi(StatisticsWriteView):
         "Access-Control-Allow-Origin": "*",
     }
     data: Dict[str, Any] = {}
+    freshness_policy = FreshnessPolicy(
+        fresh_seconds=config.check_doi_fresh_seconds,
+        stale_seconds=config.check_doi_stale_seconds,
+    )
 
     def get(self):
         """This is the main method and the entrypoint for flask
@@ -42,23 +48,11 @@ class CheckDoi(StatisticsWriteView):
 
         app.logger.debug("__handle_valid_job__; running")
 
-        self.__read_from_cache__()
-        if self.io.data and not self.job.refresh:
-            return self.io.data, 200
+        data = None if self.job.refresh else self.__get_usable_cached_data__()
+        if data:
+            return data, 200
         else:
-            doi_string = self.job.unquoted_doi
-            app.logger.info(f"Got {doi_string}")
-            doi = Doi(doi=doi_string, timeout=self.job.timeout)
-            doi.lookup_doi()
-            data = doi.get_doi_dictionary()
-            timestamp = datetime.timestamp(datetime.utcnow())
-            data["timestamp"] = int(timestamp)
-            isodate = datetime.isoformat(datetime.utcnow())
-            data["isodate"] = str(isodate)
-            doi_hash_id = self.__doi_hash_id__
-            data["id"] = doi_hash_id
-            write = DoiFileIo(data=data, hash_based_id=doi_hash_id)
-            write.write_to_disk()
+            data = self.__single_flight__(compute=self.__compute_and_write__)
             if self.job.refresh:
                 self.__print_log_message_about_refresh__()
                 data["refreshed_now"] = True
@@ -66,6 +60,24 @@ class CheckDoi(StatisticsWriteView):
                 data["refreshed_now"] = False
             return data, 200
 
+    def __compute_and_write__(self) -> Dict[str, Any]:
+        from src import app
+
+        doi_string = self.job.unquoted_doi
+        app.logger.info(f"Got {doi_string}")
+        doi = Doi(doi=doi_string, timeout=self.job.timeout)
+        doi.lookup_doi()
+        data = doi.get_doi_dictionary()
+        timestamp = datetime.timestamp(datetime.utcnow())
+        data["timestamp"] = int(timestamp)
+        isodate = datetime.isoformat(datetime.utcnow())
+        data["isodate"] = str(isodate)
+        doi_hash_id = self.__doi_hash_id__
+        data["id"] = doi_hash_id
+        write = DoiFileIo(data=data, hash_based_id=doi_hash_id)
+        write.write_to_disk()
+        return data
+
     def __setup_io__(self):
         self.io = DoiFileIo(hash_based_id=self.__doi_hash_id__)
 
@@ -5,6 +5,8 @@ from typing import Any, Dict, Optional
 from flask_restful import Resource, abort  # type: ignore
 from marshmallow import Schema
 
+import config
+from src.models.api.freshness import FreshnessPolicy
 from src.models.api.job.check_url_job import UrlJob
 from src.models.api.schema.check_url_schema import UrlSchema
 from src.models.exceptions import MissingInformationError
@@ -29,6 +31,10 @@ class CheckUrl(StatisticsWriteView):
         "Access-Control-Allow-Origin": "*",
     }
     data: Dict[str, Any] = {}
+    freshness_policy = FreshnessPolicy(
+        fresh_seconds=config.check_url_fresh_seconds,
+        stale_seconds=config.check_url_stale_seconds,
+    )
 
     @property
     def __url_hash_id__(self) -> str:
@@ -56,26 +62,32 @@ class CheckUrl(StatisticsWriteView):
 
         app.logger.debug("__handle_valid_job__; running")
 
-        self.__read_from_cache__()
-        if self.io.data and not self.job.refresh:
-            return self.io.data, 200
+        data = None if self.job.refresh else self.__get_usable_cached_data__()
+        if data:
+            return data, 200
         else:
-            url_string = self.job.unquoted_url
-            app.logger.info(f"Got {url_string}")
-            url = Url(url=url_string, timeout=self.job.timeout)
-            url.check()
-            data = url.get_dict()
-            timestamp = datetime.timestamp(datetime.utcnow())
-            data["timestamp"] = int(timestamp)
-            isodate = datetime.isoformat(datetime.utcnow())
-            data["isodate"] = str(isodate)
-            url_hash_id = self.__url_hash_id__
-            data["id"] = url_hash_id
-            write = UrlFileIo(data=data, hash_based_id=url_hash_id)
-            write.write_to_disk()
+            data = self.__single_flight__(compute=self.__compute_and_write__)
             if self.job.refresh:
                 self.__print_log_message_about_refresh__()
                 data["refreshed_now"] = True
             else:
                 data["refreshed_now"] = False
             return data, 200
+
+    def __compute_and_write__(self) -> Dict[str, Any]:
+        from src import app
+
+        url_string = self.job.unquoted_url
+        app.logger.info(f"Got {url_string}")
+        url = Url(url=url_string, timeout=self.job.timeout)
+        url.check()
+        data = url.get_dict()
+        timestamp = datetime.timestamp(datetime.utcnow())
+        data["timestamp"] = int(timestamp)
+        isodate = datetime.isoformat(datetime.utcnow())
+        data["isodate"] = str(isodate)
+        url_hash_id = self.__url_hash_id__
+        data["id"] = url_hash_id
+        write = UrlFileIo(data=data, hash_based_id=url_hash_id)
+        write.write_to_disk()
+        return data
@@ -1,6 +1,8 @@
+from flask import Response, stream_with_context
+
 from src.models.api.handlers.all import AllHandler
-from src.models.api.job.article_job import ArticleJob
-from src.models.api.schema.article_schema import ArticleSchema
+from src.models.api.job.all_job import AllJob
+from src.models.api.schema.all_schema import AllSchema
 from src.views.statistics import StatisticsView
 
 
@@ -11,11 +13,17 @@ class All(StatisticsView):
     def __setup_io__(self):
         pass
 
-    schema = ArticleSchema()
-    job: ArticleJob
+    schema = AllSchema()
+    job: AllJob
 
     def get(self):
         self.__validate_and_get_job__()
         handler = AllHandler(job=self.job)
+        if self.job.stream == "ndjson":
+            # Every record is sent to the patron as soon as it resolves
+            return Response(
+                stream_with_context(handler.ndjson_lines()),
+                mimetype="application/x-ndjson",
+            )
         handler.fetch_and_compile()
         return handler.compilation, 200
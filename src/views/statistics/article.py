@@ -1,15 +1,21 @@
 from datetime import datetime
-from typing import Any, Tuple
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple
 
+from dateutil.parser import isoparse
 from flask_restful import Resource, abort  # type: ignore
 
+import config
 from src.models.api.job.article_job import ArticleJob
 from src.models.api.schema.article_schema import ArticleSchema
 from src.models.exceptions import MissingInformationError
+from src.models.file_io.analysis_file_io import AnalysisFileIo
 from src.models.file_io.article_file_io import ArticleFileIo
 from src.models.file_io.references import ReferencesFileIo
+from src.models.file_io.wikitext_file_io import WikitextFileIo
 from src.models.wikimedia.enums import AnalyzerReturn, WikimediaDomain
 from src.models.wikimedia.wikipedia.analyzer import WikipediaAnalyzer
+from src.models.wikimedia.wikipedia.article import WikipediaArticle
 from src.views.statistics.write_view import StatisticsWriteView
 
 
@@ -19,6 +25,10 @@ class Article(StatisticsWriteView):
 
     schema = ArticleSchema()
     job: ArticleJob
+    # This is set when we ask Wikipedia for the latest revision on refresh
+    latest_revision_id: int = 0
+    # The wikitext of a revision we analyzed before
+    stored_wikitext: Optional[Dict[str, Any]] = None
 
     def __analyze_and_write_and_return__(self) -> Tuple[Any, int]:
         """Analyze, calculate the time, write statistics to disk and return it
@@ -57,19 +67,166 @@ class Article(StatisticsWriteView):
         self.__read_from_cache__()
         if self.io.data and not self.job.refresh:
             app.logger.info("trying to read from cache")
-            self.__read_from_cache__()
-            if self.io.data:
+            if AnalysisFileIo.same_regex(self.io.data.get("regex", ""), self.job.regex):
                 # We got the statistics from json, return them as is
                 app.logger.info(
                     f"Returning existing json from disk with date: {self.time_of_analysis}"
                 )
                 return self.io.data, 200
+            app.logger.info("the cached analysis was made with another regex")
+            result = self.__get_analysis_of_revision__(
+                revision_id=self.io.data.get("revision_id", 0)
+            )
+            if result:
+                return result
+            return self.__single_flight__(compute=self.__analyze__)
         else:
             app.logger.info("got refresh from patron")
             # This will run if we did not return an analysis from disk yet
             self.__print_log_message_about_refresh__()
-            self.__setup_wikipedia_analyzer__()
-            return self.__analyze_and_write_and_return__()
+            if self.__cached_analysis_is_current__():
+                return self.__bump_and_return_cached_analysis__()
+            result = self.__get_analysis_of_revision__(
+                revision_id=self.latest_revision_id
+            )
+            if result:
+                return result
+            return self.__single_flight__(compute=self.__analyze__)
+
+    def __get_analysis_of_revision__(
+        self, revision_id: int
+    ) -> Optional[Tuple[Any, int]]:
+        """Return the analysis of the revision with the regex of the patron
+        if we have it or analyze the stored wikitext of the revision.
+        Returns None if we have neither and the wikitext has to be fetched"""
+        from src import app
+
+        if not revision_id:
+            return None
+        analysis_io = AnalysisFileIo(
+            article_wari_id=self.io.key, revision_id=revision_id, regex=self.job.regex
+        )
+        analysis_io.read_from_disk()
+        if analysis_io.data:
+            app.logger.info(f"Returning the analysis of revision {revision_id}")
+            analysis_io.data["served_from_cache"] = True
+            return analysis_io.data, 200
+        wikitext_io = WikitextFileIo(
+            article_wari_id=self.io.key, revision_id=revision_id
+        )
+        wikitext_io.read_from_disk()
+        if wikitext_io.data:
+            app.logger.info(f"Analyzing the stored wikitext of revision {revision_id}")
+            return self.__single_flight__(
+                compute=partial(self.__analyze__, stored_wikitext=wikitext_io.data)
+            )
+        return None
+
+    def __analyze__(
+        self, stored_wikitext: Optional[Dict[str, Any]] = None
+    ) -> Tuple[Any, int]:
+        self.__setup_wikipedia_analyzer__()
+        self.wikipedia_analyzer.cached_sections = self.__get_cached_sections__()
+        if stored_wikitext:
+            self.stored_wikitext = stored_wikitext
+            article = WikipediaArticle(
+                job=self.job,
+                wikitext=stored_wikitext["wikitext"],
+                page_id=stored_wikitext["page_id"],
+                latest_revision_id=stored_wikitext["revision_id"],
+                latest_revision_date=isoparse(stored_wikitext["revision_timestamp"]),
+                cached_sections=self.wikipedia_analyzer.cached_sections,
+                use_reference_memo=True,
+            )
+            article.fetch_and_extract_and_parse()
+            self.wikipedia_analyzer.article = article
+        return self.__analyze_and_write_and_return__()
+
+    def __read_result_since__(self, started: int) -> Optional[Tuple[Any, int]]:
+        """Another worker can be analyzing the same article with another regex"""
+        data = super().__read_result_since__(started=started)
+        if data and AnalysisFileIo.same_regex(data.get("regex", ""), self.job.regex):
+            return data, 200
+        return None
+
+    def __cached_analysis_is_current__(self) -> bool:
+        """The cached analysis is still valid if it was built from the
+        latest revision with the same regex. We only fetch the revision id
+        here which is a lot cheaper than fetching and parsing the wikitext"""
+        from src import app
+
+        if not self.io or not self.io.data:
+            return False
+        revision_id = self.io.data.get("revision_id")
+        if not revision_id:
+            return False
+        page_id = self.job.page_id
+        self.latest_revision_id = self.job.get_latest_revision_id()
+        if self.job.page_id != page_id:
+            app.logger.info("the title belongs to another page now")
+            self.__read_from_cache__()
+            if not self.io.data:
+                return False
+            revision_id = self.io.data.get("revision_id")
+        if not AnalysisFileIo.same_regex(self.io.data.get("regex", ""), self.job.regex):
+            return False
+        if self.latest_revision_id == revision_id:
+            app.logger.info(
+                f"Revision {revision_id} has already been analyzed, skipping analysis"
+            )
+            return True
+        return False
+
+    def __bump_and_return_cached_analysis__(self) -> Tuple[Any, int]:
+        """Update the time information of the cached analysis
+        and write only the article json because the references are unchanged
+
+        The flag was set when reading from the cache and is not stored."""
+        self.io.data.pop("served_from_cache", None)
+        self.__update_statistics_with_time_information__()
+        if not self.job.testing:
+            ArticleFileIo(
+                job=self.job, data=self.io.data, wari_id=self.io.data["wari_id"]
+            ).write_to_disk()
+        return dict(self.io.data, served_from_cache=True), 200
+
+    def __get_cached_sections__(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Return the reference statistics of the cached analysis by section
+        content hash so only the sections that changed since are extracted
+
+        The general references depend on the regex so nothing is reused
+        if it changed. A section with any reference missing in the cache
+        is extracted again."""
+        from src import app
+
+        if (
+            not self.io
+            or not self.io.data
+            or not self.io.data.get("sections")
+            or not AnalysisFileIo.same_regex(
+                self.io.data.get("regex", ""), self.job.regex
+            )
+        ):
+            return {}
+        sections = self.io.data["sections"]
+        references, missing = ReferencesFileIo.read_references_from_disk(
+            ids=[id_ for section in sections for id_ in section["reference_ids"]]
+        )
+        found = {}
+        for data in references:
+            data.pop("served_from_cache", None)
+            found[data["id"]] = data
+        cached_sections = {}
+        for section in sections:
+            if all(id_ in found for id_ in section["reference_ids"]):
+                cached_sections[section["hash"]] = [
+                    found[id_] for id_ in section["reference_ids"]
+                ]
+        app.logger.info(
+            f"Found {len(cached_sections)} sections in the cached analysis "
+            f"and {len(missing)} missing references"
+        )
+        return cached_sections
 
     def __get_statistics__(self):
         from src import app
@@ -99,6 +256,7 @@ class Article(StatisticsWriteView):
         if not self.job.testing:
             self.__write_article_to_disk__()
             self.__write_references_to_disk__()
+            self.__write_analysis_and_wikitext_to_disk__()
 
     def __return_meaningful_error__(self):
         from src import app
@@ -144,7 +302,38 @@ class Article(StatisticsWriteView):
         article_io.write_to_disk()
 
     def __write_references_to_disk__(self):
+        # The references of unchanged sections are already on disk
         references_file_io = ReferencesFileIo(
-            references=self.wikipedia_analyzer.reference_statistics
+            references=self.wikipedia_analyzer.recomputed_reference_statistics
         )
         references_file_io.write_references_to_disk()
+
+    def __write_analysis_and_wikitext_to_disk__(self):
+        """Store the analysis by revision and regex and the wikitext
+        so another regex can be evaluated without fetching it again"""
+        article = self.wikipedia_analyzer.article
+        if not article or not article.latest_revision_id:
+            return
+        wari_id = self.wikipedia_analyzer.wari_id
+        AnalysisFileIo(
+            article_wari_id=wari_id,
+            revision_id=article.latest_revision_id,
+            regex=self.job.regex,
+            data=self.io.data,
+        ).write_to_disk()
+        if (
+            config.store_wikitext
+            and not self.stored_wikitext
+            and article.latest_revision_date
+        ):
+            WikitextFileIo(
+                article_wari_id=wari_id,
+                revision_id=article.latest_revision_id,
+                data=dict(
+                    title=self.job.title,
+                    page_id=article.page_id,
+                    revision_id=article.latest_revision_id,
+                    revision_timestamp=article.latest_revision_date.isoformat(),
+                    wikitext=article.wikitext,
+                ),
+            ).write_to_disk()
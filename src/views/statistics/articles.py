@@ -0,0 +1,37 @@
+from flask import request
+from flask_restful import abort  # type: ignore
+
+from src.models.api.handlers.bulk_article import BulkArticleHandler
+from src.models.api.job.articles_job import ArticlesJob
+from src.models.api.schema.articles_schema import ArticlesSchema
+from src.views.statistics import StatisticsView
+
+
+class Articles(StatisticsView):
+    """This analyzes many articles in one POST request with
+    a json body like {"urls": [...], "regex": "..."}
+
+    Every article gets its own result with a status code so
+    one failing article does not fail the whole request."""
+
+    schema = ArticlesSchema()
+    job: ArticlesJob
+
+    def __setup_io__(self):
+        pass
+
+    def post(self):
+        from src import app
+
+        app.logger.debug("post: running")
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict):
+            abort(400, error="expected a json body")
+        errors = self.schema.validate(body)
+        if errors:
+            app.logger.debug(f"Found errors: {errors}")
+            abort(400, error=str(errors))
+        self.job = self.schema.load(body)
+        handler = BulkArticleHandler(job=self.job)
+        results = handler.analyze()
+        return dict(total=len(results), results=results), 200
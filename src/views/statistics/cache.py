@@ -0,0 +1,12 @@
+from flask_restful import Resource  # type: ignore
+
+from src.models.file_io.read_cache import get_read_cache
+
+
+class Cache(Resource):
+    """This returns the counters of the read cache of the worker
+    that happens to serve the request"""
+
+    @staticmethod
+    def get():
+        return get_read_cache().statistics, 200
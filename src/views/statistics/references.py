@@ -1,13 +1,21 @@
+from flask import request
+from flask_restful import abort  # type: ignore
+
 from src.models.api.job.references_job import ReferencesJob
 from src.models.api.schema.references_schema import ReferencesSchema
 from src.models.exceptions import MissingInformationError
 from src.models.file_io.article_file_io import ArticleFileIo
 from src.models.file_io.reference_file_io import ReferenceFileIo
+from src.models.file_io.references import ReferencesFileIo
 from src.views.statistics import StatisticsView
 
 
 class References(StatisticsView):
-    """This returns all references as dehydrated references"""
+    """This returns all references as dehydrated references
+
+    Given ids either as a comma separated list in the query string
+    or as a list in a json POST body it returns those references
+    in one response instead."""
 
     def __setup_io__(self):
         pass
@@ -17,6 +25,8 @@ class References(StatisticsView):
 
     def get(self):
         self.__validate_and_get_job__()
+        if self.job.ids:
+            return self.__get_references_by_id__()
         # load the article json
         articlefileio = ArticleFileIo(wari_id=self.job.wari_id)
         articlefileio.read_from_disk()
@@ -27,16 +37,14 @@ class References(StatisticsView):
         # get the references details
         details = []
         if self.job.all:
+            ids = []
             for reference in references:
                 if "id" not in reference or not reference["id"]:
                     raise MissingInformationError()
-                referencefileio = ReferenceFileIo(hash_based_id=reference["id"])
-                referencefileio.read_from_disk()
-                data = referencefileio.data
-                if not data:
-                    return "No json in cache", 404
-                # convert to dehydrated reference:
-                details.append(data)
+                ids.append(reference["id"])
+            details, missing = ReferencesFileIo.read_references_from_disk(ids=ids)
+            if missing:
+                return "No json in cache", 404
         else:
             # We use offset and chunk size
             for reference in references[
@@ -55,3 +63,23 @@ class References(StatisticsView):
                 details.append(data)
         data = dict(total=len(references), references=details)
         return data, 200
+
+    def post(self):
+        """Batch lookup with a json body like {"ids": ["id1", "id2"]}"""
+        body = request.get_json(silent=True)
+        if (
+            not isinstance(body, dict)
+            or not isinstance(body.get("ids"), list)
+            or not all(isinstance(id_, str) and id_ for id_ in body["ids"])
+        ):
+            abort(400, error="expected a json body with a list of reference ids")
+        self.job = ReferencesJob(ids=body["ids"])
+        return self.__get_references_by_id__()
+
+    def __get_references_by_id__(self):
+        """Return the references found and the ids that are not in the cache"""
+        references, missing = ReferencesFileIo.read_references_from_disk(
+            ids=self.job.ids
+        )
+        data = dict(total=len(references), references=references, missing=missing)
+        return data, 200
@@ -1,13 +1,69 @@
+from typing import Any, Callable, Dict, Optional
+
+from src.models.api.enums import Freshness
+from src.models.api.freshness import FreshnessPolicy, get_revalidator
+from src.models.file_io.single_flight import SingleFlight
 from src.views.statistics import StatisticsView
 
 
 class StatisticsWriteView(StatisticsView):
+    # Without a policy cached results are served forever
+    freshness_policy: Optional[FreshnessPolicy] = None
+
     def __setup_io__(self):
         raise NotImplementedError()
 
     def __handle_valid_job__(self):
         raise NotImplementedError()
 
+    def __compute_and_write__(self) -> Dict[str, Any]:
+        raise NotImplementedError()
+
     def __read_from_cache__(self):
         self.__setup_io__()
         self.io.read_from_disk()
+
+    def __get_usable_cached_data__(self) -> Optional[Dict[str, Any]]:
+        """Return the cached data if the freshness policy allows serving it
+
+        Stale data is returned at once and refreshed in the background.
+        None is returned if there is no data or it has expired."""
+        from src import app
+
+        self.__read_from_cache__()
+        if not self.io.data or not self.freshness_policy:
+            return self.io.data or None
+        freshness = self.freshness_policy.get_freshness(data=self.io.data)
+        if freshness == Freshness.STALE:
+            key = f"{self.io.subfolder}{self.io.key}"
+            if get_revalidator().revalidate(key=key, function=self.__revalidate__):
+                app.logger.info(f"revalidating {key} in the background")
+        elif freshness == Freshness.EXPIRED:
+            app.logger.info("the cached data has expired")
+            return None
+        return self.io.data
+
+    def __read_result_since__(self, started: int) -> Optional[Any]:
+        """Return the cached data if it was written after started"""
+        self.__read_from_cache__()
+        if self.io.data and self.io.data.get("timestamp", 0) >= started:
+            return self.io.data
+        return None
+
+    def __single_flight__(self, compute: Callable[[], Any]) -> Any:
+        """Run compute unless another worker is already computing
+        the same cache key and return its result instead"""
+        if not self.io:
+            self.__setup_io__()
+        return SingleFlight().run(
+            key=f"{self.io.subfolder}{self.io.key}",
+            compute=compute,
+            read_result=self.__read_result_since__,
+        )
+
+    def __revalidate__(self) -> None:
+        """Recompute with a fresh view because this runs in another thread"""
+        view = type(self)()
+        view.job = self.job.copy()
+        view.__setup_io__()
+        view.__single_flight__(compute=view.__compute_and_write__)
@@ -1,5 +1,48 @@
+from src.models.api.handlers.all import AllHandler
+from src.models.api.job.article_job import ArticleJob
+
+
+class PreparedAllHandler(AllHandler):
+    """This handler has the article data already so no network is needed"""
+
+    def __fetch_article__(self):
+        pass
+
+
 class TestAllHandler:
-    pass
+    def test_remote(self):
+        assert AllHandler(job=ArticleJob()).remote is False
+        handler = AllHandler(job=ArticleJob(), remote_base_url="http://example.com/v2")
+        assert handler.remote is True
+
+    def test___fetch_references___reuses_analyzed_references(self):
+        reference = dict(
+            id="b64ae445",
+            templates=[dict(parameters=dict(doi="10.1234/test"))],
+        )
+        handler = AllHandler(
+            job=ArticleJob(),
+            data=dict(dehydrated_references=[dict(id="b64ae445")]),
+            analyzed_references=[reference],
+        )
+        handler.__fetch_references__()
+        assert handler.references == [reference]
+        assert handler.number_of_dois == 1
+
+    def test_stream_starts_with_the_article(self):
+        reference = dict(id="b64ae445", templates=[])
+        data = dict(dehydrated_references=[dict(id="b64ae445")], urls=[])
+        handler = PreparedAllHandler(
+            job=ArticleJob(), data=data, analyzed_references=[reference]
+        )
+        records = list(handler.stream())
+        assert records == [dict(article=data), dict(reference_details=reference)]
+
+    def test_ndjson_lines(self):
+        handler = PreparedAllHandler(job=ArticleJob(), error=True)
+        lines = list(handler.ndjson_lines())
+        assert lines == ['{"error": "could not get the article statistics"}\n']
+
     # Disabled because it hangs in cli invocation of pytests
     # def test_fetch_and_compile_sncaso(self):
     #     job = ArticleJob(
@@ -0,0 +1,36 @@
+from src.models.api.handlers.bulk_article import BulkArticleHandler, analyze_wikitext
+from src.models.api.job.article_job import ArticleJob
+from src.models.api.job.articles_job import ArticlesJob
+from test_data.test_content import electrical_breakdown_full_article
+
+
+class TestBulkArticleHandler:
+    def test_analyze_wikitext(self):
+        job = ArticleJob(
+            url="https://en.wikipedia.org/wiki/Electrical_breakdown",
+            regex="bibliography|further reading|works cited|sources|external links",
+        )
+        job.validate_regex_and_extract_url()
+        statistics, references = analyze_wikitext(
+            job=job,
+            page_id=1,
+            revision_id=2,
+            revision_timestamp="2023-01-01T00:00:00Z",
+            wikitext=electrical_breakdown_full_article,
+        )
+        assert statistics["wari_id"] == "en.wikipedia.org.1"
+        assert statistics["revision_id"] == 2
+        assert statistics["timestamp"] > 0
+        assert len(references) == len(statistics["dehydrated_references"]) > 0
+
+    def test_invalid_url_is_reported_per_item(self):
+        handler = BulkArticleHandler(
+            job=ArticlesJob(urls=["https://example.com/nothing"], regex="sources")
+        )
+        assert handler.analyze() == [
+            dict(
+                url="https://example.com/nothing",
+                status_code=400,
+                error="Not a valid Wikipedia URL or regex",
+            )
+        ]
@@ -0,0 +1,42 @@
+import time
+
+from src.models.api.handlers.fetcher import AsyncFetcher, FetchTask
+
+
+class TestAsyncFetcher:
+    def test_fetch_all_keeps_order_and_returns_partial_results(self):
+        def fail():
+            raise ValueError("boom")
+
+        fetcher = AsyncFetcher(max_concurrency=4, max_per_host=2, timeout=5)
+        tasks = [
+            FetchTask(function=lambda: dict(number=1), host="a"),
+            FetchTask(function=fail, host="a", details=dict(url="http://a/2")),
+            FetchTask(function=lambda: dict(number=3)),
+        ]
+        results = fetcher.fetch_all(tasks=tasks)
+        fetcher.close()
+        assert results[0] == dict(number=1)
+        assert results[1]["url"] == "http://a/2"
+        assert "boom" in results[1]["error"]
+        assert results[2] == dict(number=3)
+
+    def test_fetch_all_timeout(self):
+        fetcher = AsyncFetcher(max_concurrency=2, max_per_host=1, timeout=0.1)
+        tasks = [FetchTask(function=lambda: time.sleep(1), details=dict(doi="10.1/x"))]
+        results = fetcher.fetch_all(tasks=tasks)
+        fetcher.close()
+        assert results == [dict(doi="10.1/x", error="timeout")]
+
+    def test_timed_out_task_holds_its_slot(self):
+        fetcher = AsyncFetcher(max_concurrency=1, max_per_host=1, timeout=0.2)
+        tasks = [
+            FetchTask(function=lambda: time.sleep(0.5), details=dict(doi="10.1/x")),
+            FetchTask(function=lambda: dict(number=2)),
+        ]
+        results = fetcher.fetch_all(tasks=tasks)
+        # The second task only starts when the thread of the first is free
+        # so it is not timed out while queued in the executor
+        assert results == [dict(doi="10.1/x", error="timeout"), dict(number=2)]
+        assert not fetcher.abandoned
+        fetcher.close()
@@ -0,0 +1,175 @@
+import config
+from src.models.api.job.article_job import ArticleJob
+from src.models.api.statistic.article import ArticleStatistics
+from src.models.file_io.analysis_file_io import AnalysisFileIo
+from src.models.file_io.article_file_io import ArticleFileIo
+from src.models.file_io.ores_file_io import OresFileIo
+from src.models.file_io.references import ReferencesFileIo
+from src.models.file_io.title_file_io import TitleFileIo
+from src.models.file_io.wikitext_file_io import WikitextFileIo
+from src.views.statistics.article import Article
+from test_data.test_content import electrical_breakdown_full_article
+
+
+class UnchangedArticleJob(ArticleJob):
+    """This job knows the latest revision without asking Wikipedia"""
+
+    latest_revision_id: int = 0
+
+    def get_latest_revision_id(self) -> int:
+        return self.latest_revision_id
+
+
+class MovedArticleJob(UnchangedArticleJob):
+    """The title of this job now belongs to page 2"""
+
+    def get_latest_revision_id(self) -> int:
+        self.__check_page_id__(page_id=2)
+        return self.latest_revision_id
+
+
+class TestArticleRevision:
+    @staticmethod
+    def __setup_view__(
+        latest_revision_id: int,
+        regex: str = "references",
+        sections=None,
+        refresh: bool = True,
+    ) -> Article:
+        job = UnchangedArticleJob(
+            title="Test",
+            page_id=1,
+            refresh=refresh,
+            regex=regex,
+            latest_revision_id=latest_revision_id,
+        )
+        data = ArticleStatistics(
+            wari_id="en.wikipedia.org.1",
+            page_id=1,
+            timestamp=1,
+            revision_id=100,
+            regex="references",
+            sections=sections or [],
+        ).dict()
+        ArticleFileIo(wari_id="en.wikipedia.org.1", data=data).write_to_disk()
+        view = Article()
+        view.job = job
+        view.__read_from_cache__()
+        return view
+
+    def test_unchanged_revision_is_not_analyzed_again(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(config, "subdirectory_for_json", f"{tmp_path}/")
+        view = self.__setup_view__(latest_revision_id=100)
+        data, status_code = view.__handle_valid_job__()
+        assert status_code == 200
+        assert data["timestamp"] > 1
+        assert view.wikipedia_analyzer is None
+        assert data["served_from_cache"]
+        io = ArticleFileIo(wari_id="en.wikipedia.org.1")
+        io.read_from_disk()
+        assert io.data["timestamp"] == data["timestamp"]
+        # The flag of the response is not stored
+        assert "served_from_cache" not in io.__read_json__()
+
+    def test_moved_page_is_not_served_from_the_title_index(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(config, "subdirectory_for_json", f"{tmp_path}/")
+        view = self.__setup_view__(latest_revision_id=100)
+        view.job = MovedArticleJob(
+            title="Test", page_id=1, refresh=True, latest_revision_id=100
+        )
+        # The cached analysis of page 1 is not used for page 2
+        assert not view.__cached_analysis_is_current__()
+        assert view.io.key == "en.wikipedia.org.2"
+        assert (
+            TitleFileIo(lang="en", domain="wikipedia.org", title="Test").read_page_id()
+            == 2
+        )
+
+    def test_changed_revision_or_regex(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(config, "subdirectory_for_json", f"{tmp_path}/")
+        assert not self.__setup_view__(
+            latest_revision_id=101
+        ).__cached_analysis_is_current__()
+        assert not self.__setup_view__(
+            latest_revision_id=100, regex="sources"
+        ).__cached_analysis_is_current__()
+
+    def test_cached_sections(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(config, "subdirectory_for_json", f"{tmp_path}/")
+        ReferencesFileIo(
+            references=[dict(id="a", section="root"), dict(id="b", section="root")]
+        ).write_references_to_disk()
+        sections = [
+            dict(name="root", hash="1", reference_ids=["a", "b"]),
+            dict(name="Notes", hash="2", reference_ids=["c"]),
+        ]
+        view = self.__setup_view__(latest_revision_id=101, sections=sections)
+        # The section with a missing reference is extracted again
+        assert view.__get_cached_sections__() == {
+            "1": [dict(id="a", section="root"), dict(id="b", section="root")]
+        }
+        # The same regex written differently reuses the sections
+        view = self.__setup_view__(
+            latest_revision_id=101, regex="References", sections=sections
+        )
+        assert "1" in view.__get_cached_sections__()
+        view = self.__setup_view__(
+            latest_revision_id=101, regex="sources", sections=sections
+        )
+        assert view.__get_cached_sections__() == {}
+
+    def test_other_regex_is_analyzed_from_the_stored_wikitext(
+        self, tmp_path, monkeypatch
+    ):
+        monkeypatch.setattr(config, "subdirectory_for_json", f"{tmp_path}/")
+        WikitextFileIo(
+            article_wari_id="en.wikipedia.org.1",
+            revision_id=100,
+            data=dict(
+                title="Test",
+                page_id=1,
+                revision_id=100,
+                revision_timestamp="2023-01-01T00:00:00Z",
+                wikitext=electrical_breakdown_full_article,
+            ),
+        ).write_to_disk()
+        OresFileIo(
+            wiki="enwiki",
+            revision_id=100,
+            data=dict(score=dict(prediction="B"), timestamp=1),
+        ).write_to_disk()
+        view = self.__setup_view__(
+            latest_revision_id=100, regex="references", refresh=False
+        )
+        # The same regex in another case
+        view.job.regex = "REFERENCES"
+        data, status_code = view.__handle_valid_job__()
+        assert status_code == 200
+        assert data["timestamp"] == 1
+        view.job.regex = "sources"
+        data, status_code = view.__handle_valid_job__()
+        assert status_code == 200
+        assert data["regex"] == "sources"
+        assert data["revision_id"] == 100
+        assert data["reference_statistics"]["content"] > 0
+        assert data["ores_score"] == dict(prediction="B")
+        analysis_io = AnalysisFileIo(
+            article_wari_id="en.wikipedia.org.1", revision_id=100, regex="Sources"
+        )
+        analysis_io.read_from_disk()
+        assert analysis_io.data["regex"] == "sources"
+
+    def test_analysis_of_revision_and_regex_is_reused(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(config, "subdirectory_for_json", f"{tmp_path}/")
+        AnalysisFileIo(
+            article_wari_id="en.wikipedia.org.1",
+            revision_id=100,
+            regex="sources",
+            data=ArticleStatistics(regex="sources", revision_id=100).dict(),
+        ).write_to_disk()
+        view = self.__setup_view__(latest_revision_id=100, regex="sources")
+        data, status_code = view.__handle_valid_job__()
+        assert status_code == 200
+        assert data["regex"] == "sources"
+        assert data["served_from_cache"]
+        assert view.wikipedia_analyzer is None
@@ -0,0 +1,61 @@
+import threading
+from datetime import datetime
+
+import config
+from src.models.api.enums import Freshness
+from src.models.api.freshness import FreshnessPolicy, Revalidator
+from src.models.api.job.check_doi_job import CheckDoiJob
+from src.models.file_io.doi_file_io import DoiFileIo
+from src.views.check_doi import CheckDoi
+
+
+class RevalidatedCheckDoi(CheckDoi):
+    """This records recomputations instead of looking up the DOI"""
+
+    computed = threading.Event()
+
+    def __compute_and_write__(self):
+        self.computed.set()
+        return dict(id=self.__doi_hash_id__, timestamp=1000)
+
+
+class TestFreshnessPolicy:
+    policy = FreshnessPolicy(fresh_seconds=10, stale_seconds=100)
+
+    def test_get_freshness(self):
+        assert (
+            self.policy.get_freshness(dict(timestamp=995), now=1000) == Freshness.FRESH
+        )
+        assert (
+            self.policy.get_freshness(dict(timestamp=950), now=1000) == Freshness.STALE
+        )
+        assert (
+            self.policy.get_freshness(dict(timestamp=800), now=1000)
+            == Freshness.EXPIRED
+        )
+        assert self.policy.get_freshness(dict(), now=1000) == Freshness.EXPIRED
+
+
+class TestRevalidator:
+    def test_revalidate_once_per_key(self):
+        revalidator = Revalidator(max_workers=2)
+        release = threading.Event()
+        assert revalidator.revalidate(key="a", function=release.wait) is True
+        assert revalidator.revalidate(key="a", function=release.wait) is False
+        release.set()
+        revalidator.executor.shutdown(wait=True)
+        assert revalidator.in_flight == set()
+
+    def test_stale_hit_is_served_and_revalidated(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(config, "subdirectory_for_json", f"{tmp_path}/")
+        view = RevalidatedCheckDoi()
+        view.job = CheckDoiJob(doi="10.1234/test")
+        now = int(datetime.timestamp(datetime.utcnow()))
+        timestamp = now - view.freshness_policy.fresh_seconds - 60
+        data = dict(id=view.__doi_hash_id__, timestamp=timestamp, doi="10.1234/test")
+        DoiFileIo(hash_based_id=view.__doi_hash_id__, data=data).write_to_disk()
+        served, status_code = view.__handle_valid_job__()
+        assert status_code == 200
+        assert served["doi"] == "10.1234/test"
+        assert served["served_from_cache"] is True
+        assert view.computed.wait(timeout=5)
@@ -0,0 +1,28 @@
+from src.models.file_io.analysis_file_io import AnalysisFileIo
+
+
+class TestAnalysisFileIo:
+    def test_normalize_regex(self):
+        assert (
+            AnalysisFileIo.normalize_regex("Sources|notes|sources") == "notes|sources"
+        )
+        # Groups are not reordered
+        assert AnalysisFileIo.normalize_regex("(b|a)c") == "(b|a)c"
+        assert AnalysisFileIo.same_regex("Works cited|Sources", "sources|works cited")
+        assert not AnalysisFileIo.same_regex("sources", "sources|notes")
+        # Escapes are case-sensitive so the regex is left as it is
+        assert AnalysisFileIo.normalize_regex(r"Notes\S") == r"Notes\S"
+        assert not AnalysisFileIo.same_regex(r"notes\S", r"notes\s")
+        assert not AnalysisFileIo.same_regex("Notes.*", "notes.*")
+
+    def test_key(self):
+        first = AnalysisFileIo(
+            article_wari_id="en.wikipedia.org.1", revision_id=2, regex="a|b"
+        )
+        second = AnalysisFileIo(
+            article_wari_id="en.wikipedia.org.1", revision_id=2, regex="B|A"
+        )
+        assert first.key == second.key
+        assert first.key.startswith("en.wikipedia.org.1.2.")
+        # The resharder creates the file io from the stem
+        assert AnalysisFileIo(wari_id=first.key).path_filename == first.path_filename
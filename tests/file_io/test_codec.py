@@ -0,0 +1,52 @@
+import os
+
+import pytest
+
+import config
+from src.models.file_io import codec
+from src.models.file_io.reference_file_io import ReferenceFileIo
+
+
+class TestCodec:
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_dumps_is_compact(self, monkeypatch, use_orjson):
+        monkeypatch.setattr(config, "json_use_orjson", use_orjson)
+        data = dict(title="Ålesund", urls=["https://example.com"])
+        assert (
+            codec.dumps(data)
+            == '{"title":"Ålesund","urls":["https://example.com"]}'.encode()
+        )
+        assert codec.loads(codec.dumps(data)) == data
+
+    def test_write_atomically(self, tmp_path):
+        path_filename = str(tmp_path / "test.json")
+        codec.write_atomically(path_filename=path_filename, data=dict(a=1))
+        codec.write_atomically(path_filename=path_filename, data=dict(a=2))
+        assert os.listdir(tmp_path) == ["test.json"]
+        assert codec.read(path_filename) == dict(a=2)
+
+    def test_read_broken_or_missing(self, tmp_path):
+        (tmp_path / "broken.json").write_text('{"a": ')
+        assert codec.read(str(tmp_path / "broken.json")) is None
+        assert codec.read(str(tmp_path / "missing.json")) is None
+
+    def test_broken_file_is_a_cache_miss(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(config, "subdirectory_for_json", f"{tmp_path}/")
+        monkeypatch.setattr(config, "json_shard_depth", 0)
+        (tmp_path / "references").mkdir()
+        (tmp_path / "references" / "abcd1234.json").write_text('{"id": "ab')
+        io = ReferenceFileIo(hash_based_id="abcd1234")
+        io.read_from_disk()
+        assert io.data == {}
+
+    def test_compressed_and_plain_files_coexist(self, tmp_path, monkeypatch):
+        data = dict(wikitext="<ref>{{cite web|url=https://example.com}}</ref>" * 50)
+        plain = str(tmp_path / "plain.json")
+        codec.write_atomically(path_filename=plain, data=data)
+        monkeypatch.setattr(config, "json_compression", "gzip")
+        compressed = str(tmp_path / "compressed.json")
+        codec.write_atomically(path_filename=compressed, data=data)
+        assert os.path.getsize(compressed) < os.path.getsize(plain) / 5
+        monkeypatch.setattr(config, "json_compression", "")
+        assert codec.read(compressed) == data
+        assert codec.read(plain) == data
@@ -0,0 +1,67 @@
+import os
+
+import config
+from src.models.file_io import codec
+from src.models.file_io.read_cache import ReadCache, get_read_cache
+from src.models.file_io.reference_file_io import ReferenceFileIo
+
+
+class TestReadCache:
+    def test_hit_and_copy(self, tmp_path):
+        path_filename = str(tmp_path / "a.json")
+        codec.write_atomically(path_filename=path_filename, data=dict(a=[1]))
+        cache = ReadCache(max_bytes=1000)
+        # Changing what a miss returned does not change the cache either
+        cache.read(path_filename)["a"].append(2)
+        data = cache.read(path_filename)
+        data["served_from_cache"] = True
+        data["a"].append(3)
+        assert cache.read(path_filename) == dict(a=[1])
+        assert cache.hits == 2
+        assert cache.misses == 1
+
+    def test_invalidated_by_another_writer(self, tmp_path):
+        path_filename = str(tmp_path / "a.json")
+        codec.write_atomically(path_filename=path_filename, data=dict(a=1))
+        cache = ReadCache(max_bytes=1000)
+        cache.read(path_filename)
+        codec.write_atomically(path_filename=path_filename, data=dict(a=2))
+        assert cache.read(path_filename) == dict(a=2)
+        os.remove(path_filename)
+        assert cache.read(path_filename) is None
+        assert cache.bytes == 0
+
+    def test_eviction(self, tmp_path):
+        cache = ReadCache(max_bytes=20)
+        for name in ["a", "b", "c"]:
+            path_filename = str(tmp_path / f"{name}.json")
+            codec.write_atomically(path_filename=path_filename, data=dict(x=name))
+            cache.read(path_filename)
+        assert list(cache.entries) == [
+            str(tmp_path / "b.json"),
+            str(tmp_path / "c.json"),
+        ]
+        assert cache.evictions == 1
+        assert cache.bytes <= 20
+
+    def test_compressed_files_are_weighed_by_their_json(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(config, "json_compression", "gzip")
+        path_filename = str(tmp_path / "a.json")
+        data = dict(text="a" * 1000)
+        codec.write_atomically(path_filename=path_filename, data=data)
+        cache = ReadCache(max_bytes=10000)
+        assert cache.read(path_filename) == data
+        assert cache.read(path_filename) == data
+        assert cache.bytes == len(codec.dumps(data))
+        assert cache.bytes > os.stat(path_filename).st_size
+
+    def test_write_through(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(config, "subdirectory_for_json", f"{tmp_path}/")
+        ReferenceFileIo(
+            hash_based_id="abcd1234", data=dict(id="abcd1234")
+        ).write_to_disk()
+        hits = get_read_cache().hits
+        io = ReferenceFileIo(hash_based_id="abcd1234")
+        io.read_from_disk()
+        assert io.data["served_from_cache"] is True
+        assert get_read_cache().hits == hits + 1
@@ -0,0 +1,21 @@
+import config
+from src.models.file_io.reference_file_io import ReferenceFileIo
+from src.models.file_io.references import ReferencesFileIo
+
+
+class TestReferencesFileIo:
+    def test_read_references_from_disk(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(config, "subdirectory_for_json", f"{tmp_path}/")
+        (tmp_path / "references").mkdir()
+        ReferencesFileIo(
+            references=[dict(id="aaaaaaaa", name="a"), dict(id="bbbbbbbb", name="b")]
+        ).write_references_to_disk()
+        references, missing = ReferencesFileIo.read_references_from_disk(
+            ids=["bbbbbbbb", "cccccccc", "aaaaaaaa", "bbbbbbbb"]
+        )
+        assert [reference["name"] for reference in references] == ["b", "a", "b"]
+        assert references[0]["served_from_cache"] is True
+        assert missing == ["cccccccc"]
+        assert ReferenceFileIo(hash_based_id="aaaaaaaa").path_filename.startswith(
+            str(tmp_path)
+        )
@@ -0,0 +1,58 @@
+import json
+import os
+
+import config
+from src.models.file_io.article_file_io import ArticleFileIo
+from src.models.file_io.reference_file_io import ReferenceFileIo
+from src.models.file_io.reshard import JsonCacheResharder
+
+
+class TestSharding:
+    def test_path_filename(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(config, "subdirectory_for_json", f"{tmp_path}/")
+        monkeypatch.setattr(config, "json_shard_depth", 2)
+        monkeypatch.setattr(config, "json_shard_width", 2)
+        io = ReferenceFileIo(hash_based_id="abcd1234")
+        assert io.path_filename == f"{tmp_path}/references/ab/cd/abcd1234.json"
+        assert io.flat_path_filename == f"{tmp_path}/references/abcd1234.json"
+        monkeypatch.setattr(config, "json_shard_depth", 0)
+        assert io.path_filename == io.flat_path_filename
+
+    def test_write_and_read_with_fallback(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(config, "subdirectory_for_json", f"{tmp_path}/")
+        (tmp_path / "references").mkdir()
+        (tmp_path / "references" / "00000000.json").write_text(
+            json.dumps(dict(id="00000000"))
+        )
+        ReferenceFileIo(
+            hash_based_id="abcd1234", data=dict(id="abcd1234")
+        ).write_to_disk()
+        assert (tmp_path / "references" / "ab" / "cd" / "abcd1234.json").exists()
+        for hash_based_id in ["00000000", "abcd1234"]:
+            io = ReferenceFileIo(hash_based_id=hash_based_id)
+            io.read_from_disk()
+            assert io.data["id"] == hash_based_id
+
+    def test_reshard(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(config, "subdirectory_for_json", f"{tmp_path}/")
+        monkeypatch.setattr(config, "json_shard_depth", 0)
+        (tmp_path / "articles").mkdir()
+        (tmp_path / "references").mkdir()
+        ArticleFileIo(wari_id="en.wikipedia.org.1", data=dict(a=1)).write_to_disk()
+        ReferenceFileIo(hash_based_id="abcd1234", data=dict(old=True)).write_to_disk()
+        monkeypatch.setattr(config, "json_shard_depth", 2)
+        # the API wrote a newer copy to the new path already
+        ReferenceFileIo(hash_based_id="abcd1234", data=dict(old=False)).write_to_disk()
+        resharder = JsonCacheResharder()
+        resharder.reshard()
+        assert resharder.moved == 1
+        assert resharder.removed == 1
+        assert os.listdir(tmp_path / "references") == ["ab"]
+        io = ReferenceFileIo(hash_based_id="abcd1234")
+        io.read_from_disk()
+        assert io.data["old"] is False
+        article_io = ArticleFileIo(wari_id="en.wikipedia.org.1")
+        assert os.path.exists(article_io.path_filename)
+        resharder = JsonCacheResharder()
+        resharder.reshard()
+        assert resharder.skipped == 2
@@ -0,0 +1,103 @@
+import fcntl
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+import config
+from src.models.file_io.single_flight import SingleFlight
+
+
+class TestSingleFlight:
+    def test_leader_computes(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(config, "subdirectory_for_json", f"{tmp_path}/")
+        result = SingleFlight().run(
+            key="urls/abc", compute=lambda: "computed", read_result=lambda _: None
+        )
+        assert result == "computed"
+
+    def test_follower_gets_the_result_of_the_leader(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(config, "subdirectory_for_json", f"{tmp_path}/")
+        cache = {}
+        computed = []
+
+        def compute():
+            computed.append(threading.current_thread().name)
+            time.sleep(0.5)
+            cache["data"] = dict(
+                timestamp=int(datetime.timestamp(datetime.utcnow())), value=1
+            )
+            return cache["data"]
+
+        def read_result(started):
+            data = cache.get("data")
+            if data and data["timestamp"] >= started:
+                return data
+            return None
+
+        results = {}
+
+        def worker():
+            results[threading.current_thread().name] = SingleFlight(
+                poll_interval=0.01
+            ).run(
+                key="articles/en.wikipedia.org.1",
+                compute=compute,
+                read_result=read_result,
+            )
+
+        threads = [threading.Thread(target=worker, name=str(i)) for i in range(5)]
+        for thread in threads:
+            thread.start()
+            time.sleep(0.01)
+        for thread in threads:
+            thread.join()
+        assert len(computed) == 1
+        assert all(result == dict(cache["data"]) for result in results.values())
+
+    def test_follower_computes_if_the_leader_failed(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(config, "subdirectory_for_json", f"{tmp_path}/")
+        single_flight = SingleFlight(poll_interval=0.01)
+
+        def failing_compute():
+            time.sleep(0.2)
+            raise ValueError("failed")
+
+        def leader():
+            with pytest.raises(ValueError):
+                single_flight.run(
+                    key="dois/abc", compute=failing_compute, read_result=lambda _: None
+                )
+
+        thread = threading.Thread(target=leader)
+        thread.start()
+        time.sleep(0.05)
+        result = single_flight.run(
+            key="dois/abc", compute=lambda: "computed", read_result=lambda _: None
+        )
+        thread.join()
+        assert result == "computed"
+
+    def test_timeout(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(config, "subdirectory_for_json", f"{tmp_path}/")
+        single_flight = SingleFlight(timeout=0.2, poll_interval=0.01)
+        # A hung leader holds the lock
+        path = single_flight.lock_path(key="urls/abc")
+        (tmp_path / "locks").mkdir()
+        with open(path, "a") as file:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+            start = time.monotonic()
+            result = single_flight.run(
+                key="urls/abc", compute=lambda: "computed", read_result=lambda _: None
+            )
+            assert result == "computed"
+            assert time.monotonic() - start >= 0.2
+
+    def test_lock_files_are_striped(self):
+        single_flight = SingleFlight(stripes=4)
+        paths = {single_flight.lock_path(key=f"urls/{number}") for number in range(100)}
+        assert len(paths) == 4
+        assert single_flight.lock_path(key="urls/1") == single_flight.lock_path(
+            key="urls/1"
+        )
@@ -0,0 +1,52 @@
+import config
+from src.models.file_io.reference_file_io import ReferenceFileIo
+from src.models.file_io.references import ReferencesFileIo
+from src.models.file_io.sqlite_import import JsonCacheImporter
+from src.models.file_io.sqlite_store import SqliteStore, get_store
+
+
+class TestSqliteStore:
+    def test_write_many_and_read_many(self, tmp_path):
+        store = SqliteStore(database=str(tmp_path / "test.sqlite"))
+        store.write_many(
+            subfolder="references/",
+            items=[("aaaaaaaa", dict(name="a")), ("bbbbbbbb", dict(name="b"))],
+        )
+        assert store.read(subfolder="references/", key="aaaaaaaa") == dict(name="a")
+        assert store.read(subfolder="urls/", key="aaaaaaaa") is None
+        found = store.read_many(
+            subfolder="references/", keys=["bbbbbbbb", "cccccccc", "aaaaaaaa"]
+        )
+        assert found == dict(aaaaaaaa=dict(name="a"), bbbbbbbb=dict(name="b"))
+
+    def test_backend(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(config, "storage_backend", "sqlite")
+        monkeypatch.setattr(config, "sqlite_database", str(tmp_path / "test.sqlite"))
+        ReferencesFileIo(
+            references=[dict(id="aaaaaaaa", name="a"), dict(id="bbbbbbbb", name="b")]
+        ).write_references_to_disk()
+        io = ReferenceFileIo(hash_based_id="aaaaaaaa")
+        io.read_from_disk()
+        assert io.data == dict(id="aaaaaaaa", name="a", served_from_cache=True)
+        references, missing = ReferencesFileIo.read_references_from_disk(
+            ids=["bbbbbbbb", "cccccccc"]
+        )
+        assert [reference["name"] for reference in references] == ["b"]
+        assert missing == ["cccccccc"]
+
+    def test_import(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(config, "subdirectory_for_json", f"{tmp_path}/")
+        (tmp_path / "references").mkdir()
+        for hash_based_id in ["aaaaaaaa", "bbbbbbbb", "cccccccc"]:
+            ReferenceFileIo(
+                hash_based_id=hash_based_id, data=dict(id=hash_based_id)
+            ).write_to_disk()
+        (tmp_path / "references" / "broken.json").write_text("{")
+        monkeypatch.setattr(config, "sqlite_database", str(tmp_path / "test.sqlite"))
+        importer = JsonCacheImporter(batch_size=2)
+        importer.import_cache()
+        assert importer.imported == 3
+        assert importer.failed == 1
+        assert get_store().read(subfolder="references/", key="cccccccc") == dict(
+            id="cccccccc"
+        )
@@ -0,0 +1,61 @@
+import config
+from src.models.api.job.article_job import ArticleJob
+from src.models.file_io.title_file_io import TitleFileIo
+
+
+class TestTitleFileIo:
+    def test_normalized_title(self):
+        io = TitleFileIo(lang="en", domain="wikipedia.org", title="easter__Island ")
+        assert io.normalized_title == "Easter Island"
+        assert (
+            io.hash_based_id
+            == TitleFileIo(
+                lang="en", domain="wikipedia.org", title="Easter_Island"
+            ).hash_based_id
+        )
+
+    def test_write_and_read_page_id(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(config, "subdirectory_for_json", f"{tmp_path}/")
+        io = TitleFileIo(lang="en", domain="wikipedia.org", title="Easter_Island")
+        assert io.read_page_id() == 0
+        io.write_page_id(page_id=-1)
+        assert io.read_page_id() == 0
+        io.write_page_id(page_id=11089416)
+        # the page was moved and the title now belongs to another page
+        TitleFileIo(
+            lang="en", domain="wikipedia.org", title="Easter Island"
+        ).write_page_id(page_id=42)
+        assert (
+            TitleFileIo(
+                lang="en", domain="wikipedia.org", title="Easter_Island"
+            ).read_page_id()
+            == 42
+        )
+        assert (
+            TitleFileIo(
+                lang="sv", domain="wikipedia.org", title="Easter_Island"
+            ).read_page_id()
+            == 0
+        )
+
+    def test_get_page_id_uses_the_index(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(config, "subdirectory_for_json", f"{tmp_path}/")
+        TitleFileIo(
+            lang="en", domain="wikipedia.org", title="Easter Island"
+        ).write_page_id(page_id=11089416)
+        job = ArticleJob(url="https://en.wikipedia.org/wiki/Easter_Island", regex="a")
+        job.validate_regex_and_extract_url()
+        job.get_page_id()
+        assert job.page_id == 11089416
+
+    def test_old_entries_are_ignored(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(config, "subdirectory_for_json", f"{tmp_path}/")
+        io = TitleFileIo(lang="en", domain="wikipedia.org", title="Easter Island")
+        io.write_page_id(page_id=11089416)
+        assert io.read_page_id() == 11089416
+        monkeypatch.setattr(config, "title_index_max_age_seconds", -1)
+        assert io.read_page_id() == 0
+        # Writing the same page id again makes the entry fresh
+        io.write_page_id(page_id=11089416)
+        monkeypatch.setattr(config, "title_index_max_age_seconds", 60)
+        assert io.read_page_id() == 11089416
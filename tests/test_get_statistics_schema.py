@@ -2,7 +2,9 @@ from unittest import TestCase
 
 from marshmallow import ValidationError
 
+from src.models.api.job.all_job import AllJob
 from src.models.api.job.article_job import ArticleJob
+from src.models.api.schema.all_schema import AllSchema
 from src.models.api.schema.article_schema import ArticleSchema
 from src.models.wikimedia.enums import WikimediaDomain
 
@@ -49,3 +51,26 @@ class TestArticleSchema(TestCase):
             )
         )
         assert errors == {"refresh": ["Not a valid boolean."]}
+
+
+class TestAllSchema(TestCase):
+    def test_return_object_stream(self):
+        job = AllSchema().load(
+            dict(
+                url="https://en.wikipedia.org/wiki/Easter_Island",
+                regex="test",
+                stream="ndjson",
+            )
+        )
+        assert isinstance(job, AllJob)
+        assert job.stream == "ndjson"
+
+    def test_return_object_invalid_stream(self):
+        with self.assertRaises(ValidationError):
+            AllSchema().load(
+                dict(
+                    url="https://en.wikipedia.org/wiki/Easter_Island",
+                    regex="test",
+                    stream="xml",
+                )
+            )
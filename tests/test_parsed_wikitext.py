@@ -0,0 +1,67 @@
+from unittest import TestCase
+
+import mwparserfromhell  # type: ignore
+
+from src.models.mediawiki.parsed_wikitext import ParsedWikitext
+from test_data import test_content
+
+
+class TestParsedWikitext(TestCase):
+    wikitext = "a\n* {{x|1}} b\n* c\n== Notes ==\n{{y\n|2}} d\n"
+
+    def test_offsets(self):
+        parsed = ParsedWikitext.parse(self.wikitext)
+        assert parsed.offsets[0] == 0
+        assert parsed.offsets[-1] == len(self.wikitext)
+
+    def test_slice_of_line(self):
+        parsed = ParsedWikitext.parse(self.wikitext)
+        line = "* {{x|1}} b"
+        start = self.wikitext.index(line)
+        wikicode = parsed.slice(start=start, end=start + len(line))
+        assert str(wikicode) == line
+        assert [str(template) for template in wikicode.filter_templates()] == [
+            str(template)
+            for template in mwparserfromhell.parse(line).filter_templates()
+        ]
+
+    def test_slice_inside_template(self):
+        parsed = ParsedWikitext.parse(self.wikitext)
+        line = "{{y"
+        start = self.wikitext.index(line)
+        assert parsed.slice(start=start, end=start + len(line)) is None
+
+    def test_text_of_section(self):
+        parsed = ParsedWikitext.parse(self.wikitext)
+        section = parsed.wikicode.get_sections(levels=[2], include_headings=True)[0]
+        assert parsed.text_of(wikicode=section) == str(section)
+        assert parsed.start_of(wikicode=section) == self.wikitext.index("== Notes")
+
+    def test_slices_of_lines_are_the_same_as_parsing_each_line(self):
+        """Every line cut out of the parsed page has the same templates and
+        tags as the line parsed alone. Lines inside a node spanning more than
+        one line give None and are parsed alone by the sections."""
+        wikitexts = [self.wikitext] + [
+            value
+            for name, value in vars(test_content).items()
+            if not name.startswith("_") and isinstance(value, str)
+        ]
+        spanning = 0
+        for wikitext in wikitexts:
+            parsed = ParsedWikitext.parse(wikitext)
+            offset = 0
+            for line in wikitext.split("\n"):
+                wikicode = parsed.slice(start=offset, end=offset + len(line))
+                offset += len(line) + 1
+                if wikicode is None:
+                    spanning += 1
+                    continue
+                alone = mwparserfromhell.parse(line)
+                assert str(wikicode) == line
+                assert [str(node) for node in wikicode.filter_templates()] == [
+                    str(node) for node in alone.filter_templates()
+                ]
+                assert [str(node) for node in wikicode.filter_tags()] == [
+                    str(node) for node in alone.filter_tags()
+                ]
+        assert spanning > 0
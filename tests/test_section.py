@@ -104,3 +104,23 @@ class TestMediawikiSection(TestCase):
         )
         assert section.name == "Test"
         assert section.is_general_reference_section is False
+
+    def test_extract_fast_path(self):
+        section = MediawikiSection(
+            testing=True,
+            wikitext="==Test==\n* {{cite web|url=http://example.com}}",
+            job=self.regex_job,
+        )
+        assert section.might_contain_references is False
+        section.extract()
+        assert section.fast_path is True
+        assert section.wikicode is None
+        assert section.number_of_references == 0
+
+    def test_extract_no_fast_path(self):
+        section = MediawikiSection(
+            testing=True, wikitext=sncaso_tail_excerpt, job=self.regex_job
+        )
+        assert section.might_contain_references is True
+        section.extract()
+        assert section.fast_path is False
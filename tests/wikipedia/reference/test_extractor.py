@@ -61,6 +61,17 @@ class TestWikipediaReferenceExtractor(TestCase):
         wre1.extract_all_references()
         assert len(wre1.references) == 3
 
+    def test_number_of_fast_path_sections(self):
+        wre = WikipediaReferenceExtractor(
+            testing=True,
+            wikitext="intro<ref>{{citeq|Q1}}</ref>\n==History==\ntext\n"
+            "==Sources==\n* {{citeq|Q2}}\n==See also==\n* [[Link]]",
+            job=self.job,
+        )
+        wre.extract_all_references()
+        assert wre.number_of_references == 2
+        assert wre.number_of_fast_path_sections == 2
+
     # def test_extract_all_references(self):
     #     raw_template = "{{citeq|Q1}}"
     #     raw_reference = f"<ref>{raw_template}</ref>"
@@ -0,0 +1,58 @@
+import config
+from src.models.api.job.article_job import ArticleJob
+from src.models.mediawiki.section import MediawikiSection
+from src.models.wikimedia.wikipedia.reference.memo import (
+    ReferenceMemo,
+    reference_memo_key,
+)
+
+
+class TestReferenceMemo:
+    def test_key(self):
+        key = reference_memo_key(
+            wikitext="<ref>a</ref>", is_general_reference=False, language_code="en"
+        )
+        assert len(key) == 32
+        assert key != reference_memo_key(
+            wikitext="<ref>a</ref>", is_general_reference=True, language_code="en"
+        )
+        assert key != reference_memo_key(
+            wikitext="<ref>a</ref>", is_general_reference=False, language_code="de"
+        )
+
+    def test_least_recently_used_is_dropped(self):
+        memo = ReferenceMemo(max_size=2)
+        memo.put(key="a", data=dict(id="a"))
+        memo.put(key="b", data=dict(id="b"))
+        assert memo.get(key="a") == dict(id="a")
+        memo.put(key="c", data=dict(id="c"))
+        assert memo.get(key="b") is None
+        assert memo.get(key="a") == dict(id="a")
+        assert memo.get(key="c") == dict(id="c")
+
+    def test_storage_is_shared(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(config, "subdirectory_for_json", f"{tmp_path}/")
+        monkeypatch.setattr(config, "storage_backend", "files")
+        key = reference_memo_key(
+            wikitext="<ref>a</ref>", is_general_reference=False, language_code="en"
+        )
+        ReferenceMemo(max_size=2, storage=True).put(key=key, data=dict(id="a"))
+        assert ReferenceMemo(max_size=2, storage=True).get(key=key) == dict(id="a")
+        assert ReferenceMemo(max_size=2).get(key=key) is None
+
+    def test_identical_reference_is_taken_from_the_memo(self, monkeypatch):
+        monkeypatch.setattr(config, "reference_memo_size", 100)
+        reference = "<ref>{{cite web|url=http://example.com/memo|title=Memo}}</ref>"
+        section = MediawikiSection(
+            testing=True,
+            wikitext=f"==Memo==\n{reference}\n{reference}",
+            job=ArticleJob(regex="sources"),
+            use_memo=True,
+        )
+        section.extract()
+        assert section.memo_hits == 1
+        # Only the statistic is memoized
+        assert len(section.references) == 1
+        first, second = section.reference_statistics
+        assert first == second
+        assert first["urls"] == ["http://example.com/memo"]
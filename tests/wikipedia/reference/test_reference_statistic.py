@@ -0,0 +1,18 @@
+from src.models.api.job.article_job import ArticleJob
+from src.models.api.statistic.reference import ReferenceStatistic
+from src.models.mediawiki.section import MediawikiSection
+from test_data.test_content import easter_island_head_excerpt
+
+
+class TestReferenceStatistic:
+    def test_statistic_of_section_references(self):
+        section = MediawikiSection(
+            testing=True,
+            wikitext=easter_island_head_excerpt,
+            job=ArticleJob(regex="external links"),
+        )
+        section.extract()
+        assert len(section.reference_statistics) == len(section.references)
+        for data in section.reference_statistics:
+            assert list(data) == list(ReferenceStatistic.__fields__)
+            assert data["section"] == "root"
@@ -0,0 +1,76 @@
+import bz2
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from xml.sax.saxutils import escape
+
+import config
+from src.models.wikimedia.wikipedia.dump import WikipediaDumpReader
+from src.models.wikimedia.wikipedia.dump_ingester import WikipediaDumpIngester
+from test_data.test_content import test_full_article
+
+
+def page(page_id, title, wikitext, ns=0, redirect=False):
+    return f"""<page>
+<title>{escape(title)}</title>
+<ns>{ns}</ns>
+<id>{page_id}</id>
+{'<redirect title="Target" />' if redirect else ''}
+<revision>
+<id>{page_id * 10}</id>
+<timestamp>2023-01-01T00:00:00Z</timestamp>
+<text xml:space="preserve">{escape(wikitext)}</text>
+</revision>
+</page>"""
+
+
+def write_dump(path):
+    pages = [
+        page(1, "Test article", test_full_article),
+        page(2, "Talk:Test article", "talk", ns=1),
+        page(3, "Breakdown", "#REDIRECT [[Test article]]", redirect=True),
+        page(4, "Test", "Hello<ref>{{cite web|url=http://example.com}}</ref>"),
+        page(5, "Empty", ""),
+    ]
+    xml = (
+        '<mediawiki xmlns="http://www.mediawiki.org/xml/export-0.10/">'
+        + "".join(pages)
+        + "</mediawiki>"
+    )
+    with bz2.open(path, "wt", encoding="utf-8") as file:
+        file.write(xml)
+
+
+class TestWikipediaDump:
+    def test_get_pages(self, tmp_path):
+        path = f"{tmp_path}/dump.xml.bz2"
+        write_dump(path)
+        pages = list(WikipediaDumpReader(path=path).get_pages())
+        assert [p["page_id"] for p in pages] == [1, 4, 5]
+        assert pages[0]["title"] == "Test article"
+        assert pages[0]["revision_id"] == 10
+        assert pages[0]["wikitext"] == test_full_article
+
+    def test_ingest_and_resume(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(config, "subdirectory_for_json", f"{tmp_path}/json/")
+        monkeypatch.setattr(config, "storage_backend", "files")
+        path = f"{tmp_path}/dump.xml.bz2"
+        write_dump(path)
+        with ThreadPoolExecutor() as executor:
+            ingester = WikipediaDumpIngester(dump=path, batch_size=1, limit=1)
+            ingester.ingest(executor=executor)
+            assert ingester.analyzed == 1
+            assert ingester.read_checkpoint() == 1
+            ingester = WikipediaDumpIngester(dump=path, batch_size=1)
+            ingester.ingest(executor=executor)
+            # the first page was skipped because of the checkpoint
+            assert ingester.analyzed == 1
+            # the empty page is skipped instead of fetched from Wikipedia
+            assert ingester.skipped == 1
+            assert ingester.failed == 0
+            assert ingester.read_checkpoint() == 4
+        with open(f"{path}.checkpoint.json") as file:
+            assert json.load(file)["page_id"] == 4
+        files = [name for _, _, names in os.walk(f"{tmp_path}/json/") for name in names]
+        assert "en.wikipedia.org.1.json" in files
+        assert "en.wikipedia.org.4.json" in files
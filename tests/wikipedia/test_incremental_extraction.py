@@ -0,0 +1,96 @@
+from datetime import datetime
+
+from src.models.api.job.article_job import ArticleJob
+from src.models.wikimedia.wikipedia.analyzer import WikipediaAnalyzer
+from src.models.wikimedia.wikipedia.article import WikipediaArticle
+from test_data.test_content import electrical_breakdown_full_article
+
+
+class TestIncrementalExtraction:
+    @staticmethod
+    def __analyze__(wikitext, cached_sections=None) -> WikipediaAnalyzer:
+        job = ArticleJob(title="Electrical breakdown", regex="references|see also")
+        article = WikipediaArticle(
+            job=job,
+            wikitext=wikitext,
+            page_id=1,
+            latest_revision_id=1,
+            latest_revision_date=datetime(2023, 1, 1),
+            fetch_ores=False,
+            cached_sections=cached_sections or {},
+        )
+        article.fetch_and_extract_and_parse()
+        analyzer = WikipediaAnalyzer(job=job, article=article)
+        analyzer.get_statistics()
+        return analyzer
+
+    @staticmethod
+    def __cached_sections__(analyzer: WikipediaAnalyzer):
+        """This mimics reading the previous analysis from the cache"""
+        found = {data["id"]: data for data in analyzer.reference_statistics}
+        return {
+            section["hash"]: [found[id_] for id_ in section["reference_ids"]]
+            for section in analyzer.article_statistics.sections
+        }
+
+    def test_only_changed_sections_are_recomputed(self):
+        previous = self.__analyze__(electrical_breakdown_full_article)
+        assert len(previous.article_statistics.sections) == 8
+        assert len(previous.article_statistics.recomputed_sections) == 8
+        # A typo fix in one section
+        wikitext = electrical_breakdown_full_article.replace(
+            "==Corona breakdown==\n", "==Corona breakdown==\nA typo was fixed.\n"
+        )
+        analyzer = self.__analyze__(
+            wikitext, cached_sections=self.__cached_sections__(previous)
+        )
+        statistics = analyzer.article_statistics
+        assert statistics.recomputed_sections == ["Corona breakdown"]
+        full = self.__analyze__(wikitext).article_statistics
+        assert statistics.reference_reuse["sections"] > 0
+        for statistics_ in (statistics, full):
+            statistics_.recomputed_sections = []
+            statistics_.reference_reuse = {}
+            statistics_.isodate = ""
+        assert statistics == full
+        assert (
+            analyzer.reference_statistics
+            == self.__analyze__(wikitext).reference_statistics
+        )
+        # Only the references of the changed section have to be written
+        assert {
+            data["section"] for data in analyzer.recomputed_reference_statistics
+        } <= {"Corona breakdown"}
+
+    def test_unchanged_article_reuses_everything(self):
+        previous = self.__analyze__(electrical_breakdown_full_article)
+        analyzer = self.__analyze__(
+            electrical_breakdown_full_article,
+            cached_sections=self.__cached_sections__(previous),
+        )
+        assert analyzer.article_statistics.recomputed_sections == []
+        assert analyzer.recomputed_reference_statistics == []
+        assert (
+            analyzer.article_statistics.reference_statistics
+            == previous.article_statistics.reference_statistics
+        )
+
+    def test_reference_in_two_sections_keeps_its_section(self):
+        wikitext = (
+            'Intro.<ref name="a">{{cite web|url=http://example.com|title=A}}</ref>\n'
+            '==History==\nText.<ref name="a"/>\n'
+            '==Geography==\nText.<ref name="a"/>\n'
+            "==References==\n<references/>\n"
+        )
+        previous = self.__analyze__(wikitext)
+        # Only Geography is edited so History is reused
+        wikitext = wikitext.replace("==Geography==\n", "==Geography==\nEdited.\n")
+        analyzer = self.__analyze__(
+            wikitext, cached_sections=self.__cached_sections__(previous)
+        )
+        assert "History" not in analyzer.article_statistics.recomputed_sections
+        sections = [data["section"] for data in analyzer.reference_statistics]
+        assert sections == [
+            data["section"] for data in self.__analyze__(wikitext).reference_statistics
+        ]
+        assert "History" in sections
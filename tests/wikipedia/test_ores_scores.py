@@ -0,0 +1,106 @@
+import time
+
+from datetime import datetime
+
+import requests
+
+import config
+from src.models.api.job.article_job import ArticleJob
+from src.models.file_io.ores_file_io import OresFileIo
+from src.models.wikimedia.ores import OresScoreCache
+from src.models.wikimedia.wikipedia.article import WikipediaArticle
+
+
+class SlowOresArticle(WikipediaArticle):
+    """This answers like ORES after sleeping revision_id milliseconds"""
+
+    @staticmethod
+    def __fetch_ores_scores__(wiki_project, revision_id):
+        time.sleep(revision_id / 1000)
+        return dict(prediction="B")
+
+
+class FakeOresScoreCache(OresScoreCache):
+    """This answers like the ORES batch API and records the requests"""
+
+    requests: list = []
+
+    def __request__(self, revision_ids):
+        self.requests.append(revision_ids)
+        scores = {}
+        for revision_id in revision_ids:
+            if revision_id % 10 == 5:
+                scores[str(revision_id)] = dict(
+                    articlequality=dict(error=dict(type="TimeoutError"))
+                )
+            elif revision_id % 2:
+                scores[str(revision_id)] = dict(
+                    articlequality=dict(error=dict(type="RevisionNotFound"))
+                )
+            else:
+                scores[str(revision_id)] = dict(
+                    articlequality=dict(score=dict(prediction="B"))
+                )
+        return {self.wiki: dict(scores=scores)}
+
+
+class TestOresScores:
+    def test_ores_score(self, monkeypatch):
+        monkeypatch.setattr(config, "ores_timeout", 2)
+        wp = SlowOresArticle(job=ArticleJob(), latest_revision_id=10)
+        wp.__get_ores_scores__()
+        assert wp.ores_quality_prediction == "B"
+        assert wp.ores_details == dict(prediction="B")
+
+    def test_slow_ores_score_is_skipped(self, monkeypatch):
+        monkeypatch.setattr(config, "ores_timeout", 0.2)
+        wp = SlowOresArticle(job=ArticleJob(), latest_revision_id=3000)
+        start = time.monotonic()
+        wp.__start_ores_scores__()
+        wp.__get_ores_scores__()
+        assert time.monotonic() - start < 1
+        assert wp.ores_details == {}
+
+    def test_ores_score_cache(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(config, "subdirectory_for_json", f"{tmp_path}/")
+        cache = FakeOresScoreCache(wiki="enwiki", batch_size=2)
+        scores = cache.get_scores(revision_ids=[2, 3, 4, 2])
+        assert scores == {2: dict(prediction="B"), 3: {}, 4: dict(prediction="B")}
+        assert cache.requests == [[2, 3], [4]]
+        # Both the scores and the revision ORES cannot score are cached
+        assert cache.get_scores(revision_ids=[2, 3, 4]) == scores
+        assert len(cache.requests) == 2
+        assert cache.get_score(revision_id=6) == dict(prediction="B")
+        assert cache.requests[-1] == [6]
+        # An error ORES may not have next time is not cached
+        assert cache.get_score(revision_id=5) == {}
+        assert cache.get_score(revision_id=5) == {}
+        assert cache.requests[-2:] == [[5], [5]]
+
+    def test_ores_negative_cache_expires(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(config, "subdirectory_for_json", f"{tmp_path}/")
+        old = int(datetime.timestamp(datetime.utcnow())) - 3600
+        OresFileIo(
+            wiki="enwiki",
+            revision_id=3,
+            data=dict(score=None, timestamp=old),
+        ).write_to_disk()
+        cache = FakeOresScoreCache(wiki="enwiki")
+        assert cache.get_score(revision_id=3) == {}
+        assert cache.requests == []
+        monkeypatch.setattr(config, "ores_negative_cache_seconds", 60)
+        assert cache.get_score(revision_id=3) == {}
+        assert cache.requests == [[3]]
+
+    def test_ores_request_error_is_not_cached(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(config, "subdirectory_for_json", f"{tmp_path}/")
+
+        def timeout(*args, **kwargs):
+            raise requests.Timeout("ORES is down")
+
+        monkeypatch.setattr(requests, "get", timeout)
+        cache = OresScoreCache(wiki="enwiki")
+        assert cache.get_scores(revision_ids=[2, 3]) == {}
+        ores_io = OresFileIo(wiki="enwiki", revision_id=2)
+        ores_io.read_from_disk()
+        assert not ores_io.data
@@ -0,0 +1,47 @@
+from datetime import datetime
+
+import config
+from src.models.api.job.article_job import ArticleJob
+from src.models.wikimedia.wikipedia.analyzer import WikipediaAnalyzer
+from src.models.wikimedia.wikipedia.article import WikipediaArticle
+from test_data.test_content import electrical_breakdown_full_article
+
+
+class TestParallelExtraction:
+    @staticmethod
+    def __analyze__() -> WikipediaAnalyzer:
+        job = ArticleJob(title="Electrical breakdown", regex="references|see also")
+        article = WikipediaArticle(
+            job=job,
+            wikitext=electrical_breakdown_full_article,
+            page_id=1,
+            latest_revision_id=1,
+            latest_revision_date=datetime(2023, 1, 1),
+            fetch_ores=False,
+        )
+        article.fetch_and_extract_and_parse()
+        analyzer = WikipediaAnalyzer(job=job, article=article)
+        analyzer.get_statistics()
+        return analyzer
+
+    def test_same_statistics_as_serial(self, monkeypatch):
+        serial = self.__analyze__()
+        monkeypatch.setattr(config, "parallel_extraction", True)
+        monkeypatch.setattr(config, "parallel_extraction_min_section_length", 0)
+        parallel = self.__analyze__()
+        sections = parallel.article.extractor.sections
+        assert len([section for section in sections if section.extracted_in_pool]) > 1
+        assert parallel.reference_statistics == serial.reference_statistics
+        assert (
+            parallel.article_statistics.sections == serial.article_statistics.sections
+        )
+        assert (
+            parallel.article_statistics.recomputed_sections
+            == serial.article_statistics.recomputed_sections
+        )
+
+    def test_small_sections_are_extracted_in_process(self, monkeypatch):
+        monkeypatch.setattr(config, "parallel_extraction", True)
+        parallel = self.__analyze__()
+        sections = parallel.article.extractor.sections
+        assert not any(section.extracted_in_pool for section in sections)
@@ -0,0 +1,104 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from src.models.api.statistic.article import ArticleStatistics
+from src.models.file_io.article_file_io import ArticleFileIo
+from src.models.file_io.title_file_io import TitleFileIo
+from src.models.wikimedia.recent_changes import RecentChangesRefresher
+
+
+class RecordingRefresher(RecentChangesRefresher):
+    """This records the articles instead of analyzing them"""
+
+    refreshed_items: list = []
+
+    def refresh_article(self, item):
+        self.refreshed_items.append(item)
+
+
+def event(title, timestamp, revision_id, server_name="en.wikipedia.org", **kwargs):
+    data = dict(
+        type="edit",
+        namespace=0,
+        title=title,
+        server_name=server_name,
+        timestamp=timestamp,
+        revision=dict(old=revision_id - 1, new=revision_id),
+    )
+    data.update(kwargs)
+    return data
+
+
+class TestRecentChangesRefresher:
+    @staticmethod
+    def __setup_cache__(tmp_path, monkeypatch):
+        monkeypatch.setattr(config, "subdirectory_for_json", f"{tmp_path}/")
+        TitleFileIo(lang="en", domain="wikipedia.org", title="Test").write_page_id(1)
+        ArticleFileIo(
+            wari_id="en.wikipedia.org.1",
+            data=ArticleStatistics(
+                wari_id="en.wikipedia.org.1",
+                page_id=1,
+                revision_id=100,
+                regex="references",
+            ).dict(),
+        ).write_to_disk()
+
+    def test_parse_event(self):
+        assert RecentChangesRefresher.parse_event(":ok") is None
+        assert RecentChangesRefresher.parse_event("event: message") is None
+        assert RecentChangesRefresher.parse_event('data: {"a": 1}\n') == dict(a=1)
+        assert RecentChangesRefresher.parse_event('{"a": 1}') == dict(a=1)
+        assert RecentChangesRefresher.parse_event("data: {broken") is None
+
+    def test_replay_file(self, tmp_path, monkeypatch):
+        self.__setup_cache__(tmp_path, monkeypatch)
+        events = [
+            event("Test", 1000, 101),
+            # not in the cache
+            event("Other", 1001, 200),
+            # other namespace and other wiki
+            event("Talk:Test", 1002, 300, namespace=1),
+            event("Test", 1003, 301, server_name="sv.wikipedia.org"),
+            event("Test", 1010, 102),
+            event("Test", 1020, 103),
+        ]
+        path = f"{tmp_path}/recentchange.txt"
+        with open(path, "w") as file:
+            for data in events:
+                file.write(f"event: message\ndata: {json.dumps(data)}\n\n")
+        refresher = RecordingRefresher(file=path, debounce_seconds=60)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            refresher.consume(executor=executor)
+        # The three edits were debounced into one analysis
+        assert len(refresher.refreshed_items) == 1
+        item = refresher.refreshed_items[0]
+        assert item["revision_id"] == 103
+        assert item["regex"] == "references"
+        assert item["page_id"] == 1
+        assert refresher.statistics["edits"] == 4
+        assert refresher.statistics["coalesced"] == 2
+        assert refresher.statistics["refreshed"] == 1
+        assert refresher.statistics["pending"] == 0
+
+    def test_debounce(self, tmp_path, monkeypatch):
+        self.__setup_cache__(tmp_path, monkeypatch)
+        refresher = RecordingRefresher(debounce_seconds=60)
+        # The cached revision is current so nothing is pending
+        refresher.handle_event(event("Test", 1000, 100))
+        assert refresher.pending == {}
+        refresher.handle_event(event("Test", 1000, 101))
+        assert list(refresher.pending) == ["en.wikipedia.org:Test"]
+        refresher.handle_event(event("Other", 1059, 200))
+        assert refresher.__due_keys__() == []
+        refresher.handle_event(event("Other", 1060, 201))
+        assert refresher.__due_keys__() == ["en.wikipedia.org:Test"]
+
+    def test_old_title_index_entry(self, tmp_path, monkeypatch):
+        self.__setup_cache__(tmp_path, monkeypatch)
+        # The index entry of the cached article is older than the max age
+        monkeypatch.setattr(config, "title_index_max_age_seconds", -1)
+        refresher = RecordingRefresher(debounce_seconds=60)
+        refresher.handle_event(event("Test", 1000, 101))
+        assert list(refresher.pending) == ["en.wikipedia.org:Test"]